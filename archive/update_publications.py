@@ -3,8 +3,16 @@
 Script to update publications in index.html from publications.txt
 """
 
+import heapq
 import re
 import os
+import sys
+
+# Shared helpers live in scripts/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+from site_model import load_site_model
+from fsutil import atomic_write, file_lock
+from pub_index import PublicationIndex
 
 def parse_publication(publication_text):
     """
@@ -112,117 +120,56 @@ def generate_html_li(publication_data):
     
     return f'<li style="margin: 10px">{citation}</li>'
 
-def extract_existing_publications(html_content):
-    """
-    Extract existing publications from HTML content
-    Returns a list of existing publication titles
-    """
-    existing_titles = []
-    
-    # Find the publications list section
-    ul_start = html_content.find('<ul id="publications-list">')
-    if ul_start == -1:
-        return existing_titles
-    
-    ul_end = html_content.find('</ul>', ul_start)
-    if ul_end == -1:
-        return existing_titles
-    
-    # Extract the content between <ul> and </ul>
-    ul_content = html_content[ul_start:ul_end]
-    
-    # Find all <li> elements and extract titles
-    li_pattern = r'<li[^>]*>(.*?)</li>'
-    li_matches = re.findall(li_pattern, ul_content, re.DOTALL)
-    
-    for li_content in li_matches:
-        # Extract title from the link text
-        title_pattern = r'<a[^>]*>([^<]+)</a>'
-        title_match = re.search(title_pattern, li_content)
-        if title_match:
-            title = title_match.group(1).strip()
-            existing_titles.append(title)
-    
-    return existing_titles
+LIST_OPEN = '<ul id="publications-list">'
+LIST_CLOSE = '</ul>'
+LI_RE = re.compile(r'<li[^>]*>.*?</li>', re.DOTALL)
+YEAR_RE = re.compile(r'\((\d{4})\)')
+ITEM_INDENT = '                            '
+LIST_END = '                        </ul>'
 
-def parse_existing_publication_html(li_html):
-    """
-    Parse existing publication HTML to extract year for sorting
-    """
-    # Extract year from the HTML
-    year_pattern = r'\((\d{4})\)'
-    year_match = re.search(year_pattern, li_html)
-    if year_match:
-        return int(year_match.group(1))
-    return 0
+def _newest_first(items):
+    """(year, li_html) pairs sorted newest first; already-sorted input is kept as is."""
+    if any(a[0] < b[0] for a, b in zip(items, items[1:])):
+        items = sorted(items, key=lambda item: item[0], reverse=True)
+    return items
 
-def update_html_file(html_file, publications_list, existing_publications_html):
+def update_html_file(html_file, publications_list):
     """
     Update the HTML file with new publications list, preserving existing ones and maintaining chronological order
+
+    The file is read once under a lock, the publications list is located
+    once, existing and new items are heap-merged by year (existing items win
+    ties) and the result is written atomically.
     """
-    with open(html_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Find the publications list section
-    start_pattern = r'<ul id="publications-list">'
-    end_pattern = r'</ul>'
-    
-    start_match = re.search(start_pattern, content)
-    if not start_match:
-        print("Error: Could not find publications list in HTML file")
-        return False
-    
-    # Find the end of the publications list
-    start_pos = start_match.start()
-    ul_start = content.find('<ul id="publications-list">', start_pos)
-    ul_end = content.find('</ul>', ul_start)
-    
-    if ul_start == -1 or ul_end == -1:
-        print("Error: Could not find publications list boundaries")
-        return False
-    
-    # Parse existing publications and extract their HTML with years
-    existing_publications_with_years = []
-    if existing_publications_html:
-        # Split existing HTML into individual <li> elements
-        li_pattern = r'<li[^>]*>.*?</li>'
-        existing_li_matches = re.findall(li_pattern, existing_publications_html, re.DOTALL)
-        
-        for li_html in existing_li_matches:
-            year = parse_existing_publication_html(li_html)
-            existing_publications_with_years.append((year, li_html))
-    
-    # Combine all publications (existing + new) and sort by year (newest first)
-    all_publications = []
-    
-    # Add existing publications
-    for year, li_html in existing_publications_with_years:
-        all_publications.append((year, li_html))
-    
-    # Add new publications
-    for pub_html in publications_list:
-        # Extract year from new publication HTML
-        year = parse_existing_publication_html(pub_html)
-        all_publications.append((year, pub_html))
-    
-    # Sort all publications by year (newest first)
-    all_publications.sort(key=lambda x: x[0], reverse=True)
-    
-    # Generate the new publications HTML
-    new_publications_html = '<ul id="publications-list">\n'
-    
-    for year, li_html in all_publications:
-        new_publications_html += f'                            {li_html}\n'
-    
-    new_publications_html += '                        </ul>'
-    
-    # Replace the old publications list with the new one
-    new_content = content[:ul_start] + new_publications_html + content[ul_end + 5:]
-    
-    # Write the updated content back to the file
-    with open(html_file, 'w', encoding='utf-8') as f:
-        f.write(new_content)
-    
+    with file_lock(html_file):
+        with open(html_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+
+        ul_start = content.find(LIST_OPEN)
+        ul_end = content.find(LIST_CLOSE, ul_start + len(LIST_OPEN)) if ul_start != -1 else -1
+        if ul_start == -1 or ul_end == -1:
+            print("Error: Could not find publications list in HTML file")
+            return False
+
+        def with_years(matches):
+            for li_html in matches:
+                year = YEAR_RE.search(li_html)
+                yield (int(year.group(1)) if year else 0, li_html)
+
+        existing = list(with_years(m.group() for m in
+                                   LI_RE.finditer(content, ul_start + len(LIST_OPEN), ul_end)))
+        new = list(with_years(publications_list))
+        merged = heapq.merge(_newest_first(existing), _newest_first(new),
+                             key=lambda item: item[0], reverse=True)
+
+        chunks = [content[:ul_start], LIST_OPEN, '\n']
+        for year, li_html in merged:
+            chunks += [ITEM_INDENT, li_html, '\n']
+        chunks += [LIST_END, content[ul_end + len(LIST_CLOSE):]]
+
+        new_content = ''.join(chunks)
+        if new_content != content:
+            atomic_write(html_file, new_content)
     return True
 
 def main():
@@ -242,21 +189,10 @@ def main():
     
     print("Reading existing publications from HTML...")
     
-    # Read existing HTML content
-    with open(html_file, 'r', encoding='utf-8') as f:
-        html_content = f.read()
-    
-    # Extract existing publication titles
-    existing_titles = extract_existing_publications(html_content)
-    print(f"Found {len(existing_titles)} existing publications in HTML")
-    
-    # Extract existing publications HTML to preserve them
-    existing_publications_html = ""
-    ul_start = html_content.find('<ul id="publications-list">')
-    if ul_start != -1:
-        ul_end = html_content.find('</ul>', ul_start)
-        if ul_end != -1:
-            existing_publications_html = html_content[ul_start + len('<ul id="publications-list">'):ul_end]
+    # Existing publications come from the shared (cached) site model, indexed
+    # by normalized title and DOI for O(1) duplicate checks
+    index = PublicationIndex.from_publications(load_site_model(html_file).publications)
+    print(f"Found {len(index)} existing publications in HTML")
     
     print("Reading publications from publications.txt...")
     
@@ -277,11 +213,12 @@ def main():
         if pub_data:
             # Check if this publication already exists
             title = pub_data['title']
-            if title in existing_titles:
+            if index.find(title, doi=pub_data.get('doi_url')) is not None:
                 print(f"  → Publication already exists in HTML, skipping: {title[:50]}...")
                 continue
             else:
                 print(f"  → New publication, will add: {title[:50]}...")
+                index.add(pub_data, title, doi=pub_data.get('doi_url'))
                 publications_data.append(pub_data)
                 new_publications_count += 1
         else:
@@ -292,7 +229,7 @@ def main():
         print("Re-sorting existing publications by year...")
         
         # Still need to re-sort existing publications
-        if update_html_file(html_file, [], existing_publications_html):
+        if update_html_file(html_file, []):
             print(f"Successfully re-sorted publications in {html_file}")
         else:
             print("Failed to re-sort HTML file")
@@ -311,13 +248,13 @@ def main():
     print(f"Generated {len(html_items)} new HTML list items")
     
     # Update the HTML file
-    if update_html_file(html_file, html_items, existing_publications_html):
+    if update_html_file(html_file, html_items):
         print(f"Successfully updated {html_file} with {new_publications_count} new publications")
     else:
         print("Failed to update HTML file")
     
     print(f"\nTotal new publications added: {new_publications_count}")
-    print(f"Total existing publications preserved: {len(existing_titles)}")
+    print(f"Total existing publications preserved: {len(index) - new_publications_count}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Script to export the CV in every format from a single parse of the site data
+
+The site model is built once (from _data/*.yml, or index.html with
+--from-html) and handed to each registered writer. Writers run in parallel
+and every output is written atomically.
+
+Usage:
+    python export_cv.py                       # all formats
+    python export_cv.py --formats html latex  # a subset
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+# Shared helpers live in scripts/
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'scripts'))
+from site_model import load_site_model
+from site_data import load_site_data
+from fsutil import atomic_write
+from cv_writers import render_latex, render_bibtex, render_json_resume
+
+import generate_cv
+import update_readme
+
+# name -> (default output path, render function(model, updated) -> chunks)
+WRITERS = {}
+
+def writer(name, path):
+    """Register a CV writer under `name`, writing to `path` by default."""
+    def register(func):
+        WRITERS[name] = (path, func)
+        return func
+    return register
+
+@writer('html', 'cv.html')
+def write_html(model, updated):
+    return generate_cv.iter_cv_html(model, updated)
+
+@writer('markdown', 'README.md')
+def write_markdown(model, updated):
+    return update_readme.generate_readme(update_readme.readme_info(model), updated)
+
+@writer('latex', 'files/cv/cv.tex')
+def write_latex(model, updated):
+    return render_latex(model, updated)
+
+@writer('bibtex', 'files/cv/publications.bib')
+def write_bibtex(model, updated):
+    return render_bibtex(model, updated)
+
+@writer('json', 'files/cv/resume.json')
+def write_json_resume(model, updated):
+    return render_json_resume(model, updated)
+
+def export(model, formats=None, outputs=None, updated=None, max_workers=None):
+    """
+    Run the selected writers in parallel over one model.
+    Returns {format: (path, seconds)}.
+    """
+    formats = list(formats or WRITERS)
+    outputs = outputs or {}
+
+    def run(name):
+        path, render = WRITERS[name]
+        path = outputs.get(name, path)
+        start = time.perf_counter()
+        atomic_write(path, render(model, updated))
+        return path, time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(formats)) as executor:
+        futures = {name: executor.submit(run, name) for name in formats}
+        return {name: future.result() for name, future in futures.items()}
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the CV in several formats from one parse")
+    parser.add_argument('--formats', nargs='+', choices=sorted(WRITERS), default=list(WRITERS),
+                        help="Formats to write (default: all)")
+    parser.add_argument('--from-html', action='store_true',
+                        help="Scrape index.html instead of reading _data/*.yml")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    model = load_site_model("index.html") if args.from_html else load_site_data()
+    print(f"Loaded site model in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    results = export(model, args.formats, updated=datetime.now().strftime('%B %Y'))
+    for name, (path, seconds) in results.items():
+        print(f"✅ {name:<9} → {path} ({seconds * 1000:.1f} ms)")
+
+if __name__ == "__main__":
+    main()
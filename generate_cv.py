@@ -1,140 +1,41 @@
 #!/usr/bin/env python3
 """
-Script to generate a professional CV from HTML content
+Script to generate a professional CV from the site data (_data/*.yml),
+or from the HTML content with --from-html
 """
 
+import argparse
+import hashlib
+import html
+import json
 import re
 import os
-from bs4 import BeautifulSoup
+import sys
 from datetime import datetime
 
-def extract_info_from_html(html_file):
-    """
-    Extract structured information from index.html using BeautifulSoup
-    """
-    with open(html_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    soup = BeautifulSoup(content, 'html.parser')
-    
-    info = {
-        'name': "Yalin Yang",
-        'title': "Research Associate & GIS Programmer",
-        'contact': {
-            'email': "yy00021@mail.wvu.edu",
-            'phone': "+1-607-374-9844",
-            'office': "330 Brooks Hall",
-            'location': "Morgantown, WV 26506",
-            'website': "https://gisyaliny.github.io/"
-        },
-        'education': [],
-        'appointments': [],
-        'publications': [],
-        'awards': []
-    }
-    
-    # --- Extract basic info if available (overwriting defaults) ---
-    # (We keep defaults as fallbacks because scraping specific tags might ideally be more robust, 
-    # but the defaults are correct for now based on previous files)
-
-    # --- Extract Education ---
-    # Locate "Education" section text
-    # In index.html, it's usually under a <p> or similar. 
-    # We'll search for the text "Education:" and parse siblings/children.
-    # The structure in index.html is: <p class="large"><strong>Education:</strong><br />... text ... </p>
-    
-    # We can try to find the "Education:" text and then parse the parent
-    edu_header = soup.find(string=re.compile("Education:"))
-    if edu_header:
-        parent_p = edu_header.parent.parent # strong -> p
-        # Get text and split by bullets? 
-        # The text structure is: &bull; Year ... Ph.D... <br>
-        # Let's just get the text and use regex to parse the lines starting with bullet char or year
-        text = parent_p.get_text("\n")
-        lines = text.split('\n')
-        for line in lines:
-            line = line.strip()
-            # Look for years pattern like 2019-2024
-            if re.search(r'\d{4}.*\d{4}', line):
-                info['education'].append(line.replace("•", "").replace("&bull;", "").strip())
-
-    # --- Extract Appointments ---
-    appt_header = soup.find(string=re.compile("Appointments:"))
-    if appt_header:
-        parent_p = appt_header.parent.parent
-        text = parent_p.get_text("\n")
-        lines = text.split('\n')
-        for line in lines:
-            line = line.strip()
-            if re.search(r'\d{4}.*\d{4}|\d{4}.*Present', line):
-                 info['appointments'].append(line.replace("•", "").replace("&bull;", "").strip())
-
-    # --- Extract Publications ---
-    pub_ul = soup.find('ul', id='publications-list')
-    if pub_ul:
-        for li in pub_ul.find_all('li'):
-            # Parse publication details for better styling
-            # We want: Year, Citation, and maybe highlight Author
-            # But plain text citation is often standard for CVs.
-            # However, we can highlight the year if we want columns.
-            
-            pub_html = str(li)
-            text = li.get_text(" ", strip=True)
-            text = re.sub(r'\s+', ' ', text)
-            
-            # Extract Year
-            year_match = re.search(r'\((\d{4})\)', text)
-            year = year_match.group(1) if year_match else "Unknown"
-            
-            # Clean text specifically for CV (maybe remove links text wrapper?)
-            # Actually, keeping the citation as is, is usually fine.
-            # We will store raw HTML to preserve bolding <b>Yang, Y.</b>
-            # BeautifulSoup converts tags to text, losing bolding.
-            # let's reconstruct it or use innerHTML.
-            
-            # Simplified approach: just keep the full HTML of the li content
-            # But removing the <li> tag itself.
-            content_html = "".join([str(x) for x in li.contents])
-            
-            info['publications'].append({
-                'year': year,
-                'content': content_html,
-                'text': text
-            })
-
-    # --- Extract Awards ---
-    # Find headers with "Grants & Awards"
-    for header in soup.find_all(['h2', 'h3']):
-        if "Grants & Awards" in header.get_text():
-            next_ul = header.find_next('ul')
-            if next_ul:
-                for li in next_ul.find_all('li'):
-                    text = li.get_text(" ", strip=True)
-                    text = re.sub(r'\s+', ' ', text)
-                    
-                    # Extract Year
-                    year_match = re.search(r'^(\d{4})', text)
-                    year = year_match.group(1) if year_match else "Unknown"
-                    
-                    # Store
-                    info['awards'].append({
-                        'year': year,
-                        'text': text
-                    })
-            break
-            
-    return info
-
-def generate_cv_html(info):
-    """
-    Generate the HTML for the CV
-    """
-    
-    # CSS Styles
-    css = """
+# Shared helpers live in scripts/
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'scripts'))
+from site_model import load_site_model, section_digests, diff_sections, SECTIONS
+from site_data import load_site_data
+from template import Template
+from fsutil import atomic_write, file_sha256
+from optimize_pdfs import MANIFEST_FILE as PDF_MANIFEST_FILE, load_pdf_manifest, pdf_label
+from instrument import span, count, profiled, add_profile_argument
+
+# Web fonts: the self-hosted subsets from scripts/subset_fonts.py once they
+# have been built, Google Fonts otherwise
+GOOGLE_FONTS_CSS = "https://fonts.googleapis.com/css2?family=Merriweather:ital,wght@0,300;0,400;0,700;0,900;1,300;1,400&family=Open+Sans:ital,wght@0,300;0,400;0,600;0,700;1,400&display=swap"
+LOCAL_FONTS_CSS = "css/fonts.css"
+
+def fonts_css_url(root=ROOT_DIR):
+    if os.path.exists(os.path.join(root, LOCAL_FONTS_CSS)):
+        return LOCAL_FONTS_CSS
+    return GOOGLE_FONTS_CSS
+
+# CSS Styles
+CV_CSS = """
     <style>
-        @import url('https://fonts.googleapis.com/css2?family=Merriweather:ital,wght@0,300;0,400;0,700;0,900;1,300;1,400&family=Open+Sans:ital,wght@0,300;0,400;0,600;0,700;1,400&display=swap');
-        
         body {
             font-family: 'Open Sans', Helvetica, Arial, sans-serif;
             color: #333;
@@ -261,124 +162,67 @@ def generate_cv_html(info):
         }
     </style>
     """
-    
-    html = f"""<!DOCTYPE html>
+
+PAGE_START = Template("""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{info['name']} - Curriculum Vitae</title>
+    <title>{info.name} - Curriculum Vitae</title>
+    <link rel="stylesheet" href="{fonts_css}">
     {css}
 </head>
 <body>
 
 <div class="cv-container">
-    <header>
+""")
+
+PROFILE = Template("""    <header>
         <div>
-            <h1>{info['name']}</h1>
-            <h3 class="title">{info['title']}</h3>
-            <p>West Virginia GIS Technical Center<br>West Virginia University</p>
+            <h1>{info.name}</h1>
+            <h3 class="title">{info.title}</h3>
+            <p>{affiliation}</p>
         </div>
         <div class="contact-info">
-            <p>{info['contact']['email']}</p>
-            <p>{info['contact']['phone']}</p>
-            <p>{info['contact']['office']}</p>
-            <p>{info['contact']['location']}</p>
-            <p><a href="{info['contact']['website']}">{info['contact']['website']}</a></p>
-        </div>
+{contact}        </div>
     </header>
+""")
 
-    <section>
-        <h2>Education</h2>
-"""
-    # Parse Education strings to separate Year from Content if possible
-    # Strings format: "2019–2024: Ph.D. ..."
-    for edu in info['education']:
-        # Try to split by first colon or common separator
-        parts = edu.split(':', 1)
-        if len(parts) == 2:
-            year = parts[0].strip()
-            desc = parts[1].strip()
-        else:
-            year = ""
-            desc = edu
-            
-        html += f"""
-        <div class="item">
-            <div class="item-year">{year}</div>
-            <div class="item-content">{desc}</div>
-        </div>
-        """
+CONTACT_LINE = Template("""            <p>{text}</p>
+""")
 
-    html += """
-    </section>
+WEBSITE_LINE = Template("""            <p><a href="{url}">{url}</a></p>
+""")
 
+SECTION_START = Template("""
     <section>
-        <h2>Academic Appointments</h2>
-"""
-    for appt in info['appointments']:
-        parts = appt.split(':', 1)
-        if len(parts) == 2:
-            year = parts[0].strip()
-            desc = parts[1].strip()
-        else:
-            year = ""
-            desc = appt
-            
-        html += f"""
-        <div class="item">
-            <div class="item-year">{year}</div>
-            <div class="item-content">{desc}</div>
-        </div>
-        """
+        <h2>{title}</h2>
+""")
 
-    html += """
+SECTION_END = """
     </section>
-
-    <section>
-        <h2>Publications</h2>
 """
-    for pub in info['publications']:
-        html += f"""
+
+ITEM = Template("""
         <div class="item">
-            <div class="item-year">{pub['year']}</div>
-            <div class="item-content publication-item">
-                {pub['content']}
-            </div>
+            <div class="item-year">{year}</div>
+            <div class="item-content">{content}</div>
         </div>
-        """
+        """)
 
-    html += """
-    </section>
-    
-    <section>
-        <h2>Grants & Awards</h2>
-"""
-    for award in info['awards']:
-        # Try to separate Year from text
-        # Text format: "2024 Award Name..."
-        # Regex to find first space after year
-        match = re.match(r'^(\d{4})\s*(.*)', award['text'])
-        if match:
-            year = match.group(1)
-            desc = match.group(2)
-        else:
-            year = ""
-            desc = award['text']
-            
-        html += f"""
+PUBLICATION_ITEM = Template("""
         <div class="item">
             <div class="item-year">{year}</div>
-            <div class="item-content">{desc}</div>
+            <div class="item-content publication-item">
+                {content}
+            </div>
         </div>
-        """
+        """)
 
-    html += """
-    </section>
-    
+PAGE_END = Template("""    
     <footer>
         <p style="text-align: center; color: #999; font-size: 12px; margin-top: 50px;">
-            Last updated: """ + datetime.now().strftime('%B %Y') + """
+            Last updated: {updated}
         </p>
     </footer>
 
@@ -386,21 +230,148 @@ def generate_cv_html(info):
 
 </body>
 </html>
-"""
-    return html
+""")
+
+SECTION_CACHE_FILE = os.path.join(ROOT_DIR, '.cache', 'cv_sections.json')
+# Part of every section digest: the source of this module (templates and
+# iter_section) and of pdf_label's, so any edit to how sections are rendered
+# invalidates cached fragments
+_RENDER_DIGEST = hashlib.sha1("".join(
+    file_sha256(path) for path in (os.path.abspath(__file__), sys.modules[pdf_label.__module__].__file__)
+).encode('utf-8')).hexdigest()
+
+def _split_award(award):
+    # Text format: "2024 Award Name..."
+    match = re.match(r'^(\d{4})\s*(.*)', award.text)
+    if match:
+        return match.group(1), match.group(2)
+    return "", award.text
+
+def iter_section(info, name, pdfs=None):
+    """
+    Yield the HTML fragments of one CV section. `pdfs` is the PDF manifest
+    used to label award links (this site's files/pdf_manifest.json if None).
+    """
+    if name == 'profile':
+        # Fields a profile leaves empty are dropped rather than rendered blank
+        contact = "".join(CONTACT_LINE.render(text=info.contact[key])
+                          for key in ('email', 'phone', 'office', 'location') if info.contact.get(key))
+        if info.contact.get('website'):
+            contact += WEBSITE_LINE.render(url=info.contact['website'])
+        affiliation = "<br>".join(part for part in (info.center, info.institution) if part)
+        yield from PROFILE.stream(info=info, affiliation=affiliation, contact=contact)
+        return
+
+    if name == 'education':
+        yield from SECTION_START.stream(title="Education")
+        for edu in info.education:
+            yield from ITEM.stream(year=edu.period, content=edu.full_description)
+    elif name == 'appointments':
+        yield from SECTION_START.stream(title="Academic Appointments")
+        for appt in info.appointments:
+            yield from ITEM.stream(year=appt.period, content=appt.full_description)
+    elif name == 'publications':
+        yield from SECTION_START.stream(title="Publications")
+        for pub in info.publications:
+            yield from PUBLICATION_ITEM.stream(year=pub.year, content=pub.content)
+    elif name == 'awards':
+        yield from SECTION_START.stream(title="Grants & Awards")
+        if pdfs is None:
+            pdfs = load_pdf_manifest()
+        for award in info.awards:
+            year, desc = _split_award(award)
+            if award.link in pdfs:
+                # Size hint for linked certificates, from scripts/optimize_pdfs.py
+                desc += f' <a href="{html.escape(award.link)}" target="_blank">({pdf_label(pdfs[award.link])})</a>'
+            yield from ITEM.stream(year=year, content=desc)
+    yield SECTION_END
+
+def iter_cv_html(info, updated=None, fragments=None, css=CV_CSS, fonts_css=None, pdfs=None):
+    """
+    Yield the CV document piece by piece. `fragments` maps section names to
+    already-rendered HTML that is reused instead of re-rendering the section.
+    `css` is placed in <head> (the inline stylesheet by default),
+    `fonts_css` overrides the web font stylesheet URL and `pdfs` is passed
+    on to `iter_section`.
+    """
+    fragments = fragments or {}
+    yield from PAGE_START.stream(info=info, css=css, fonts_css=html.escape(fonts_css or fonts_css_url()))
+    for name in SECTIONS:
+        if name in fragments:
+            yield fragments[name]
+        else:
+            yield from iter_section(info, name, pdfs)
+    yield from PAGE_END.stream(updated=updated or datetime.now().strftime('%B %Y'))
+
+def generate_cv_html(info, updated=None):
+    """
+    Generate the HTML for the CV from a `SiteModel`
+    """
+    return "".join(iter_cv_html(info, updated))
+
+def write_cv_html(info, path="cv.html", updated=None, changed=None, cache_file=SECTION_CACHE_FILE,
+                  css=CV_CSS, fonts_css=None, pdf_manifest=PDF_MANIFEST_FILE):
+    """
+    Stream the CV straight into `path` (atomically). `css` and `fonts_css`
+    are passed on to `iter_cv_html`; award PDFs are labelled from the
+    `pdf_manifest` file (none if None).
+
+    Rendered sections are cached in `cache_file` together with the digest of
+    the records they were rendered from; only sections reported as changed
+    (`changed`, or by comparing digests when it is None) are re-rendered.
+    Returns the set of re-rendered section names.
+    """
+    digests = {name: value + _RENDER_DIGEST for name, value in section_digests(info).items()}
+    pdfs = {}
+    if pdf_manifest and os.path.exists(pdf_manifest):
+        # Award items show PDF sizes: re-render them when the manifest changes
+        digests['awards'] += file_sha256(pdf_manifest)
+        pdfs = load_pdf_manifest(pdf_manifest)
+    cache = {'digests': {}, 'fragments': {}}
+    if cache_file and os.path.exists(cache_file):
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    if changed is None:
+        changed = diff_sections(cache['digests'], digests)
+    changed = set(changed) | (set(SECTIONS) - set(cache['fragments']))
+
+    fragments = {}
+    for name in SECTIONS:
+        if name in changed:
+            with span('render', name):
+                cache['fragments'][name] = "".join(iter_section(info, name, pdfs))
+        else:
+            count('cv.sections_cached')
+        fragments[name] = cache['fragments'][name]
+    cache['digests'] = digests
+
+    with span('write', path):
+        atomic_write(path, iter_cv_html(info, updated, fragments, css, fonts_css, pdfs))
+        if cache_file:
+            atomic_write(cache_file, json.dumps(cache, ensure_ascii=False))
+    return changed
 
 def main():
-    print("Generating Professional CV...")
-    info = extract_info_from_html("index.html")
-    
-    print(f"Extracted: {len(info['education'])} Education, {len(info['appointments'])} Appointments, {len(info['publications'])} Publications")
-    
-    cv_html = generate_cv_html(info)
-    
-    with open("cv.html", "w", encoding='utf-8') as f:
-        f.write(cv_html)
-        
-    print("✅ Successfully generated cv.html")
+    parser = argparse.ArgumentParser(description="Generate cv.html")
+    parser.add_argument('--from-html', action='store_true',
+                        help="Scrape index.html instead of reading _data/*.yml")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+
+    with profiled('generate_cv', args.profile):
+        print("Generating Professional CV...")
+        if args.from_html:
+            with span('parse', 'index.html'):
+                info = load_site_model(os.path.join(ROOT_DIR, "index.html"))
+        else:
+            with span('read', '_data'):
+                info = load_site_data()
+
+        print(f"Extracted: {len(info.education)} Education, {len(info.appointments)} Appointments, {len(info.publications)} Publications")
+
+        rendered = write_cv_html(info, os.path.join(ROOT_DIR, "cv.html"))
+
+        print(f"✅ Successfully generated cv.html (re-rendered: {', '.join(sorted(rendered)) or 'nothing'})")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,26 @@
+// Fill lazily rendered modals (scripts/render_sections.py --lazy) from their
+// prebuilt fragment the first time they open. Hovering a research card starts
+// the request early so the content is usually there by the time the modal is.
+$(function() {
+	function load(modal) {
+		var placeholder = $(modal).find('[data-fragment]');
+		if (!placeholder.length || placeholder.data('loading')) {
+			return;
+		}
+		placeholder.data('loading', true);
+		$.get(placeholder.attr('data-fragment'), function(html) {
+			placeholder.replaceWith(html);
+		}, 'html').fail(function() {
+			// Let the next open retry
+			placeholder.data('loading', false);
+		});
+	}
+
+	$('div.modal').on('show.bs.modal', function() {
+		load(this);
+	});
+
+	$('a.research-link').one('mouseenter focus', function() {
+		load($(this).attr('href'));
+	});
+});
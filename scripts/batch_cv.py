@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Generate CVs for a whole roster of people in one run.
+
+The roster is a YAML list. Each entry is a site directory laid out like this
+repository (_config.yml plus _data/*.yml), a Google Scholar ID, or a
+mapping that names either one and optionally the output id:
+
+    - ../alice.github.io
+    - wdkZhlwAAAAJ
+    - {id: bob, dir: /srv/sites/bob}
+    - {id: carol, scholar: AbCdEfGhIjKL}
+
+Relative directories are resolved against the roster file. Scholar profiles
+are fetched first, in this process, through one shared rate limiter and the
+Scholar cache (this needs `scholarly`); directory profiles are read by the
+workers. CVs are rendered across a process pool: the workers inherit (or,
+with the spawn start method, import once each) generate_cv's parsed
+templates, and every CV links one shared stylesheet, <out>/cv.css, written
+once, plus the full Google Fonts stylesheet (the local subsets only cover
+this site's glyphs). This site's PDF manifest is not used either, so award
+links carry no size labels. Fields missing from a profile stay empty rather
+than falling back to this site's owner.
+
+Each profile is written to <out>/<id>/cv.html with its own section cache,
+and the timing report to <out>/report.json.
+
+Usage:
+    python scripts/batch_cv.py roster.yml
+    python scripts/batch_cv.py roster.yml --out build/cvs --workers 4
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Appended, not prepended: the root update_from_scholar.py must not shadow
+# scripts/update_from_scholar.py
+sys.path.append(ROOT_DIR)
+
+from fsutil import atomic_write
+from generate_cv import CV_CSS, GOOGLE_FONTS_CSS, write_cv_html
+from instrument import recorder, span
+from scholar_cache import ScholarCache, fill_with_cache, DEFAULT_TTL_DAYS
+from scholar_pool import DEFAULT_WORKERS, DEFAULT_RATE, HostRateLimiter
+from site_data import format_publication, load_site_data, load_yaml
+from site_model import blank_site_model
+
+DEFAULT_OUT = os.path.join(ROOT_DIR, 'build', 'cvs')
+CACHE_DIR = os.path.join(ROOT_DIR, '.cache', 'batch_cv')
+SHARED_CSS = 'cv.css'
+SCHOLAR_ID = re.compile(r'^[\w-]{12}$')
+
+
+def load_roster(path):
+    """Normalise the roster to a list of {'id', 'dir'} / {'id', 'scholar'} dicts."""
+    base = os.path.dirname(os.path.abspath(path))
+    profiles, seen = [], set()
+    for entry in load_yaml(path, []):
+        if isinstance(entry, str):
+            entry = {'scholar': entry} if SCHOLAR_ID.match(entry) and not \
+                os.path.isdir(os.path.join(base, entry)) else {'dir': entry}
+        if 'dir' in entry:
+            profile = {'dir': os.path.normpath(os.path.join(base, os.path.expanduser(entry['dir'])))}
+            default_id = os.path.basename(profile['dir'])
+        elif 'scholar' in entry:
+            profile = {'scholar': str(entry['scholar'])}
+            default_id = profile['scholar']
+        else:
+            raise ValueError(f"Roster entry needs 'dir' or 'scholar': {entry!r}")
+        profile['id'] = re.sub(r'[^\w.-]+', '-', str(entry.get('id') or default_id)).strip('-')
+        if profile['id'] in seen:
+            raise ValueError(f"Duplicate profile id in roster: {profile['id']}")
+        seen.add(profile['id'])
+        profiles.append(profile)
+    return profiles
+
+
+def scholar_model(scholar_id, backend, cache=None, limiter=None, max_workers=DEFAULT_WORKERS):
+    """Build a `SiteModel` (name, affiliation, publications) from a Scholar profile."""
+    from update_from_scholar import format_entry
+
+    with span('fetch', scholar_id):
+        author = backend.search_author_id(scholar_id)
+        backend.fill(author, sections=['publications'])
+    pubs = [pub for pub in author.get('publications', []) if pub.get('bib', {}).get('title')]
+    results = fill_with_cache(pubs, backend.fill, cache, max_workers=max_workers, limiter=limiter)
+
+    model = blank_site_model()
+    model.name = author.get('name', '')
+    model.institution = author.get('affiliation', '')
+    model.contact['website'] = f"https://scholar.google.com/citations?user={scholar_id}"
+    model.social_links['Google Scholar'] = model.contact['website']
+    highlight = (model.name,) if model.name else ()
+    entries = [format_entry(r.filled, highlight=highlight) for r in results if r.error is None]
+    entries.sort(key=lambda e: str(e['year']), reverse=True)
+    model.publications = [format_publication(e) for e in entries]
+    return model
+
+
+def fetch_scholar_profiles(profiles, max_workers=DEFAULT_WORKERS, rate_per_sec=DEFAULT_RATE,
+                           use_cache=True, ttl_days=DEFAULT_TTL_DAYS, backend=None):
+    """
+    Attach a 'model' to every Scholar profile (or an 'error'), one author at
+    a time so all of them share the same request budget.
+    """
+    scholar_profiles = [p for p in profiles if 'scholar' in p]
+    if not scholar_profiles:
+        return
+    if backend is None:
+        from scholarly import scholarly as backend
+    limiter = HostRateLimiter(rate_per_sec)
+    cache = ScholarCache(ttl_days=ttl_days) if use_cache else None
+    try:
+        for profile in scholar_profiles:
+            start = time.perf_counter()
+            try:
+                profile['model'] = scholar_model(profile['scholar'], backend, cache, limiter, max_workers)
+            except Exception as e:
+                profile['error'] = f"{type(e).__name__}: {e}"
+            profile['fetch_s'] = time.perf_counter() - start
+    finally:
+        if cache is not None:
+            cache.close()
+
+
+def build_profile(job):
+    """
+    Worker: load one profile and write its CV. `job` is (profile, out_dir,
+    updated, css_link). Returns the profile's report entry.
+    """
+    profile, out_dir, updated, css_link = job
+    recorder.reset()
+    start = time.perf_counter()
+    report = {'id': profile['id'], 'source': profile.get('dir') or profile.get('scholar')}
+    if 'error' in profile:
+        report['error'] = profile['error']
+    else:
+        try:
+            model = profile.get('model')
+            if model is None:
+                if not os.path.exists(os.path.join(profile['dir'], '_config.yml')):
+                    raise FileNotFoundError(f"no _config.yml in {profile['dir']}")
+                with span('read', profile['dir']):
+                    model = load_site_data(profile['dir'], defaults=False)
+            path = os.path.join(out_dir, profile['id'], 'cv.html')
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            write_cv_html(model, path, updated, cache_file=os.path.join(CACHE_DIR, profile['id'] + '.json'),
+                          css=css_link, fonts_css=GOOGLE_FONTS_CSS, pdf_manifest=None)
+            report['output'] = os.path.relpath(path, out_dir)
+            report['publications'] = len(model.publications)
+        except Exception as e:
+            report['error'] = f"{type(e).__name__}: {e}"
+    report['seconds'] = round(time.perf_counter() - start + profile.get('fetch_s', 0), 4)
+    report['phases'] = {phase: round(s, 4) for phase, s in recorder.phase_totals().items()}
+    if 'fetch_s' in profile:
+        report['phases']['fetch'] = round(profile['fetch_s'], 4)
+    return report
+
+
+def write_shared_css(out_dir):
+    """Write the CV stylesheet once for every profile; returns the <link> they use."""
+    css = re.sub(r'^\s*<style>|</style>\s*$', '', CV_CSS)
+    atomic_write(os.path.join(out_dir, SHARED_CSS), css.strip() + '\n')
+    return f'<link rel="stylesheet" href="../{SHARED_CSS}">'
+
+
+def batch_cv(profiles, out_dir=DEFAULT_OUT, max_workers=None, updated=None):
+    """Render every profile's CV; returns the report dict written to report.json."""
+    start = time.perf_counter()
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    css_link = write_shared_css(out_dir)
+    updated = updated or datetime.now().strftime('%B %Y')
+    jobs = [(profile, out_dir, updated, css_link) for profile in profiles]
+    # Rendering one CV takes milliseconds: hand out several per task
+    chunksize = max(1, len(jobs) // ((max_workers or os.cpu_count() or 1) * 4))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(build_profile, jobs, chunksize=chunksize))
+
+    wall = time.perf_counter() - start
+    busy = sum(r['seconds'] for r in results)
+    report = {
+        'generated': datetime.now().isoformat(timespec='seconds'),
+        'profiles': results,
+        'ok': sum('error' not in r for r in results),
+        'failed': sum('error' in r for r in results),
+        'wall_s': round(wall, 4),
+        'profile_s': round(busy, 4),
+        'workers': max_workers or os.cpu_count(),
+    }
+    atomic_write(os.path.join(out_dir, 'report.json'), json.dumps(report, indent=2) + '\n')
+    return report
+
+
+def print_report(report):
+    for entry in report['profiles']:
+        if 'error' in entry:
+            print(f"❌ {entry['id']}: {entry['error']}")
+            continue
+        phases = ", ".join(f"{phase} {s * 1000:.0f} ms" for phase, s in entry['phases'].items())
+        print(f"✅ {entry['id']}: {entry['publications']} publications in {entry['seconds'] * 1000:.0f} ms ({phases})")
+    print(f"📊 {report['ok']} CV(s) written, {report['failed']} failed in {report['wall_s']:.2f}s "
+          f"({report['profile_s']:.2f}s of profile work on {report['workers']} worker(s))")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a CV for every profile in a roster")
+    parser.add_argument('roster', help="YAML list of site directories and/or Google Scholar IDs")
+    parser.add_argument('--out', default=DEFAULT_OUT, help="Output directory (default: build/cvs)")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument('--scholar-workers', type=int, default=DEFAULT_WORKERS,
+                        help="Publications filled concurrently per Scholar profile")
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE,
+                        help="Maximum Google Scholar requests per second, across all profiles")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Refill every Scholar publication instead of using the local cache")
+    parser.add_argument('--cache-ttl-days', type=float, default=DEFAULT_TTL_DAYS,
+                        help="Refill cached publications older than this many days")
+    args = parser.parse_args()
+
+    try:
+        profiles = load_roster(args.roster)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    if not profiles:
+        print(f"Error: no profiles in {args.roster}")
+        sys.exit(1)
+
+    try:
+        fetch_scholar_profiles(profiles, max_workers=args.scholar_workers, rate_per_sec=args.rate,
+                               use_cache=not args.no_cache, ttl_days=args.cache_ttl_days)
+    except ImportError:
+        print("Error: scholarly is required for Scholar IDs in the roster (pip install scholarly)")
+        sys.exit(1)
+
+    report = batch_cv(profiles, args.out, max_workers=args.workers)
+    print_report(report)
+    print(f"Report written to {os.path.relpath(os.path.join(args.out, 'report.json'))}")
+    if report['failed']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
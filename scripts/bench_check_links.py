@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Offline harness for the external link checker.
+
+Starts `FakeLinkServer` and runs `check_external` against it: redirects
+(followed, and a redirect loop), a 404, a robot-blocked 403, a HEAD-only
+405, a timeout and a batch of plain pages. It checks every result against
+the expected state, re-runs to check that only the timed-out URL is probed
+again, checks that two caches saving to the same file keep each other's
+entries, and reports the timings.
+
+Usage:
+    python scripts/bench_check_links.py
+    python scripts/bench_check_links.py --pages 100 --latency 0.2 --workers 16 --per-host 4
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from check_links import LinkCache, check_external
+from fake_link_server import FakeLinkServer
+
+# path: (state, status, final path)
+EXPECTED = {
+    '/ok': ('ok', 200, '/ok'),
+    '/redirect/3': ('ok', 200, '/ok'),
+    '/loop': ('broken', 302, '/loop'),
+    '/missing': ('broken', 404, '/missing'),
+    '/blocked': ('blocked', 403, '/blocked'),
+    '/get-only': ('ok', 200, '/get-only'),
+    '/slow': ('error', None, '/slow'),
+}
+
+
+def check_results(server, results, expected):
+    failures = 0
+    for path, (state, status, final) in expected.items():
+        result = results[server.url(path)]
+        got = (result['state'], result['status'], result['final_url'])
+        if got != (state, status, server.url(final)):
+            print(f"❌ {path}: expected {state} {status}, got {got[0]} {got[1]} ({result.get('error', '')})")
+            failures += 1
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, default=40, help="Plain 200 pages checked besides the fixed cases")
+    parser.add_argument('--latency', type=float, default=0.05, help="Seconds slept per request by the server")
+    parser.add_argument('--timeout', type=float, default=0.5, help="Checker timeout (the slow page takes 4x)")
+    parser.add_argument('--workers', type=int, default=8, help="Concurrent checks")
+    parser.add_argument('--per-host', type=int, default=4, help="Max concurrent connections to the server")
+    args = parser.parse_args()
+
+    expected = dict(EXPECTED)
+    expected.update({f"/page/{i}": ('ok', 200, f"/page/{i}") for i in range(args.pages)})
+    failures = 0
+
+    with tempfile.TemporaryDirectory() as tmp, \
+            FakeLinkServer(latency=args.latency, slow=args.timeout * 4) as server:
+        cache_file = os.path.join(tmp, 'link_cache.json')
+        urls = [server.url(path) for path in expected]
+
+        print(f"Cold run: {len(urls)} URLs, {args.latency:.2f}s latency, {args.workers} workers...")
+        start = time.perf_counter()
+        cache = LinkCache(cache_file)
+        results = check_external(urls, cache, args.workers, args.per_host, args.timeout)
+        cache.save()
+        print(f"  {time.perf_counter() - start:.2f}s, {sum(server.requests.values())} requests")
+        failures += check_results(server, results, expected)
+
+        print("Cached run...")
+        before = {path: server.hits(path) for path in expected}
+        start = time.perf_counter()
+        results = check_external(urls, LinkCache(cache_file), args.workers, args.per_host, args.timeout)
+        print(f"  {time.perf_counter() - start:.2f}s, {sum(r.get('cached', False) for r in results.values())} cached")
+        failures += check_results(server, results, expected)
+        reprobed = sorted(path for path in expected if server.hits(path) != before[path])
+        if reprobed != ['/slow']:
+            print(f"❌ Expected only /slow to be probed again, got {reprobed}")
+            failures += 1
+
+        print("Concurrent cache saves...")
+        first, second = LinkCache(cache_file), LinkCache(cache_file)
+        first.put('https://first.example/', {'state': 'ok', 'status': 200, 'final_url': 'https://first.example/'})
+        second.put('https://second.example/', {'state': 'ok', 'status': 200, 'final_url': 'https://second.example/'})
+        first.save()
+        second.save()
+        merged = LinkCache(cache_file).entries
+        missing = [url for url in ('https://first.example/', 'https://second.example/', urls[0])
+                   if url not in merged]
+        if missing:
+            print(f"❌ Cache lost entries: {missing}")
+            failures += 1
+
+    if failures:
+        print(f"❌ {failures} check(s) failed")
+        sys.exit(1)
+    print(f"✅ Redirects, 404, 403, 405, timeout and cache behave as expected ({len(expected)} URLs)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark for the site generators.
+
+Builds synthetic sites (index.html plus _config.yml/_data/*.yml) with 10,
+100, 1,000 and 10,000 publications (and a quarter as many awards) and times
+each phase separately:
+
+  parse_html     site_model.parse_site_html on the fixture index.html
+  parse_data     site_data.load_site_data on the fixture _data/*.yml
+  merge          archive/update_publications.py: index the existing list,
+                 de-duplicate n/10 incoming entries (half of them repeats)
+                 and splice the new ones into index.html
+  render_cv      generate_cv.generate_cv_html
+  render_readme  update_readme.generate_readme
+
+Each phase runs once to warm up, --repeat times timed (median and min are
+kept; comparisons use the min) and once more under tracemalloc for its peak
+allocation. Results go to a JSON file together with
+the commit they were measured on; --compare against an earlier file prints
+the ratios and exits with status 1 if any phase got slower (or hungrier)
+than --threshold allows.
+
+Usage:
+    python scripts/bench_generators.py
+    python scripts/bench_generators.py --sizes 10 100 --repeat 5
+    python scripts/bench_generators.py --compare .cache/bench/generators-1a2b3c4.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+# Appended, not prepended: archive/ has its own (older) generate_cv.py and update_readme.py
+sys.path.append(os.path.join(ROOT_DIR, 'archive'))
+
+import yaml
+
+import generate_cv
+import update_readme
+import update_publications
+from pub_index import PublicationIndex
+from site_data import load_site_data
+from site_model import parse_site_html
+
+DEFAULT_SIZES = (10, 100, 1000, 10000)
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.2
+# Differences below this are timer noise, whatever the ratio
+MIN_DELTA_SECONDS = 0.002
+MIN_DELTA_KB = 64
+BENCH_DIR = os.path.join(ROOT_DIR, '.cache', 'bench')
+PHASES = ('parse_html', 'parse_data', 'merge', 'render_cv', 'render_readme')
+FIXED_UPDATED = 'January 2025'
+
+WORDS = ("spatial temporal urban mobility network graph bayesian deep learning remote sensing "
+         "land cover accessibility equity sleep quality traffic accident co-location pattern "
+         "point process kriging autocorrelation regression geographically weighted model "
+         "social infrastructure event simulation segmentation imagery census tract "
+         "neighborhood health exposure cyberinfrastructure workflow reproducible").split()
+SURNAMES = ("Yuan Wu Griffith Maxwell Kim Conway Chen Li Zhang Garcia Smith Patel Nguyen "
+            "Kane Ho Qiu Tiefelsdorf Lee Brown Davis").split()
+JOURNALS = ("Transactions in GIS", "International Journal of Geographical Information Science",
+            "ISPRS International Journal of Geo-Information", "PLoS One", "Information",
+            "Annals of the American Association of Geographers", "Computers, Environment and Urban Systems")
+ORGANIZATIONS = ("National Science Foundation", "University of Texas at Dallas",
+                 "American Association of Geographers (AAG)", "UCGIS", "International Cartographic Association")
+
+
+# --- Fixtures --------------------------------------------------------------
+
+def synthetic_publications(count, rng):
+    """`count` publication dicts in the shape archive/update_publications.py parses."""
+    publications = []
+    for i in range(count):
+        title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 14))).capitalize() + f" {i}"
+        authors = [f"{rng.choice(SURNAMES)}, {chr(65 + rng.randrange(26))}." for _ in range(rng.randint(1, 5))]
+        authors.insert(rng.randrange(len(authors) + 1), "<b>Yang, Y.</b>")
+        publications.append({
+            'authors': ", ".join(authors),
+            'year': str(rng.randint(2012, 2025)),
+            'title': title,
+            'journal': rng.choice(JOURNALS),
+            'volume': str(rng.randint(1, 40)),
+            'issue': str(rng.randint(1, 12)),
+            'pages': f"{rng.randint(1, 900)}-{rng.randint(901, 1800)}",
+            'doi_url': f"https://doi.org/10.5555/bench.{i:06d}",
+            'type': 'journal',
+        })
+    publications.sort(key=lambda p: p['year'], reverse=True)
+    return publications
+
+
+def synthetic_awards(count, rng):
+    return sorted(({'year': rng.randint(2012, 2025),
+                    'title': " ".join(rng.choice(WORDS) for _ in range(4)).title() + f" Award {i}",
+                    'organization': rng.choice(ORGANIZATIONS),
+                    'link': f"https://example.org/awards/{i}"} for i in range(count)),
+                  key=lambda a: a['year'], reverse=True)
+
+
+def _replace_list(content, opener, items):
+    """Replace the <li> items of the first <ul> after `opener` with `items`."""
+    start = content.index('<ul', content.index(opener))
+    start = content.index('>', start) + 1
+    end = content.index('</ul>', start)
+    body = "".join(f"\n{update_publications.ITEM_INDENT}{item}" for item in items)
+    closing_indent = update_publications.LIST_END[:-len(update_publications.LIST_CLOSE)]
+    return content[:start] + body + "\n" + closing_indent + content[end:]
+
+
+def make_fixture(size, directory, seed=0):
+    """
+    Write a synthetic site with `size` publications under `directory`.
+    Returns the incoming publications used by the merge phase.
+    """
+    rng = random.Random(seed * 100003 + size)
+    publications = synthetic_publications(size, rng)
+    awards = synthetic_awards(max(5, size // 4), rng)
+
+    os.makedirs(os.path.join(directory, '_data'), exist_ok=True)
+    for name in ('_config.yml', '_data/education.yml', '_data/experience.yml'):
+        shutil.copy(os.path.join(ROOT_DIR, name), os.path.join(directory, name))
+
+    entries = [{'title': p['title'],
+                'authors': p['authors'].replace('<b>Yang, Y.</b>', '**Yalin Yang**').replace(', ', ' and '),
+                'year': int(p['year']),
+                'journal': f"{p['journal']}, {p['volume']}({p['issue']}), {p['pages']}",
+                'link': p['doi_url']} for p in publications]
+    with open(os.path.join(directory, '_data', 'publications.yml'), 'w', encoding='utf-8') as f:
+        yaml.safe_dump(entries, f, allow_unicode=True, sort_keys=False)
+    with open(os.path.join(directory, '_data', 'awards.yml'), 'w', encoding='utf-8') as f:
+        yaml.safe_dump(awards, f, allow_unicode=True, sort_keys=False)
+
+    with open(os.path.join(ROOT_DIR, 'index.html'), 'r', encoding='utf-8') as f:
+        content = f.read()
+    content = _replace_list(content, update_publications.LIST_OPEN,
+                            [update_publications.generate_html_li(p) for p in publications])
+    content = _replace_list(content, 'Grants & Awards', [
+        f'<li style="margin: 10px">{a["year"]}  <a href="{a["link"]}" target="_blank">{a["title"]}</a> '
+        f'{a["organization"]}</li>' for a in awards])
+    with open(os.path.join(directory, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(content)
+    with open(os.path.join(directory, 'index.pristine.html'), 'w', encoding='utf-8') as f:
+        f.write(content)
+
+    # Half re-imports of existing entries, half genuinely new ones
+    incoming = rng.sample(publications, min(len(publications), max(1, size // 20)))
+    incoming += [dict(p, doi_url=p['doi_url'].replace('bench.', 'bench.new.'))
+                 for p in synthetic_publications(max(1, size // 20), random.Random(seed + size + 1))]
+    return incoming
+
+
+# --- Phases ----------------------------------------------------------------
+
+def merge_publications(html_file, model, incoming):
+    """The archive updater's flow, minus the printing."""
+    index = PublicationIndex.from_publications(model.publications)
+    new_items = []
+    for pub in incoming:
+        if index.find(pub['title'], doi=pub['doi_url']) is None:
+            index.add(pub, pub['title'], doi=pub['doi_url'])
+            new_items.append(pub)
+    new_items.sort(key=lambda p: p['year'], reverse=True)
+    update_publications.update_html_file(html_file, [update_publications.generate_html_li(p) for p in new_items])
+    return len(new_items)
+
+
+def phase_runners(directory, incoming):
+    """{phase: (setup, run)}; setup() returns the argument passed to run()."""
+    html_file = os.path.join(directory, 'index.html')
+    pristine = os.path.join(directory, 'index.pristine.html')
+    with open(pristine, 'r', encoding='utf-8') as f:
+        content = f.read()
+    html_model = parse_site_html(content)
+    data_model = load_site_data(directory)
+
+    def fresh_html():
+        shutil.copy(pristine, html_file)
+        return None
+
+    return {
+        'parse_html': (lambda: content, parse_site_html),
+        'parse_data': (lambda: directory, load_site_data),
+        'merge': (fresh_html, lambda _: merge_publications(html_file, html_model, incoming)),
+        'render_cv': (lambda: data_model, lambda m: generate_cv.generate_cv_html(m, FIXED_UPDATED)),
+        'render_readme': (lambda: data_model, lambda m: update_readme.generate_readme(
+            update_readme.readme_info(m), FIXED_UPDATED)),
+    }
+
+
+def measure(setup, run, repeat):
+    """
+    Median/min wall time over `repeat` runs, after one untimed warm-up run
+    (lazy imports, caches), then one traced run for peak memory.
+    """
+    run(setup())
+    times = []
+    for _ in range(repeat):
+        arg = setup()
+        start = time.perf_counter()
+        run(arg)
+        times.append(time.perf_counter() - start)
+    arg = setup()
+    tracemalloc.start()
+    try:
+        run(arg)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'median_s': statistics.median(times), 'min_s': min(times), 'peak_kb': round(peak / 1024, 1)}
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, phases=PHASES, repeat=DEFAULT_REPEAT, keep_dir=None, log=print):
+    results = {}
+    base = keep_dir or tempfile.mkdtemp(prefix='bench-generators-')
+    try:
+        for size in sizes:
+            directory = os.path.join(base, f"n{size}")
+            incoming = make_fixture(size, directory)
+            runners = phase_runners(directory, incoming)
+            results[str(size)] = {}
+            for phase in phases:
+                setup, run = runners[phase]
+                stats = measure(setup, run, repeat)
+                results[str(size)][phase] = stats
+                log(f"  n={size:<6} {phase:<14} {stats['median_s'] * 1000:9.1f} ms   "
+                    f"peak {stats['peak_kb']:9.1f} KB")
+    finally:
+        if keep_dir is None:
+            shutil.rmtree(base, ignore_errors=True)
+    return results
+
+
+# --- Reporting -------------------------------------------------------------
+
+def git_revision(root=ROOT_DIR):
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=root, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    Rows of (size, phase, metric, old, new, ratio, regressed) for every
+    measurement present in both result sets.
+    """
+    rows = []
+    for size, phases in current['results'].items():
+        for phase, stats in phases.items():
+            old = baseline['results'].get(size, {}).get(phase)
+            if not old:
+                continue
+            # The minimum is the least noisy estimate of the cost of the code itself
+            for metric, min_delta in (('min_s', MIN_DELTA_SECONDS), ('peak_kb', MIN_DELTA_KB)):
+                before, after = old[metric], stats[metric]
+                ratio = after / before if before else float('inf')
+                regressed = ratio > 1 + threshold and after - before > min_delta
+                rows.append((size, phase, metric, before, after, ratio, regressed))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the site generators on synthetic profiles")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help="Publication counts to generate fixtures for")
+    parser.add_argument('--phases', nargs='+', choices=PHASES, default=list(PHASES), help="Phases to time")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="Timed runs per phase")
+    parser.add_argument('--output', help="Results file (default: .cache/bench/generators-<commit>.json)")
+    parser.add_argument('--compare', metavar='BASELINE', help="Earlier results file to compare against")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown before flagging a regression (0.2 = 20%%)")
+    parser.add_argument('--keep-fixtures', metavar='DIR', help="Write fixtures to DIR and keep them")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        if not os.path.exists(args.compare):
+            print(f"Error: {args.compare} not found!")
+            sys.exit(1)
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    revision = git_revision()
+    print(f"📊 Benchmarking {', '.join(args.phases)} at n = {', '.join(map(str, args.sizes))} "
+          f"({args.repeat} runs each)")
+    results = run_benchmarks(args.sizes, args.phases, args.repeat, args.keep_fixtures)
+    report = {
+        'revision': revision,
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'results': results,
+    }
+
+    output = args.output or os.path.join(BENCH_DIR, f"generators-{revision or 'worktree'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+        f.write('\n')
+    print(f"✅ Results written to {os.path.relpath(output)}")
+
+    if baseline:
+        rows = compare(baseline, report, args.threshold)
+        print(f"\nCompared with {baseline.get('revision') or args.compare}:")
+        for size, phase, metric, before, after, ratio, regressed in rows:
+            unit, scale = ('ms', 1000) if metric == 'min_s' else ('KB', 1)
+            mark = "❌" if regressed else "  "
+            print(f"{mark} n={size:<6} {phase:<14} {metric:<9} {before * scale:10.1f} → "
+                  f"{after * scale:10.1f} {unit}  ({ratio:.2f}x)")
+        regressions = sum(1 for row in rows if row[-1])
+        if regressions:
+            print(f"❌ {regressions} regression(s) above {args.threshold:.0%}")
+            sys.exit(1)
+        print("✅ No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Offline harness for the Scholar enrichment pool.
+
+Runs `fill_publications` against `FakeScholarly` with injected latency, once
+serially and once with the requested concurrency, checks that both runs
+produce identical output in identical order, and reports the speedup. With
+--cassette the publications of a recorded cassette (scripts/scholar_replay.py)
+are replayed instead of synthetic ones.
+
+Usage:
+    python scripts/bench_scholar_pool.py --pubs 60 --latency 0.2 --workers 8
+    python scripts/bench_scholar_pool.py --cassette .cache/scholar.cassette.json.gz --latency 0.2
+"""
+
+import argparse
+import sys
+import time
+
+from fake_scholarly import FakeScholarly
+from scholar_pool import fill_publications
+from scholar_replay import ReplayScholarly
+
+
+def cassette_author(path):
+    """The first author id recorded in a cassette."""
+    backend = ReplayScholarly(path)
+    return min(key.split(':', 1)[1] for key in backend.responses if key.startswith('author:'))
+
+
+def run(n_pubs, latency, jitter, fail_rate, workers, rate, cassette=None):
+    if cassette:
+        backend = ReplayScholarly(cassette, latency=latency, jitter=jitter)
+        author = backend.fill(backend.search_author_id(cassette_author(cassette)), sections=['publications'])
+    else:
+        backend = FakeScholarly(n_pubs=n_pubs, latency=latency, jitter=jitter, fail_rate=fail_rate)
+        author = backend.fill(backend.search_author_id("FAKE0000000J"), sections=['publications'])
+
+    start = time.perf_counter()
+    results = fill_publications(author['publications'], backend.fill, max_workers=workers,
+                                rate_per_sec=rate, base_delay=0.05)
+    elapsed = time.perf_counter() - start
+    return results, elapsed, backend
+
+
+def summarize(results):
+    return [(r.source.get('author_pub_id'), r.filled['bib'].get('journal') if r.filled else None)
+            for r in results]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pubs', type=int, default=40, help="Number of synthetic publications")
+    parser.add_argument('--latency', type=float, default=0.1, help="Seconds slept per fake call")
+    parser.add_argument('--jitter', type=float, default=0.05, help="Extra random latency per call")
+    parser.add_argument('--fail-rate', type=float, default=0.1, help="Share of fills that fail once")
+    parser.add_argument('--workers', type=int, default=8, help="Pool size for the concurrent run")
+    parser.add_argument('--rate', type=float, default=0, help="Per-host requests/second (0 = unlimited)")
+    parser.add_argument('--cassette', help="Replay the publications recorded in this cassette instead")
+    args = parser.parse_args()
+
+    source = args.cassette or f"{args.pubs} publications"
+    print(f"Serial run: {source}, {args.latency:.2f}s latency...")
+    serial, serial_time, _ = run(args.pubs, args.latency, args.jitter, args.fail_rate, 1, args.rate,
+                                 args.cassette)
+    print(f"  {serial_time:.2f}s")
+
+    print(f"Pooled run: {args.workers} workers...")
+    pooled, pooled_time, backend = run(args.pubs, args.latency, args.jitter, args.fail_rate,
+                                       args.workers, args.rate, args.cassette)
+    print(f"  {pooled_time:.2f}s (max {backend.max_in_flight} requests in flight)")
+
+    if summarize(serial) != summarize(pooled):
+        print("❌ Pooled output differs from serial output")
+        sys.exit(1)
+
+    failures = sum(1 for r in pooled if r.error)
+    print(f"✅ Identical, ordered output ({failures} unrecovered failures)")
+    print(f"⚡ Speedup: {serial_time / pooled_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
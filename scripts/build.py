@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Content-hash build driver for the generated files (cv.html, README.md).
+
+Every output records the SHA-256 of its inputs (the site data or index.html,
+the generator script and every repository module it imports, plus any data
+files it reads) in `.cache/build_manifest.json`. Outputs whose
+inputs are unchanged are skipped without loading the site model.
+
+The "Last updated" stamp is pinned to the last content change: a stale
+output is first re-rendered with its previous stamp (from the manifest, or
+read back from the committed output on a fresh clone), and only if that
+differs from the file on disk is it rendered again with the current time.
+Re-running the build, or touching a generator without changing its output,
+therefore never produces a git diff.
+
+Usage:
+    python scripts/build.py               # rebuild what changed
+    python scripts/build.py --dry-run     # list stale outputs
+    python scripts/build.py --force       # rebuild everything
+    python scripts/build.py --from-html   # build from index.html instead of _data/*.yml
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import re
+import sys
+from datetime import datetime
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from fsutil import atomic_write, file_sha256
+from site_data import DATA_FILES, load_site_data
+from site_model import load_site_model
+
+MANIFEST_FILE = os.path.join(ROOT_DIR, '.cache', 'build_manifest.json')
+MANIFEST_VERSION = 1
+
+# Inputs shared by every output, per source of the site model
+MODEL_INPUTS = {
+    'data': DATA_FILES + ['scripts/site_data.py', 'scripts/site_model.py'],
+    'html': ['index.html', 'scripts/site_model.py'],
+}
+
+
+def _render_cv(model, updated, html_file):
+    import generate_cv
+    return "".join(generate_cv.iter_cv_html(model, updated))
+
+
+def _render_readme(model, updated, html_file):
+    import update_readme
+    if html_file:
+        info = update_readme.extract_info_from_html(html_file)
+    else:
+        info = update_readme.readme_info(model)
+    return update_readme.generate_readme(info, updated)
+
+
+# output -> generator script, other files it reads, stamp format, pattern
+# of the stamp in the output, render(model, updated, html_file or None)
+TARGETS = {
+    'cv.html': ('generate_cv.py', ['css/fonts.css', 'files/pdf_manifest.json'], '%B %Y',
+                r'Last updated: ([A-Z][a-z]+ \d{4})', _render_cv),
+    'README.md': ('update_readme.py', [], '%Y-%m-%d %H:%M:%S',
+                  r'Last updated: (\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})', _render_readme),
+}
+# Where the generators find their imports, in sys.path order
+IMPORT_DIRS = ('scripts', '')
+
+
+def module_sources(script, root=ROOT_DIR):
+    """
+    `script` plus every repository module it imports, directly or through
+    other modules (imports inside functions included), sorted.
+    """
+    found = set()
+    pending = [script]
+    while pending:
+        path = pending.pop()
+        if path in found:
+            continue
+        found.add(path)
+        with open(os.path.join(root, path), 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read(), path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                rel = name.replace('.', '/') + '.py'
+                for directory in IMPORT_DIRS:
+                    candidate = os.path.join(directory, rel) if directory else rel
+                    if os.path.exists(os.path.join(root, candidate)):
+                        pending.append(candidate)
+                        break
+    return sorted(found)
+
+
+def output_stamp(path, pattern, stamp_format):
+    """The "Last updated" stamp of an existing output (ISO format), or None."""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        match = re.search(pattern, f.read())
+    try:
+        return datetime.strptime(match.group(1), stamp_format).isoformat(timespec='seconds') if match else None
+    except ValueError:
+        return None
+
+
+def input_hashes(paths, root=ROOT_DIR):
+    """{path: sha256} for the given inputs; missing files hash to None."""
+    hashes = {}
+    for path in paths:
+        full = os.path.join(root, path)
+        hashes[path] = file_sha256(full) if os.path.exists(full) else None
+    return hashes
+
+
+def load_manifest(path=MANIFEST_FILE):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('version') != MANIFEST_VERSION:
+        return {}
+    return manifest.get('outputs', {})
+
+
+def save_manifest(outputs, path=MANIFEST_FILE):
+    atomic_write(path, json.dumps({'version': MANIFEST_VERSION, 'outputs': outputs},
+                                  indent=2, sort_keys=True))
+
+
+def build(targets=None, from_html=False, force=False, dry_run=False,
+          root=ROOT_DIR, manifest_file=MANIFEST_FILE, now=None):
+    """
+    Rebuild the stale outputs among `targets` (default: all).
+    Returns {output: 'fresh' | 'stale' | 'unchanged' | 'written'}.
+    """
+    mode = 'html' if from_html else 'data'
+    html_file = os.path.join(root, 'index.html') if from_html else None
+    manifest = load_manifest(manifest_file)
+    model = None
+    status = {}
+
+    for output in targets or TARGETS:
+        script, data_files, stamp_format, stamp_pattern, render = TARGETS[output]
+        out_path = os.path.join(root, output)
+        sources = module_sources(script, root) + data_files
+        hashes = input_hashes(MODEL_INPUTS[mode] + sources, root)
+        entry = manifest.get(output)
+
+        fresh = (entry is not None and entry.get('inputs') == hashes
+                 and os.path.exists(out_path) and entry.get('output') == file_sha256(out_path))
+        if fresh and not force:
+            status[output] = 'fresh'
+            continue
+        if dry_run:
+            status[output] = 'stale'
+            continue
+
+        if model is None:
+            model = load_site_model(html_file) if from_html else load_site_data(root)
+
+        current = file_sha256(out_path) if os.path.exists(out_path) else None
+        content = None
+        # No manifest (a fresh clone or CI): keep the stamp of the committed output
+        updated = entry.get('updated') if entry else output_stamp(out_path, stamp_pattern, stamp_format)
+        if updated:
+            # Same stamp as last time: if nothing visible changed, keep the file
+            content = render(model, datetime.fromisoformat(updated).strftime(stamp_format), html_file)
+            if hashlib.sha256(content.encode('utf-8')).hexdigest() != current:
+                content = None
+        if content is None:
+            updated = (now or datetime.now()).isoformat(timespec='seconds')
+            content = render(model, datetime.fromisoformat(updated).strftime(stamp_format), html_file)
+
+        digest = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        if digest != current:
+            atomic_write(out_path, content)
+            status[output] = 'written'
+        else:
+            status[output] = 'unchanged'
+        manifest[output] = {'inputs': hashes, 'output': digest, 'updated': updated}
+
+    if not dry_run:
+        save_manifest(manifest, manifest_file)
+    return status
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild generated files whose inputs changed")
+    parser.add_argument('targets', nargs='*', metavar='TARGET',
+                        help=f"Outputs to build (default: all of {', '.join(TARGETS)})")
+    parser.add_argument('--from-html', action='store_true',
+                        help="Build from index.html instead of _data/*.yml")
+    parser.add_argument('--force', action='store_true', help="Rebuild even if inputs are unchanged")
+    parser.add_argument('--dry-run', action='store_true', help="Only report which outputs are stale")
+    args = parser.parse_args()
+    unknown = set(args.targets) - set(TARGETS)
+    if unknown:
+        parser.error(f"unknown target(s): {', '.join(sorted(unknown))}")
+
+    status = build(args.targets or None, from_html=args.from_html,
+                   force=args.force, dry_run=args.dry_run)
+    icons = {'fresh': '⏭️ ', 'stale': '🔄', 'unchanged': '✅', 'written': '✅'}
+    labels = {'fresh': 'up to date', 'stale': 'stale', 'unchanged': 'rebuilt, content unchanged',
+              'written': 'written'}
+    for output, state in status.items():
+        print(f"{icons[state]} {output}: {labels[state]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+Bundle, purge and minify the site's local CSS and JavaScript.
+
+The stylesheets and scripts listed in CSS_SOURCES / JS_SOURCES are
+concatenated into fingerprinted bundles (css/dist/site.<hash>.css,
+js/dist/site.<hash>.js) and spliced into index.html between marker
+comments:
+
+    <!-- bundle:css --> ... <!-- /bundle:css -->
+    <!-- bundle:js --> ... <!-- /bundle:js -->
+
+js/modal-fragments.js (LAZY_JS_SOURCES) is only added for pages with lazy
+modal bodies, i.e. after render_sections.py --lazy.
+
+CSS rules whose selectors reference a class, id or element that appears
+neither in index.html/cv.html nor in the bundled scripts are dropped. The
+rules matching the above-the-fold markup (<nav> and <header>) are inlined
+in a <style> block and the full bundle is loaded without blocking render.
+The script bundle is loaded with `defer`.
+
+JavaScript is minified with rjsmin when it is installed (`pip install
+rjsmin`); otherwise it is only concatenated with comment-free blank lines
+removed. `--dev` restores the individual, unbundled tags.
+
+Usage:
+    python scripts/bundle_assets.py           # build bundles, rewrite index.html
+    python scripts/bundle_assets.py --dev     # switch back to the source files
+"""
+
+import argparse
+import glob
+import hashlib
+import os
+import re
+import sys
+
+from fsutil import atomic_write, file_lock
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_HTML_FILE = os.path.join(ROOT_DIR, 'index.html')
+SCANNED_PAGES = ['index.html', 'cv.html']
+# Lazy modal bodies (render_sections.py --lazy) use classes the page no longer has
+SCANNED_FRAGMENTS = 'fragments'
+
+# Load order matters: jQuery first, the theme script last
+CSS_SOURCES = [
+    'css/style.css',
+    'css/font-awesome/css/font-awesome.min.css',
+]
+JS_SOURCES = [
+    'js/jquery-1.11.0.js',
+    'js/bootstrap.min.js',
+    'js/jquery.easing.min.js',
+    'js/classie.js',
+    'js/cbpAnimatedHeader.js',
+    'js/jqBootstrapValidation.js',
+    'js/contact_me.js',
+    'js/agency.js',
+]
+# Appended only for pages with lazy modal bodies (render_sections.py --lazy)
+LAZY_JS_SOURCES = ['js/modal-fragments.js']
+LAZY_MARKER = 'data-fragment='
+CSS_DIST = 'css/dist'
+JS_DIST = 'js/dist'
+
+# Elements treated as above the fold when extracting critical CSS
+CRITICAL_ROOTS = ['nav', 'header']
+MARKER_RE = r'([ \t]*)<!-- bundle:{kind} -->.*?<!-- /bundle:{kind} -->'
+
+
+# --- CSS parsing -----------------------------------------------------------
+
+def strip_css_comments(css):
+    """Drop /* */ comments, leaving string literals alone."""
+    return re.sub(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|/\*.*?\*/',
+                  lambda m: m.group(1) or '', css, flags=re.S)
+
+
+def _block_end(css, start):
+    """Index of the '}' closing the block opened just before `start`."""
+    depth, i, quote = 1, start, None
+    while i < len(css):
+        c = css[i]
+        if quote:
+            if c == '\\':
+                i += 1
+            elif c == quote:
+                quote = None
+        elif c in '"\'':
+            quote = c
+        elif c == '{':
+            depth += 1
+        elif c == '}':
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return len(css)
+
+
+def parse_css(css):
+    """
+    Parse comment-free CSS into a list of nodes:
+      ('rule', selector, declarations)  style rules
+      ('group', prelude, [nodes])       @media / @supports blocks
+      ('at', prelude, body or None)     everything else (@font-face, @keyframes, @import)
+    """
+    nodes, i = [], 0
+    while i < len(css):
+        brace, semi = css.find('{', i), css.find(';', i)
+        if brace == -1 and semi == -1:
+            break
+        prelude_end = brace if brace != -1 and (semi == -1 or brace < semi) else semi
+        prelude = css[i:prelude_end].strip()
+        if prelude_end == semi:
+            # A statement at-rule such as @import or @charset
+            if prelude:
+                nodes.append(('at', prelude, None))
+            i = semi + 1
+            continue
+        end = _block_end(css, brace + 1)
+        body = css[brace + 1:end]
+        if re.match(r'@(?:-\w+-)?(?:media|supports|document)\b', prelude):
+            nodes.append(('group', prelude, parse_css(body)))
+        elif prelude.startswith('@'):
+            nodes.append(('at', prelude, body))
+        elif prelude:
+            nodes.append(('rule', prelude, body))
+        i = end + 1
+    return nodes
+
+
+def split_selectors(selector):
+    """Split a selector list on top-level commas (not inside () or [])."""
+    parts, depth, current = [], 0, []
+    for c in selector:
+        if c in '([':
+            depth += 1
+        elif c in ')]':
+            depth -= 1
+        if c == ',' and depth == 0:
+            parts.append(''.join(current).strip())
+            current = []
+        else:
+            current.append(c)
+    parts.append(''.join(current).strip())
+    return [p for p in parts if p]
+
+
+def selector_tokens(selector):
+    """Classes, ids and element names a single selector requires."""
+    simplified = re.sub(r'\[[^\]]*\]', '', selector)
+    simplified = re.sub(r'::?[\w-]+(?:\([^)]*\))?', '', simplified)
+    classes = set(re.findall(r'\.(-?[_a-zA-Z][\w-]*)', simplified))
+    ids = set(re.findall(r'#(-?[_a-zA-Z][\w-]*)', simplified))
+    tags = {t.lower() for t in re.findall(r'(?:^|[\s>+~])([a-zA-Z][\w-]*)', simplified)}
+    return classes, ids, tags
+
+
+def selector_used(selector, used):
+    classes, ids, tags = selector_tokens(selector)
+    return classes <= used['classes'] and ids <= used['ids'] and tags <= used['tags']
+
+
+def purge(nodes, used, keep_at_rules=True):
+    """Drop style rules (and selectors within them) that cannot match `used`."""
+    kept = []
+    for kind, prelude, body in nodes:
+        if kind == 'rule':
+            selectors = [s for s in split_selectors(prelude) if selector_used(s, used)]
+            if selectors:
+                kept.append(('rule', ','.join(selectors), body))
+        elif kind == 'group':
+            children = purge(body, used, keep_at_rules)
+            if children:
+                kept.append(('group', prelude, children))
+        elif keep_at_rules:
+            kept.append((kind, prelude, body))
+    return kept
+
+
+_STRING_RE = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')')
+
+
+def _squeeze(text, punctuation):
+    """Collapse whitespace and drop it around `punctuation`, outside string literals."""
+    parts = _STRING_RE.split(text)
+    for i in range(0, len(parts), 2):
+        part = re.sub(r'\s+', ' ', parts[i])
+        if punctuation:
+            part = re.sub(r'\s*([' + re.escape(punctuation) + r'])\s*', r'\1', part)
+        parts[i] = part
+    return ''.join(parts).strip()
+
+
+def _minify_selector(selector):
+    return _squeeze(selector, ',>+~')
+
+
+def _minify_declarations(body):
+    return _squeeze(body, ';:{},').rstrip(';')
+
+
+def render_css(nodes):
+    """Serialize parsed nodes as minified CSS."""
+    out = []
+    for kind, prelude, body in nodes:
+        if kind == 'rule':
+            out.append(f"{_minify_selector(prelude)}{{{_minify_declarations(body)}}}")
+        elif kind == 'group':
+            out.append(f"{_squeeze(prelude, '')}{{{render_css(body)}}}")
+        elif body is None:
+            out.append(_squeeze(prelude, '') + ';')
+        else:
+            out.append(f"{_squeeze(prelude, '')}{{{_minify_declarations(body)}}}")
+    return ''.join(out)
+
+
+def rebase_urls(css, source, dist_dir, root=ROOT_DIR):
+    """Rewrite relative url(...) references in `source` to be relative to `dist_dir`."""
+    source_dir = os.path.dirname(os.path.join(root, source))
+    target_dir = os.path.join(root, dist_dir)
+
+    def rebase(match):
+        url = match.group(2)
+        if re.match(r'^(?:[a-z]+:|//|/|#)', url, re.I):
+            return match.group(0)
+        path, suffix = re.match(r'^([^?#]*)(.*)$', url).groups()
+        new = os.path.relpath(os.path.join(source_dir, path), target_dir).replace(os.sep, '/')
+        return f"url({match.group(1)}{new}{suffix}{match.group(1)})"
+
+    return re.sub(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)', rebase, css)
+
+
+# --- Usage scan ------------------------------------------------------------
+
+def used_tokens(html_texts, js_texts=(), roots=None):
+    """
+    Classes, ids and element names used by the pages. With `roots`, only
+    the subtrees under those elements (plus <html>/<body>) are scanned.
+    Every identifier-like word in the scripts counts as a possible class
+    or id, since scripts add classes such as "navbar-shrink" at runtime.
+    """
+    from bs4 import BeautifulSoup
+
+    used = {'classes': set(), 'ids': set(), 'tags': {'html', 'body'}}
+    for text in html_texts:
+        soup = BeautifulSoup(text, 'html.parser')
+        elements = soup.find_all(True)
+        if roots is not None:
+            elements = [e for root in soup.find_all(roots) for e in [root] + root.find_all(True)]
+            elements += [e for e in (soup.html, soup.body) if e is not None]
+        for element in elements:
+            used['tags'].add(element.name.lower())
+            used['classes'].update(element.get('class', []))
+            if element.get('id'):
+                used['ids'].add(element['id'])
+    words = set()
+    for text in js_texts:
+        words.update(re.findall(r'[A-Za-z_][\w-]*', text))
+    used['classes'] |= words
+    used['ids'] |= words
+    return used
+
+
+# --- JavaScript ------------------------------------------------------------
+
+def minify_js(source):
+    try:
+        import rjsmin
+    except ImportError:
+        return '\n'.join(line.rstrip() for line in source.splitlines() if line.strip())
+    return rjsmin.jsmin(source)
+
+
+# --- Build -----------------------------------------------------------------
+
+def _read(path, root=ROOT_DIR):
+    with open(os.path.join(root, path), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def _fingerprinted(dist_dir, ext, content, root=ROOT_DIR):
+    """Write `content` to dist_dir/site.<hash>.ext, removing older bundles."""
+    digest = hashlib.sha256(content.encode('utf-8')).hexdigest()[:10]
+    rel = f"{dist_dir}/site.{digest}.{ext}"
+    path = os.path.join(root, rel)
+    for old in glob.glob(os.path.join(root, dist_dir, f'site.*.{ext}')):
+        if os.path.abspath(old) != os.path.abspath(path):
+            os.remove(old)
+    if not os.path.exists(path):
+        atomic_write(path, content)
+    return rel
+
+
+def page_js_sources(html_text):
+    """The scripts a page loads: JS_SOURCES, plus the modal loader if it has lazy modals."""
+    return JS_SOURCES + LAZY_JS_SOURCES if LAZY_MARKER in html_text else list(JS_SOURCES)
+
+
+def is_bundled(html_text):
+    """Whether the page's bundle:js region loads a built bundle rather than the sources."""
+    match = re.search(MARKER_RE.format(kind='js'), html_text, re.S)
+    return bool(match) and f'/{JS_DIST}/' in match.group()
+
+
+def build_bundles(root=ROOT_DIR, pages=SCANNED_PAGES):
+    """
+    Build both bundles. Returns a dict with the bundle paths, the critical
+    CSS and size statistics. The script bundle follows the first page's
+    `page_js_sources`.
+    """
+    page_texts = [_read(p, root) for p in pages if os.path.exists(os.path.join(root, p))]
+    js_paths = page_js_sources(page_texts[0] if page_texts else '')
+    js_sources = [_read(p, root) for p in js_paths]
+    js = ';\n'.join(minify_js(source) for source in js_sources) + '\n'
+
+    css = ''.join(rebase_urls(strip_css_comments(_read(p, root)), p, CSS_DIST, root)
+                  for p in CSS_SOURCES)
+    nodes = parse_css(css)
+    fragment_dir = os.path.join(root, SCANNED_FRAGMENTS)
+    if os.path.isdir(fragment_dir):
+        page_texts += [_read(f"{SCANNED_FRAGMENTS}/{name}", root) for name in sorted(os.listdir(fragment_dir))
+                       if name.endswith('.html')]
+    full = render_css(purge(nodes, used_tokens(page_texts, js_sources)))
+    # Classes added by scripts (modals, tooltips, the shrunk navbar) are not
+    # needed for the first paint, so the critical set scans the markup only
+    critical = render_css(purge(nodes, used_tokens(page_texts[:1], (), CRITICAL_ROOTS),
+                                keep_at_rules=False))
+
+    return {
+        'css': _fingerprinted(CSS_DIST, 'css', full + '\n', root),
+        'js': _fingerprinted(JS_DIST, 'js', js, root),
+        'critical': critical,
+        'sizes': {
+            'css_in': sum(os.path.getsize(os.path.join(root, p)) for p in CSS_SOURCES),
+            'css_out': len(full.encode('utf-8')),
+            'critical': len(critical.encode('utf-8')),
+            'js_in': sum(os.path.getsize(os.path.join(root, p)) for p in js_paths),
+            'js_out': len(js.encode('utf-8')),
+        },
+    }
+
+
+def _css_region(indent, bundles):
+    if bundles is None:
+        return '\n'.join(f'{indent}<link rel="stylesheet" href="/{p}">' for p in CSS_SOURCES)
+    href = '/' + bundles['css']
+    return (f'{indent}<style>{bundles["critical"]}</style>\n'
+            f'{indent}<link rel="preload" href="{href}" as="style" '
+            f'onload="this.onload=null;this.rel=\'stylesheet\'">\n'
+            f'{indent}<noscript><link rel="stylesheet" href="{href}"></noscript>')
+
+
+def _js_region(indent, bundles, sources=JS_SOURCES):
+    if bundles is None:
+        return '\n'.join(f'{indent}<script src="/{p}"></script>' for p in sources)
+    return f'{indent}<script src="/{bundles["js"]}" defer></script>'
+
+
+def rewrite_html(html_file, bundles):
+    """Replace the marker regions of `html_file`; `bundles=None` restores the source tags."""
+    with file_lock(html_file):
+        with open(html_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+        new_content = content
+        js_sources = page_js_sources(content)
+        for kind, region in (('css', _css_region),
+                             ('js', lambda indent, bundles: _js_region(indent, bundles, js_sources))):
+            pattern = re.compile(MARKER_RE.format(kind=kind), re.S)
+            if not pattern.search(new_content):
+                print(f"❌ No <!-- bundle:{kind} --> markers in {html_file}")
+                return False
+            new_content = pattern.sub(
+                lambda m: (f'{m.group(1)}<!-- bundle:{kind} -->\n{region(m.group(1), bundles)}\n'
+                           f'{m.group(1)}<!-- /bundle:{kind} -->'),
+                new_content, count=1)
+        if new_content != content:
+            atomic_write(html_file, new_content)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bundle and minify the site's CSS and JavaScript")
+    parser.add_argument('html_file', nargs='?', default=DEFAULT_HTML_FILE, help="Page to rewrite")
+    parser.add_argument('--dev', action='store_true',
+                        help="Restore the individual source tags instead of bundling")
+    args = parser.parse_args()
+
+    if args.dev:
+        if rewrite_html(args.html_file, None):
+            print(f"✅ Restored unbundled CSS/JS tags in {args.html_file}")
+        return
+
+    bundles = build_bundles()
+    if not rewrite_html(args.html_file, bundles):
+        sys.exit(1)
+    sizes = bundles['sizes']
+    print(f"✅ {bundles['css']}: {sizes['css_in'] / 1024:.0f} KB → {sizes['css_out'] / 1024:.0f} KB "
+          f"({sizes['critical'] / 1024:.1f} KB inlined as critical CSS)")
+    print(f"✅ {bundles['js']}: {sizes['js_in'] / 1024:.0f} KB → {sizes['js_out'] / 1024:.0f} KB (deferred)")
+
+
+if __name__ == "__main__":
+    main()
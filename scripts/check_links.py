@@ -0,0 +1,464 @@
+#!/usr/bin/env python3
+"""
+Check the links and asset references of the site.
+
+Every href/src/srcset in index.html and cv.html, and every link, image or
+inline <a> in _data/*.yml, is collected with its source line and checked:
+  * local paths are resolved against an in-memory index of the repository
+    (one set lookup per link), catching missing files, case mismatches that
+    only break on the case-sensitive GitHub Pages host, and stray spaces
+    such as `src=" img/research/fire02.png"`;
+  * external URLs are probed with HEAD (falling back to GET when a server
+    rejects HEAD) from a thread pool that keeps keep-alive connections per
+    host and never opens more than --per-host of them at once. Results are
+    cached in .cache/link_cache.json, so a re-run only probes new or
+    expired URLs.
+
+The full result is written as JSON to --report (default
+.cache/link_report.json) and the script exits with status 1 when anything is
+broken. Publishers that refuse robots (401/403/429) are reported as
+warnings, not failures.
+
+Usage:
+    python scripts/check_links.py
+    python scripts/check_links.py --offline          # local files only
+    python scripts/check_links.py --report -         # JSON report on stdout
+"""
+
+import argparse
+import http.client
+import json
+import os
+import posixpath
+import sys
+import threading
+import time
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from html.parser import HTMLParser
+from urllib.parse import unquote, urljoin, urlsplit
+
+from fsutil import atomic_write, file_lock
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SOURCES = [
+    'index.html',
+    'cv.html',
+    '_data/research.yml',
+    '_data/publications.yml',
+    '_data/awards.yml',
+    '_data/teaching.yml',
+]
+CACHE_FILE = os.path.join(ROOT_DIR, '.cache', 'link_cache.json')
+REPORT_FILE = os.path.join(ROOT_DIR, '.cache', 'link_report.json')
+SKIP_DIRS = {'.git', '.cache', '__pycache__', 'node_modules'}
+
+DEFAULT_WORKERS = 16
+DEFAULT_PER_HOST = 2
+DEFAULT_TIMEOUT = 15.0
+DEFAULT_TTL_DAYS = 7
+FAILED_TTL_DAYS = 1
+MAX_REDIRECTS = 5
+USER_AGENT = "Mozilla/5.0 (compatible; gisyaliny.github.io link checker)"
+
+LINK_ATTRS = ('href', 'src', 'srcset', 'data-src', 'poster')
+YAML_LINK_KEYS = ('link', 'url', 'href', 'thumbnail', 'image', 'images', 'pdf')
+SKIP_SCHEMES = ('mailto:', 'tel:', 'javascript:', 'data:')
+# Statuses publishers send to robots for pages that work in a browser
+BLOCKED_STATUSES = {401, 403, 429, 999}
+
+Link = namedtuple('Link', ['source', 'line', 'url'])
+
+
+class _LinkParser(HTMLParser):
+    def __init__(self, line_offset=0):
+        super().__init__(convert_charrefs=True)
+        self.line_offset = line_offset
+        self.found = []
+
+    def handle_starttag(self, tag, attrs):
+        line = self.getpos()[0] + self.line_offset
+        for name, value in attrs:
+            if name not in LINK_ATTRS or value is None:
+                continue
+            if name == 'srcset':
+                for candidate in value.split(','):
+                    if candidate.strip():
+                        self.found.append((line, candidate.split()[0]))
+            else:
+                self.found.append((line, value))
+
+    handle_startendtag = handle_starttag
+
+
+def html_links(text, line_offset=0):
+    """(line, url) for every link attribute in an HTML string."""
+    parser = _LinkParser(line_offset)
+    parser.feed(text)
+    parser.close()
+    return parser.found
+
+
+def yaml_links(path):
+    """
+    (line, url) for the link/image values of a YAML file and for the <a>/<img>
+    tags embedded in its strings. Uses the node tree so lines are exact.
+    """
+    import yaml
+    try:
+        from yaml import CSafeLoader as SafeLoader
+    except ImportError:
+        from yaml import SafeLoader
+
+    with open(path, 'r', encoding='utf-8') as f:
+        root = yaml.compose(f, Loader=SafeLoader)
+    found = []
+
+    def walk(node, key=None):
+        if isinstance(node, yaml.MappingNode):
+            for key_node, value in node.value:
+                walk(value, key_node.value)
+        elif isinstance(node, yaml.SequenceNode):
+            for item in node.value:
+                walk(item, key)
+        elif isinstance(node, yaml.ScalarNode) and isinstance(node.value, str):
+            line = node.start_mark.line + 1
+            if key in YAML_LINK_KEYS:
+                found.append((line, node.value))
+            elif '<' in node.value:
+                found.extend(html_links(node.value, line - 1))
+
+    if root is not None:
+        walk(root)
+    return found
+
+
+def extract_links(sources=DEFAULT_SOURCES, root=ROOT_DIR):
+    """Every Link in the given source files (missing sources are skipped)."""
+    links = []
+    for source in sources:
+        path = os.path.join(root, source)
+        if not os.path.exists(path):
+            continue
+        if source.endswith(('.yml', '.yaml')):
+            found = yaml_links(path)
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                found = html_links(f.read())
+        links.extend(Link(source, line, url) for line, url in found)
+    return links
+
+
+def is_external(url):
+    return url.startswith(('http://', 'https://', '//'))
+
+
+class FileIndex:
+    """Every file and directory in the site tree, for O(1) local link checks."""
+
+    def __init__(self, root=ROOT_DIR):
+        self.root = root
+        self.files = set()
+        self.dirs = {''}
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+            rel_dir = os.path.relpath(dirpath, root).replace(os.sep, '/')
+            rel_dir = '' if rel_dir == '.' else rel_dir + '/'
+            self.dirs.update(rel_dir + d for d in dirnames)
+            self.files.update(rel_dir + name for name in filenames)
+        self._folded = {path.casefold(): path for path in self.files | self.dirs}
+
+    def resolve(self, url, base=''):
+        """
+        Resolve a local URL relative to the directory `base`.
+        Returns (reason, suggestion): reason is None when the target exists,
+        'case' when it only exists with different case, else 'missing'.
+        """
+        path = unquote(urlsplit(url).path)
+        if not path:
+            return None, None  # pure fragment or query
+        path = posixpath.normpath(path.lstrip('/') if path.startswith('/') else posixpath.join(base, path))
+        if path == '.':
+            path = ''
+        if path.startswith('../'):
+            return 'missing', None
+        if path in self.files or (path in self.dirs and posixpath.join(path, 'index.html') in self.files):
+            return None, None
+        match = self._folded.get(path.casefold())
+        if match:
+            return 'case', match
+        return 'missing', None
+
+
+class ConnectionPool:
+    """
+    Keep-alive HTTP(S) connections per (scheme, host), with at most
+    `per_host` requests in flight to any one host.
+    """
+
+    def __init__(self, per_host=DEFAULT_PER_HOST, timeout=DEFAULT_TIMEOUT):
+        self.per_host = per_host
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._idle = defaultdict(list)
+        self._slots = {}
+
+    @contextmanager
+    def _slot(self, key):
+        with self._lock:
+            slot = self._slots.setdefault(key, threading.BoundedSemaphore(self.per_host))
+        with slot:
+            yield
+
+    def _connect(self, scheme, netloc):
+        cls = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        return cls(netloc, timeout=self.timeout)
+
+    def request(self, method, url):
+        """Send one request without following redirects; returns (status, Location)."""
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        target = (parts.path or '/') + ('?' + parts.query if parts.query else '')
+        headers = {'User-Agent': USER_AGENT, 'Accept': '*/*'}
+        with self._slot(key):
+            with self._lock:
+                conn = self._idle[key].pop() if self._idle[key] else None
+            for attempt in (0, 1):
+                if conn is None:
+                    conn = self._connect(*key)
+                try:
+                    conn.request(method, target, headers=headers)
+                    response = conn.getresponse()
+                    break
+                except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                    # A pooled keep-alive connection went stale: retry once on a fresh one
+                    conn.close()
+                    conn = None
+                    if attempt:
+                        raise
+            status, location = response.status, response.getheader('Location')
+            if method == 'HEAD':
+                response.read()
+                reusable = not response.will_close
+            else:
+                # Don't download bodies: drop the connection instead
+                response.close()
+                reusable = False
+            if reusable:
+                with self._lock:
+                    self._idle[key].append(conn)
+            else:
+                conn.close()
+        return status, location
+
+    def close(self):
+        with self._lock:
+            for conns in self._idle.values():
+                for conn in conns:
+                    conn.close()
+            self._idle.clear()
+
+
+def check_url(url, pool):
+    """
+    Probe one external URL, following redirects. Returns a result dict with
+    'state' ('ok', 'blocked', 'broken' or 'error'), 'status' and 'final_url'.
+    """
+    current = 'https:' + url if url.startswith('//') else url
+    try:
+        for _ in range(MAX_REDIRECTS + 1):
+            status, location = pool.request('HEAD', current)
+            if status in (405, 501) or status in BLOCKED_STATUSES:
+                # Some servers only answer GET properly
+                status, location = pool.request('GET', current)
+            if 300 <= status < 400 and location:
+                current = urljoin(current, location)
+                continue
+            break
+        else:
+            return {'state': 'broken', 'status': status, 'final_url': current, 'error': "too many redirects"}
+    except (OSError, http.client.HTTPException) as e:
+        return {'state': 'error', 'status': None, 'final_url': current, 'error': str(e) or type(e).__name__}
+
+    if 200 <= status < 400:
+        state = 'ok'
+    elif status in BLOCKED_STATUSES:
+        state = 'blocked'
+    else:
+        state = 'broken'
+    return {'state': state, 'status': status, 'final_url': current}
+
+
+class LinkCache:
+    """JSON-backed cache of external check results, keyed by URL."""
+
+    def __init__(self, path=CACHE_FILE, ttl_days=DEFAULT_TTL_DAYS, clock=time.time):
+        self.path = path
+        self.ttl_days = ttl_days
+        self.clock = clock
+        self.entries = {}
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+
+    def get(self, url):
+        entry = self.entries.get(url)
+        if not entry:
+            return None
+        ttl = self.ttl_days if entry['state'] == 'ok' else min(self.ttl_days, FAILED_TTL_DAYS)
+        if self.clock() - entry['checked_at'] > ttl * 86400:
+            return None
+        return entry
+
+    def put(self, url, result):
+        # Network errors are usually transient: probe those again next time
+        if result['state'] != 'error':
+            self.entries[url] = dict(result, checked_at=self.clock())
+
+    def save(self):
+        """
+        Merge this run's results into the cache file. The file is re-read
+        under the lock, so entries saved by a concurrent run since this cache
+        was loaded are kept; for a URL both checked, the newer result wins.
+        """
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with file_lock(self.path):
+            entries = {}
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    entries = json.load(f)
+            for url, entry in self.entries.items():
+                if url not in entries or entries[url]['checked_at'] <= entry['checked_at']:
+                    entries[url] = entry
+            atomic_write(self.path, json.dumps(entries, indent=1, sort_keys=True) + '\n')
+        self.entries = entries
+
+
+def check_external(urls, cache, workers=DEFAULT_WORKERS, per_host=DEFAULT_PER_HOST,
+                   timeout=DEFAULT_TIMEOUT):
+    """{url: result} for the given URLs, probing only those not in `cache`."""
+    results, todo = {}, []
+    for url in urls:
+        entry = cache.get(url)
+        if entry:
+            results[url] = dict(entry, cached=True)
+        else:
+            todo.append(url)
+
+    if todo:
+        pool = ConnectionPool(per_host, timeout)
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for url, result in zip(todo, executor.map(lambda u: check_url(u, pool), todo)):
+                    cache.put(url, result)
+                    results[url] = result
+        finally:
+            pool.close()
+    return results
+
+
+def check_links(sources=DEFAULT_SOURCES, root=ROOT_DIR, offline=False, cache_file=CACHE_FILE,
+                ttl_days=DEFAULT_TTL_DAYS, workers=DEFAULT_WORKERS, per_host=DEFAULT_PER_HOST,
+                timeout=DEFAULT_TIMEOUT):
+    """Check every link in `sources`; returns the JSON-serialisable report."""
+    links = extract_links(sources, root)
+    index = FileIndex(root)
+    broken, warnings = [], []
+    external = defaultdict(list)
+    local_count = 0
+
+    for link in links:
+        url = link.url
+        issue = {'source': link.source, 'line': link.line, 'url': url}
+        if url != url.strip():
+            warnings.append(dict(issue, reason='whitespace'))
+            url = url.strip()
+        if not url or url.startswith('#') or url.lower().startswith(SKIP_SCHEMES):
+            continue
+        if is_external(url):
+            external[url].append(issue)
+            continue
+        local_count += 1
+        # YAML content is rendered into index.html, so resolve it from the root
+        base = '' if link.source.endswith(('.yml', '.yaml')) else posixpath.dirname(link.source)
+        reason, suggestion = index.resolve(url, base)
+        if reason == 'case':
+            broken.append(dict(issue, kind='local', reason='case', suggestion=suggestion))
+        elif reason:
+            broken.append(dict(issue, kind='local', reason='missing'))
+
+    results = {}
+    if external and not offline:
+        cache = LinkCache(cache_file, ttl_days)
+        results = check_external(sorted(external), cache, workers, per_host, timeout)
+        cache.save()
+    for url, result in results.items():
+        for issue in external[url]:
+            entry = dict(issue, kind='external', reason=result['state'], status=result['status'])
+            if result.get('error'):
+                entry['error'] = result['error']
+            if result['state'] == 'blocked':
+                warnings.append(entry)
+            elif result['state'] != 'ok':
+                broken.append(entry)
+
+    return {
+        'generated': datetime.now().isoformat(timespec='seconds'),
+        'summary': {
+            'links': len(links),
+            'local': local_count,
+            'external': len(external),
+            'checked_external': len(results),
+            'cached': sum(1 for r in results.values() if r.get('cached')),
+            'broken': len(broken),
+            'warnings': len(warnings),
+        },
+        'broken': broken,
+        'warnings': warnings,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check local and external links of the site")
+    parser.add_argument('sources', nargs='*', default=DEFAULT_SOURCES,
+                        help="HTML/YAML files to scan (default: index.html, cv.html, _data/*.yml)")
+    parser.add_argument('--offline', action='store_true', help="Only check local files")
+    parser.add_argument('--report', default=REPORT_FILE, help="JSON report path, or - for stdout")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="Concurrent external checks")
+    parser.add_argument('--per-host', type=int, default=DEFAULT_PER_HOST,
+                        help="Max concurrent connections per host")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help="Per-request timeout (s)")
+    parser.add_argument('--ttl', type=float, default=DEFAULT_TTL_DAYS,
+                        help="Days to trust cached results (0 re-checks everything)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    report = check_links(args.sources, offline=args.offline, ttl_days=args.ttl, workers=args.workers,
+                         per_host=args.per_host, timeout=args.timeout)
+    elapsed = time.perf_counter() - start
+
+    text = json.dumps(report, indent=2, ensure_ascii=False) + '\n'
+    if args.report == '-':
+        sys.stdout.write(text)
+    else:
+        atomic_write(args.report, text)
+        for issue in report['broken']:
+            detail = issue.get('suggestion') or issue.get('status') or issue.get('error') or ''
+            print(f"❌ {issue['source']}:{issue['line']}: {issue['url']!r} ({issue['reason']}"
+                  f"{': ' + str(detail) if detail else ''})")
+        for issue in report['warnings']:
+            print(f"⚠️  {issue['source']}:{issue['line']}: {issue['url']!r} ({issue['reason']})")
+        summary = report['summary']
+        print(f"📊 {summary['links']} links ({summary['local']} local, {summary['external']} external, "
+              f"{summary['cached']} cached) checked in {elapsed:.1f}s: "
+              f"{summary['broken']} broken, {summary['warnings']} warnings")
+        print(f"Report written to {os.path.relpath(args.report)}")
+    sys.exit(1 if report['broken'] else 0)
+
+
+if __name__ == "__main__":
+    main()
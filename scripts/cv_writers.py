@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Extra CV output formats rendered from a `SiteModel`: LaTeX, BibTeX and
+JSON Resume (https://jsonresume.org/schema/). Each renderer returns the
+document as an iterable of text chunks.
+"""
+
+import html
+import json
+import re
+from datetime import datetime
+
+LATEX_SPECIALS = {
+    '\\': r'\textbackslash{}', '&': r'\&', '%': r'\%', '$': r'\$', '#': r'\#',
+    '_': r'\_', '{': r'\{', '}': r'\}', '~': r'\textasciitilde{}', '^': r'\textasciicircum{}',
+}
+_latex_re = re.compile('|'.join(re.escape(c) for c in LATEX_SPECIALS))
+
+
+def latex_escape(text):
+    return _latex_re.sub(lambda m: LATEX_SPECIALS[m.group()], str(text or ''))
+
+
+def html_to_latex(fragment):
+    """Convert the small HTML subset used in citations (<b>, <em>, <a>) to LaTeX."""
+    parts = re.split(r'(<[^>]+>)', fragment)
+    out = []
+    for part in parts:
+        tag = re.match(r'<(/?)(\w+)([^>]*)>', part)
+        if not tag:
+            out.append(latex_escape(html.unescape(part)))
+            continue
+        closing, name = tag.group(1), tag.group(2).lower()
+        if name in ('b', 'strong'):
+            out.append('}' if closing else r'\textbf{')
+        elif name in ('em', 'i'):
+            out.append('}' if closing else r'\emph{')
+        elif name == 'a':
+            href = re.search(r'href="([^"]*)"', tag.group(3))
+            if closing:
+                out.append('}')
+            elif href and href.group(1) not in ('', '#'):
+                out.append(r'\href{' + html.unescape(href.group(1)).replace('%', r'\%').replace('#', r'\#') + '}{')
+            else:
+                out.append('{')
+    return re.sub(r'\s+', ' ', ''.join(out)).strip()
+
+
+def parse_period(period):
+    """'2019–2024' -> ('2019', '2024'); '2024–Present' -> ('2024', None); '2024' -> ('2024', '2024')"""
+    years = re.findall(r'\d{4}', period or '')
+    if not years:
+        return None, None
+    if re.search(r'present', period, re.I):
+        return years[0], None
+    return years[0], years[-1]
+
+
+def render_latex(model, updated=None):
+    updated = updated or datetime.now().strftime('%B %Y')
+    yield r"""\documentclass[11pt]{article}
+\usepackage[margin=1in]{geometry}
+\usepackage[hidelinks]{hyperref}
+\usepackage[T1]{fontenc}
+\usepackage[utf8]{inputenc}
+\usepackage{enumitem}
+\setlength{\parindent}{0pt}
+\newcommand{\cvitem}[2]{\noindent\makebox[1.1in][l]{\textbf{#1}}\parbox[t]{\dimexpr\linewidth-1.1in}{#2}\par\smallskip}
+
+\begin{document}
+"""
+    yield "{\\LARGE \\textbf{" + latex_escape(model.name) + "}}\\\\[2pt]\n"
+    yield latex_escape(model.title) + "\\\\\n"
+    yield latex_escape(model.center) + ", " + latex_escape(model.institution) + "\\\\[4pt]\n"
+    contact = model.contact
+    yield (r"\href{mailto:" + contact['email'] + "}{" + latex_escape(contact['email']) + "} \\textbar{} "
+           + latex_escape(contact['phone']) + " \\textbar{} "
+           + r"\url{" + contact['website'] + "}\n\n")
+
+    for heading, entries in (("Education", model.education),
+                             ("Academic Appointments", model.appointments)):
+        yield "\\section*{" + heading + "}\n"
+        for entry in entries:
+            yield "\\cvitem{" + latex_escape(entry.period) + "}{" + latex_escape(entry.full_description) + "}\n"
+        yield "\n"
+
+    yield "\\section*{Publications}\n"
+    for pub in model.publications:
+        yield "\\cvitem{" + latex_escape(pub.year) + "}{" + html_to_latex(pub.content) + "}\n"
+    yield "\n"
+
+    yield "\\section*{Grants \\& Awards}\n"
+    for award in model.awards:
+        description = ", ".join(latex_escape(p) for p in (award.title, award.organization) if p)
+        yield "\\cvitem{" + latex_escape(award.year) + "}{" + (description or latex_escape(award.text)) + "}\n"
+
+    yield "\n\\vfill{\\footnotesize Last updated: " + latex_escape(updated) + "}\n\\end{document}\n"
+
+
+def bibtex_key(pub, used):
+    first = pub.authors[0] if pub.authors else (pub.text.split(',')[0] if pub.text else 'anon')
+    surname = re.sub(r'[^A-Za-z]', '', first.split()[-1] if ' ' in first else first) or 'anon'
+    word = next((w for w in re.findall(r'[A-Za-z]+', pub.title) if len(w) > 3), 'pub')
+    key = f"{surname.lower()}{pub.year}{word.lower()}"
+    candidate, n = key, 1
+    while candidate in used:
+        n += 1
+        candidate = f"{key}{n}"
+    used.add(candidate)
+    return candidate
+
+
+def render_bibtex(model, updated=None):
+    used = set()
+    for pub in model.publications:
+        details = pub.text.split(pub.venue, 1)[-1] if pub.venue else ''
+        volume = re.match(r',\s*(\d+)(?:\((\d+)\))?(?:,\s*([^.]+))?', details)
+        is_thesis = 'thesis' in pub.text.lower()
+        fields = [('title', pub.title), ('year', pub.year)]
+        if pub.authors:
+            fields.append(('author', ' and '.join(pub.authors)))
+        if pub.venue and not is_thesis:
+            fields.append(('journal', pub.venue))
+        if volume:
+            fields += [(k, v) for k, v in zip(('volume', 'number', 'pages'), volume.groups()) if v]
+        if pub.link:
+            fields.append(('url', pub.link))
+            doi = re.search(r'10\.\d{4,9}/[^\s?#]+', pub.link)
+            if doi:
+                fields.append(('doi', doi.group()))
+        entry_type = 'mastersthesis' if is_thesis else 'article'
+        yield f"@{entry_type}{{{bibtex_key(pub, used)},\n"
+        yield ",\n".join(f"  {name} = {{{value if name == 'url' else latex_escape(value)}}}"
+                         for name, value in fields)
+        yield "\n}\n\n"
+
+
+def render_json_resume(model, updated=None):
+    def dates(period):
+        start, end = parse_period(period)
+        return {k: v for k, v in (('startDate', start), ('endDate', end)) if v}
+
+    resume = {
+        '$schema': 'https://raw.githubusercontent.com/jsonresume/resume-schema/v1.0.0/schema.json',
+        'basics': {
+            'name': model.name,
+            'label': model.title,
+            'email': model.contact['email'],
+            'phone': model.contact['phone'],
+            'url': model.contact['website'],
+            'location': {'address': model.contact['office'], 'city': model.contact['location']},
+            'profiles': [{'network': network, 'url': url} for network, url in model.social_links.items()],
+        },
+        'work': [dict({'name': e.organization or e.description,
+                       'position': e.title or e.description,
+                       'location': e.location}, **dates(e.period))
+                 for e in model.appointments],
+        'education': [dict({'institution': e.organization or e.description,
+                            'studyType': e.title or e.description,
+                            'location': e.location}, **dates(e.period))
+                      for e in model.education],
+        'publications': [{'name': p.title, 'publisher': p.venue, 'releaseDate': p.year, 'url': p.link}
+                         for p in model.publications],
+        'awards': [{'title': a.title or a.text, 'date': a.year, 'awarder': a.organization}
+                   for a in model.awards],
+        'meta': {'lastModified': updated or datetime.now().strftime('%Y-%m-%d')},
+    }
+    yield json.dumps(resume, indent=2, ensure_ascii=False)
+    yield "\n"
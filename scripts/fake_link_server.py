@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Local HTTP stand-in for the external sites check_links.py probes.
+
+`FakeLinkServer` serves a fixed set of paths on 127.0.0.1 from a background
+thread, each answering the way a real site can:
+
+    /ok, /page/<n>    200
+    /redirect/<n>     a chain of n relative redirects ending at /ok
+    /loop             redirects to itself forever
+    /missing          404
+    /blocked          403, as publishers answer robots
+    /get-only         405 to HEAD, 200 to GET
+    /slow             200 after `slow` seconds (longer than the checker's timeout)
+
+Every request sleeps an injected `latency` first and is counted per
+(method, path), so keep-alive reuse, per-host limits and the result cache
+can be exercised and timed without touching the network.
+"""
+
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def _respond(self, status, location=None, body=b''):
+        self.send_response(status)
+        if location:
+            self.send_header('Location', location)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def _handle(self):
+        server = self.server
+        path = urlsplit(self.path).path
+        server.count(self.command, path)
+        if server.latency:
+            time.sleep(server.latency)
+
+        if path == '/ok' or path.startswith('/page/'):
+            self._respond(200, body=b'ok\n')
+        elif path.startswith('/redirect/'):
+            remaining = int(path.rsplit('/', 1)[-1] or 0)
+            self._respond(301, f"{remaining - 1}" if remaining > 1 else '/ok')
+        elif path == '/loop':
+            self._respond(302, '/loop')
+        elif path == '/blocked':
+            self._respond(403)
+        elif path == '/get-only':
+            self._respond(405 if self.command == 'HEAD' else 200, body=b'ok\n')
+        elif path == '/slow':
+            time.sleep(server.slow)
+            self._respond(200, body=b'ok\n')
+        else:
+            self._respond(404, body=b'not found\n')
+
+    do_HEAD = do_GET = _handle
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeLinkServer(ThreadingHTTPServer):
+    """
+    The stand-in server; use it as a context manager to serve from a
+    background thread. `url(path)` is the absolute URL of a path on it.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, latency=0.0, slow=2.0, port=0):
+        super().__init__(('127.0.0.1', port), _Handler)
+        self.latency = latency
+        self.slow = slow
+        self.requests = Counter()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def count(self, method, path):
+        with self._lock:
+            self.requests[(method, path)] += 1
+
+    def hits(self, path):
+        """Requests received for `path`, any method."""
+        with self._lock:
+            return sum(n for (_, p), n in self.requests.items() if p == path)
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.server_address[1]}{path}"
+
+    def handle_error(self, request, client_address):
+        # The checker drops connections on timeouts and after GETs
+        pass
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the `scholarly` backend.
+
+`FakeScholarly` exposes the two calls the sync scripts use
+(`search_author_id` and `fill`) and returns records shaped like the real
+library's, after sleeping for an injected latency. It lets the enrichment
+pipeline be exercised and timed without touching Google Scholar.
+"""
+
+import random
+import threading
+import time
+
+JOURNALS = [
+    "Transactions in GIS",
+    "ISPRS International Journal of Geo-Information",
+    "PLoS One",
+    "Information",
+    "Annals of the American Association of Geographers",
+]
+COAUTHORS = ["Yanan Wu", "May Yuan", "Daniel A Griffith", "Aaron E Maxwell"]
+
+
+class FakeScholarly:
+    """
+    Deterministic fake of `scholarly.scholarly`.
+
+    `latency` seconds (plus up to `jitter` more) are slept on every call, and
+    `fail_rate` of publication fills raise once before succeeding, so retry
+    paths are exercised too.
+    """
+
+    def __init__(self, n_pubs=50, latency=0.1, jitter=0.0, fail_rate=0.0, seed=0,
+                 author_name="Yalin Yang"):
+        self.n_pubs = n_pubs
+        self.latency = latency
+        self.jitter = jitter
+        self.fail_rate = fail_rate
+        self.author_name = author_name
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._failed_once = set()
+        self.calls = {'search_author_id': 0, 'fill_author': 0, 'fill_publication': 0}
+        self.max_in_flight = 0
+        self._in_flight = 0
+
+    def _sleep(self):
+        with self._lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        try:
+            time.sleep(delay)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _count(self, name):
+        with self._lock:
+            self.calls[name] += 1
+
+    def search_author_id(self, scholar_id):
+        self._count('search_author_id')
+        self._sleep()
+        return {
+            'container_type': 'Author',
+            'scholar_id': scholar_id,
+            'name': self.author_name,
+            'filled': [],
+        }
+
+    def publication_list(self, scholar_id):
+        """Unfilled publication entries, as `fill(author, sections=['publications'])` returns them."""
+        pubs = []
+        for i in range(self.n_pubs):
+            year = 2025 - (i % 12)
+            pubs.append({
+                'container_type': 'Publication',
+                'source': 'AUTHOR_PUBLICATION_ENTRY',
+                'author_pub_id': f"{scholar_id}:{i:06d}",
+                'num_citations': (i * 7) % 40,
+                'filled': False,
+                'bib': {
+                    'title': f"Synthetic Publication {i}: Spatial Patterns of Urban Activity",
+                    'pub_year': str(year),
+                    'citation': f"{JOURNALS[i % len(JOURNALS)]} {i % 30 + 1}",
+                },
+            })
+        return pubs
+
+    def fill(self, obj, sections=None, sortby='citedby', publication_limit=0):
+        if obj.get('container_type') == 'Author':
+            self._count('fill_author')
+            self._sleep()
+            obj['publications'] = self.publication_list(obj['scholar_id'])
+            obj['filled'] = list(sections or ['publications'])
+            return obj
+
+        self._count('fill_publication')
+        self._sleep()
+        pub_id = obj.get('author_pub_id')
+        with self._lock:
+            fail = (self.fail_rate and pub_id not in self._failed_once
+                    and self._random.random() < self.fail_rate)
+            if fail:
+                self._failed_once.add(pub_id)
+        if fail:
+            raise ConnectionError(f"Injected failure for {pub_id}")
+
+        index = int(pub_id.rsplit(':', 1)[-1]) if pub_id else 0
+        authors = [self.author_name] + COAUTHORS[:index % len(COAUTHORS)]
+        bib = obj.setdefault('bib', {})
+        bib.update({
+            'author': ' and '.join(authors),
+            'journal': JOURNALS[index % len(JOURNALS)],
+            'volume': str(index % 30 + 1),
+            'number': str(index % 4 + 1),
+            'pages': f"e{70000 + index}",
+        })
+        obj['pub_url'] = f"https://doi.org/10.0000/synthetic.{index}"
+        obj['filled'] = True
+        return obj
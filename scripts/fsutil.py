@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Small filesystem helpers shared by the site generators.
+"""
+
+import hashlib
+import os
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, fall back to atomic writes only
+    fcntl = None
+
+
+def atomic_write(path, data, encoding='utf-8'):
+    """
+    Write `data` (a string, bytes, or an iterable of either) to `path`
+    atomically: chunks are streamed into a temporary file in the same
+    directory, which then replaces `path` in one `os.replace`. Readers never
+    see a half-written file and a crash leaves the old file intact.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    chunks = [data] if isinstance(data, (str, bytes)) else data
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', suffix='.tmp',
+                                    dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk.encode(encoding) if isinstance(chunk, str) else chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(path):
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o777)
+        else:
+            os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """Hex SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@contextmanager
+def file_lock(path):
+    """
+    Hold an exclusive advisory lock on `path` (via a `path.lock` sidecar) so
+    read-modify-write updates from concurrent scripts do not lose each
+    other's changes. Readers need no lock: writes are atomic replaces.
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(path + '.lock', 'a') as lock:
+        fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Resumable Google Scholar harvester for several authors at once.
+
+Every author's publication list and every publication fill is a task on one
+shared work queue, drained by a pool of threads that all draw request slots
+from the same rate limiter, so adding authors never raises the request rate.
+Progress is appended to a checkpoint journal (.cache/harvest_checkpoint.jsonl)
+and fsynced after each publication; a run that crashes, is interrupted or
+stops because Scholar started throttling (--max-errors failures in a row)
+picks up where it left off when started again. Failed publications are
+recorded and retried on the next run instead of aborting the crawl. Fills
+also go through the Scholar cache (scripts/scholar_cache.py), so fresh
+publications are not requested at all.
+
+Once every author is complete their publications are written to
+<out>/<scholar_id>.yml, in the format of _data/publications.yml, and their
+records are dropped from the checkpoint; progress on other authors (from an
+earlier, unfinished run) is kept, and the file is removed once empty.
+
+Usage:
+    python scripts/harvest_scholar.py                       # google_scholar_id from _config.yml
+    python scripts/harvest_scholar.py wdkZhlwAAAAJ AbCdEfGhIjKL --workers 8
+    python scripts/harvest_scholar.py --fresh               # ignore the checkpoint
+    python scripts/harvest_scholar.py --replay .cache/scholar.cassette.json.gz
+"""
+
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+
+import yaml
+
+from fsutil import atomic_write
+from instrument import count, span, profiled, add_profile_argument
+from scholar_cache import ScholarCache, publication_key, DEFAULT_TTL_DAYS
+from scholar_pool import (DEFAULT_WORKERS, DEFAULT_RATE, DEFAULT_RETRIES, HostRateLimiter,
+                          call_with_retry)
+from scholar_replay import REPLAY_CACHE_PATH, add_replay_arguments, scholar_backend
+from site_data import load_yaml
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_FILE = os.path.join(ROOT_DIR, '_config.yml')
+DEFAULT_CHECKPOINT = os.path.join(ROOT_DIR, '.cache', 'harvest_checkpoint.jsonl')
+DEFAULT_OUT = os.path.join(ROOT_DIR, 'build', 'scholar')
+# Consecutive failed tasks after which the run stops (Scholar is throttling us)
+DEFAULT_MAX_ERRORS = 10
+
+
+def pub_key(pub, index):
+    """Checkpoint key of a publication: its Scholar id, else its list position."""
+    return publication_key(pub) or f"#{index}"
+
+
+class Checkpoint:
+    """
+    Append-only JSON-lines journal of harvest progress.
+
+    Records are {'type': 'author', 'author', 'name', 'publications'} once an
+    author's publication list is known, {'type': 'pub', 'author', 'key',
+    'filled'} per filled publication and {'type': 'error', ...} per failure.
+    Replaying the journal rebuilds `authors`, `filled` and `errors`; a line
+    torn by a crash is skipped.
+    """
+
+    def __init__(self, path=DEFAULT_CHECKPOINT):
+        self.path = path
+        self.authors = {}
+        self.filled = {}
+        self.errors = {}
+        self._lock = threading.Lock()
+        self._file = None
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        self._apply(json.loads(line))
+                    except ValueError:
+                        continue
+
+    def _apply(self, record):
+        author, kind = record['author'], record['type']
+        if kind == 'author':
+            self.authors[author] = {'name': record['name'], 'publications': record['publications']}
+        elif kind == 'pub':
+            self.filled[(author, record['key'])] = record['filled']
+            self.errors.pop((author, record['key']), None)
+        elif kind == 'error':
+            self.errors[(author, record.get('key'))] = record['error']
+
+    def record(self, record):
+        line = json.dumps(record, default=str, ensure_ascii=False)
+        with self._lock:
+            # Apply what a resumed run will read back, not the live objects
+            self._apply(json.loads(line))
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                torn = os.path.exists(self.path) and os.path.getsize(self.path) and not self._ends_with_newline()
+                self._file = open(self.path, 'a', encoding='utf-8')
+                if torn:
+                    self._file.write('\n')
+            self._file.write(line + '\n')
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def _ends_with_newline(self):
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def pending(self, author_id):
+        """(key, pub) of the author's publications that are not filled yet."""
+        pubs = self.authors[author_id]['publications']
+        return [(pub_key(pub, i), pub) for i, pub in enumerate(pubs)
+                if (author_id, pub_key(pub, i)) not in self.filled]
+
+    def publications(self, author_id):
+        """The author's filled publications, in publication-list order."""
+        pubs = self.authors[author_id]['publications']
+        return [self.filled[(author_id, pub_key(pub, i))] for i, pub in enumerate(pubs)]
+
+    def complete(self, author_id):
+        return author_id in self.authors and not self.pending(author_id)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def drop(self, author_ids):
+        """Remove the records of `author_ids`, and the journal once nothing else is left."""
+        author_ids = set(author_ids)
+        self.close()
+        with self._lock:
+            kept = []
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            if json.loads(line)['author'] not in author_ids:
+                                kept.append(line if line.endswith('\n') else line + '\n')
+                        except ValueError:
+                            continue
+            if kept:
+                atomic_write(self.path, "".join(kept))
+            elif os.path.exists(self.path):
+                os.remove(self.path)
+            self.authors = {a: v for a, v in self.authors.items() if a not in author_ids}
+            self.filled = {k: v for k, v in self.filled.items() if k[0] not in author_ids}
+            self.errors = {k: v for k, v in self.errors.items() if k[0] not in author_ids}
+
+
+def harvest(author_ids, backend, checkpoint, cache=None, max_workers=DEFAULT_WORKERS,
+            rate_per_sec=DEFAULT_RATE, retries=DEFAULT_RETRIES, max_errors=DEFAULT_MAX_ERRORS,
+            log=print):
+    """
+    Fetch and fill every publication of `author_ids` that `checkpoint` does
+    not have yet. Returns False if the run stopped early after `max_errors`
+    consecutive failures, True otherwise (individual failures may remain in
+    `checkpoint.errors` either way).
+    """
+    limiter = HostRateLimiter(rate_per_sec)
+    tasks = queue.Queue()
+    stop = threading.Event()
+    failures = {'consecutive': 0}
+    failures_lock = threading.Lock()
+
+    def before_call():
+        limiter.wait()
+        count('scholar.requests')
+
+    def request(func, *args, **kwargs):
+        result = call_with_retry(func, *args, retries=retries, before_call=before_call, **kwargs)
+        with failures_lock:
+            failures['consecutive'] = 0
+        return result
+
+    def enqueue_publications(author_id):
+        for key, pub in checkpoint.pending(author_id):
+            tasks.put(('pub', author_id, key, pub))
+
+    def run(task):
+        kind, author_id = task[:2]
+        if kind == 'author':
+            with span('fetch', author_id):
+                author = request(backend.search_author_id, author_id)
+                request(backend.fill, author, sections=['publications'])
+            pubs = [pub for pub in author.get('publications', []) if pub.get('bib', {}).get('title')]
+            checkpoint.record({'type': 'author', 'author': author_id, 'name': author.get('name', ''),
+                               'publications': pubs})
+            log(f"🔄 {author.get('name', author_id)}: {len(checkpoint.pending(author_id))} of {len(pubs)} "
+                f"publications to fill")
+            enqueue_publications(author_id)
+            return
+        _, author_id, key, pub = task
+        filled = cache.get(pub) if cache is not None else None
+        if filled is not None:
+            count('scholar_cache.hits')
+        else:
+            with span('fill', pub['bib']['title'][:60]):
+                filled = request(backend.fill, pub)
+            if cache is not None:
+                cache.put(pub, filled)
+        checkpoint.record({'type': 'pub', 'author': author_id, 'key': key, 'filled': filled})
+
+    def worker():
+        while True:
+            task = tasks.get()
+            try:
+                if task is None:
+                    return
+                if stop.is_set():
+                    continue
+                run(task)
+            except Exception as e:
+                count('scholar.errors')
+                with failures_lock:
+                    failures['consecutive'] += 1
+                    throttled = max_errors and failures['consecutive'] >= max_errors and not stop.is_set()
+                    if throttled:
+                        stop.set()
+                key = task[2] if task[0] == 'pub' else None
+                checkpoint.record({'type': 'error', 'author': task[1], 'key': key, 'error': str(e)})
+                log(f"  ⚠️  {task[1]} {key or '(publication list)'}: {e}")
+                if throttled:
+                    log(f"❌ {max_errors} failures in a row, stopping (Scholar is probably throttling)")
+            finally:
+                tasks.task_done()
+
+    for author_id in author_ids:
+        if author_id in checkpoint.authors:
+            enqueue_publications(author_id)
+        else:
+            tasks.put(('author', author_id))
+
+    threads = [threading.Thread(target=worker, name=f'harvest-{i}', daemon=True)
+               for i in range(max(1, max_workers))]
+    for thread in threads:
+        thread.start()
+    tasks.join()
+    for _ in threads:
+        tasks.put(None)
+    for thread in threads:
+        thread.join()
+    return not stop.is_set()
+
+
+def write_publications(author_id, checkpoint, out_dir=DEFAULT_OUT):
+    """Write one author's publications as <out_dir>/<author_id>.yml; returns the path."""
+    from update_from_scholar import format_entry
+
+    name = checkpoint.authors[author_id]['name']
+    entries = [format_entry(pub, highlight=(name,) if name else ()) for pub in checkpoint.publications(author_id)]
+    entries.sort(key=lambda e: str(e['year']), reverse=True)
+    path = os.path.join(out_dir, f"{author_id}.yml")
+    os.makedirs(out_dir, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        yaml.dump(entries, f, sort_keys=False, allow_unicode=True, width=1000)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Harvest publications of several Google Scholar authors")
+    parser.add_argument('authors', nargs='*',
+                        help="Google Scholar author ids (default: google_scholar_id in _config.yml)")
+    parser.add_argument('--out', default=DEFAULT_OUT, help="Output directory (default: build/scholar)")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help="Requests in flight at once, across all authors")
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE,
+                        help="Maximum Google Scholar requests per second, across all authors")
+    parser.add_argument('--retries', type=int, default=DEFAULT_RETRIES,
+                        help="Retries per request before it is recorded as failed")
+    parser.add_argument('--max-errors', type=int, default=DEFAULT_MAX_ERRORS,
+                        help="Stop after this many failures in a row (0: never)")
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT, help="Checkpoint journal path")
+    parser.add_argument('--fresh', action='store_true', help="Ignore an existing checkpoint")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Refill every publication instead of using the local cache")
+    parser.add_argument('--cache-ttl-days', type=float, default=DEFAULT_TTL_DAYS,
+                        help="Refill cached publications older than this many days")
+    add_profile_argument(parser)
+    add_replay_arguments(parser)
+    args = parser.parse_args()
+
+    author_ids = list(dict.fromkeys(args.authors)) or [load_yaml(CONFIG_FILE, {}).get('google_scholar_id')]
+    if not all(author_ids):
+        print("Error: no author ids given and 'google_scholar_id' not found in _config.yml")
+        sys.exit(1)
+    live = None
+    if not args.replay:
+        try:
+            from scholarly import scholarly as live
+        except ImportError:
+            print("Error: scholarly is required (pip install scholarly), or pass --replay CASSETTE")
+            sys.exit(1)
+
+    if args.fresh and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+    checkpoint = Checkpoint(args.checkpoint)
+    resumed = sum(1 for author, _ in checkpoint.filled if author in author_ids)
+    if resumed:
+        print(f"⏭️  Resuming: {resumed} publication(s) already in {os.path.relpath(args.checkpoint)}")
+
+    cache = None
+    # Recorded runs bypass the cache so every fill reaches the cassette;
+    # replayed runs get their own cache so they never mix with live data
+    if not args.no_cache and not args.record:
+        cache_kwargs = {'path': REPLAY_CACHE_PATH} if args.replay else {}
+        cache = ScholarCache(ttl_days=args.cache_ttl_days, **cache_kwargs)
+    with profiled('harvest_scholar', args.profile):
+        try:
+            with scholar_backend(live, args.record, args.replay, args.latency, args.jitter) as backend:
+                finished = harvest(author_ids, backend, checkpoint, cache, max_workers=args.workers,
+                                   rate_per_sec=args.rate, retries=args.retries,
+                                   max_errors=args.max_errors)
+        except KeyboardInterrupt:
+            finished = False
+            print("\n⚠️  Interrupted")
+        finally:
+            checkpoint.close()
+            if cache is not None:
+                cache.close()
+
+        incomplete = []
+        for author_id in author_ids:
+            if not checkpoint.complete(author_id):
+                incomplete.append(author_id)
+                continue
+            path = write_publications(author_id, checkpoint, args.out)
+            print(f"✅ {checkpoint.authors[author_id]['name'] or author_id}: "
+                  f"{len(checkpoint.authors[author_id]['publications'])} publications → {os.path.relpath(path)}")
+
+    if incomplete:
+        print(f"❌ Incomplete: {', '.join(incomplete)} ({len(checkpoint.errors)} failed task(s)"
+              f"{'' if finished else ', stopped early'}). Run again to resume.")
+        sys.exit(1)
+    checkpoint.drop(author_ids)
+
+
+if __name__ == "__main__":
+    main()
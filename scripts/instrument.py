@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Lightweight phase timing and counters shared by the generator entry points.
+
+Code marks its phases with `span` (read, parse, fetch, fill, render, write)
+and bumps `count` for events such as network calls and cache hits:
+
+    with span('parse', 'index.html'):
+        model = load_site_model(html_file)
+    count('cache.hits')
+
+Spans are recorded from any thread and cost next to nothing, so they stay
+in place. Entry points wrap their work in `profiled(name, enabled)`; with
+`enabled` (the `--profile` flag added by `add_profile_argument`) it runs
+cProfile, prints a one-line summary of time per phase plus the counters, and
+writes .cache/profile/<name>-<time>.prof (open with `python -m pstats` or
+snakeviz) and <name>-<time>.trace.json, a Chrome trace-event file for
+chrome://tracing or https://ui.perfetto.dev.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROFILE_DIR = os.path.join(ROOT_DIR, '.cache', 'profile')
+PHASES = ('read', 'parse', 'fetch', 'fill', 'render', 'write')
+
+
+class Recorder:
+    """Thread-safe store of finished spans and counters."""
+
+    def __init__(self, clock=time.perf_counter_ns):
+        self.clock = clock
+        self.origin = clock()
+        self.spans = []
+        self.counters = defaultdict(int)
+        self.threads = {}
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self.origin = self.clock()
+            self.spans = []
+            self.counters = defaultdict(int)
+            self.threads = {}
+
+    @contextmanager
+    def span(self, phase, label=None, **args):
+        start = self.clock()
+        try:
+            yield
+        finally:
+            end = self.clock()
+            thread = threading.current_thread()
+            with self._lock:
+                self.threads[thread.ident] = thread.name
+                self.spans.append((phase, label, start - self.origin, end - start, thread.ident, args))
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def phase_totals(self):
+        """
+        Wall-clock seconds per phase. Overlapping spans of the same phase
+        (e.g. fills on several threads) are merged, not summed.
+        """
+        intervals = defaultdict(list)
+        with self._lock:
+            for phase, _, start, duration, _, _ in self.spans:
+                intervals[phase].append((start, start + duration))
+        totals = {}
+        for phase, spans in intervals.items():
+            total, current_start, current_end = 0, None, None
+            for start, end in sorted(spans):
+                if current_end is None or start > current_end:
+                    if current_end is not None:
+                        total += current_end - current_start
+                    current_start, current_end = start, end
+                else:
+                    current_end = max(current_end, end)
+            total += current_end - current_start
+            totals[phase] = total / 1e9
+        return totals
+
+    def chrome_trace(self):
+        """The recorded spans and counters as Chrome trace events."""
+        pid = os.getpid()
+        with self._lock:
+            events = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+                      for tid, name in self.threads.items()]
+            end = 0
+            for phase, label, start, duration, tid, args in self.spans:
+                events.append({
+                    'name': f"{phase}: {label}" if label else phase, 'cat': phase, 'ph': 'X',
+                    'ts': start / 1000, 'dur': duration / 1000, 'pid': pid, 'tid': tid,
+                    'args': {key: str(value) for key, value in args.items()},
+                })
+                end = max(end, start + duration)
+            if self.counters:
+                events.append({'name': 'counters', 'ph': 'C', 'ts': end / 1000, 'pid': pid, 'tid': 0,
+                               'args': dict(self.counters)})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def summary(self):
+        totals = self.phase_totals()
+        ordered = [p for p in PHASES if p in totals] + sorted(set(totals) - set(PHASES))
+        parts = [f"{phase} {totals[phase] * 1000:.0f} ms" for phase in ordered]
+        parts += [f"{name} {value}" for name, value in sorted(self.counters.items())]
+        return " · ".join(parts)
+
+
+recorder = Recorder()
+span = recorder.span
+count = recorder.count
+
+
+def add_profile_argument(parser):
+    parser.add_argument('--profile', action='store_true',
+                        help="Write a cProfile dump and a Chrome trace to .cache/profile/")
+
+
+@contextmanager
+def profiled(name, enabled=False, output_dir=PROFILE_DIR, log=print):
+    """
+    Run the body of an entry point; with `enabled`, profile it with cProfile,
+    print the phase summary and write the .prof and trace files.
+    """
+    if not enabled:
+        yield recorder
+        return
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield recorder
+    finally:
+        profiler.disable()
+        summary = recorder.summary()
+        if summary:
+            log(f"⏱️  {summary}")
+        os.makedirs(output_dir, exist_ok=True)
+        base = os.path.join(output_dir, f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}")
+        profiler.dump_stats(base + '.prof')
+        with open(base + '.trace.json', 'w', encoding='utf-8') as f:
+            json.dump(recorder.chrome_trace(), f)
+        log(f"📊 Profile written to {os.path.relpath(base)}.prof and .trace.json")
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Build responsive variants of the raster images under img/.
+
+Every PNG/JPEG is resized to a fixed set of widths (never upscaled) and
+saved as WebP, AVIF and JPEG under img/optimized/, mirroring the source
+tree: img/research/sleep.png -> img/optimized/research/sleep-640.webp.
+Images are converted in parallel with a process pool. The manifest
+(img/optimized/manifest.json) records each source's SHA-256, intrinsic size
+and variants, so unchanged images are skipped on the next run and the site
+generators can write srcset/sizes attributes from it (see `srcset`).
+
+Requires Pillow (`pip install Pillow`); AVIF output needs Pillow >= 11.3 or
+the pillow-avif-plugin and is skipped with a warning when unavailable.
+
+Usage:
+    python scripts/optimize_images.py
+    python scripts/optimize_images.py --widths 480 960 --formats webp jpeg
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from fsutil import atomic_write, file_sha256
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMG_DIR = os.path.join(ROOT_DIR, 'img')
+OUTPUT_DIR = os.path.join(IMG_DIR, 'optimized')
+MANIFEST_FILE = os.path.join(OUTPUT_DIR, 'manifest.json')
+MANIFEST_VERSION = 1
+
+SOURCE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+DEFAULT_WIDTHS = (320, 640, 1024, 1600)
+DEFAULT_FORMATS = ('avif', 'webp', 'jpeg')
+EXTENSIONS = {'avif': '.avif', 'webp': '.webp', 'jpeg': '.jpg'}
+SAVE_OPTIONS = {
+    'avif': {'quality': 55},
+    'webp': {'quality': 80, 'method': 6},
+    'jpeg': {'quality': 82, 'optimize': True, 'progressive': True},
+}
+# `sizes` for the thumbnails and modal images (Bootstrap 3 columns)
+DEFAULT_SIZES = '(min-width: 1200px) 750px, (min-width: 768px) 50vw, 100vw'
+
+
+def _rel(path, root=ROOT_DIR):
+    return os.path.relpath(path, root).replace(os.sep, '/')
+
+
+def find_images(img_dir=IMG_DIR, output_dir=OUTPUT_DIR):
+    """Source images under `img_dir`, skipping the output directory."""
+    for dirpath, dirnames, filenames in os.walk(img_dir):
+        dirnames[:] = sorted(d for d in dirnames
+                             if os.path.join(dirpath, d) != output_dir)
+        for name in sorted(filenames):
+            if name.lower().endswith(SOURCE_EXTENSIONS):
+                yield os.path.join(dirpath, name)
+
+
+def variant_widths(source_width, widths):
+    """Widths to render: those below the source width, plus the source width if smaller than the largest."""
+    chosen = [w for w in sorted(widths) if w < source_width]
+    if source_width <= max(widths):
+        chosen.append(source_width)
+    return chosen
+
+
+def optimize_image(job):
+    """
+    Worker: render every variant of one image. `job` is
+    (source path, sha256, widths, formats, img_dir, output_dir, root).
+    Returns the manifest entry for the image.
+    """
+    from PIL import Image, ImageOps
+
+    path, digest, widths, formats, img_dir, output_dir, root = job
+    stem = os.path.splitext(os.path.relpath(path, img_dir))[0]
+    entry = {'sha256': digest, 'variants': {fmt: [] for fmt in formats}}
+
+    with Image.open(path) as image:
+        image = ImageOps.exif_transpose(image)
+        entry['width'], entry['height'] = image.size
+        has_alpha = image.mode in ('RGBA', 'LA') or 'transparency' in image.info
+        base = image.convert('RGBA' if has_alpha else 'RGB')
+
+        for width in variant_widths(image.width, widths):
+            height = max(1, round(image.height * width / image.width))
+            resized = base if width == image.width else base.resize((width, height), Image.LANCZOS)
+            for fmt in formats:
+                out = resized
+                if fmt == 'jpeg' and has_alpha:
+                    out = Image.new('RGB', resized.size, (255, 255, 255))
+                    out.paste(resized, mask=resized.getchannel('A'))
+                target = os.path.join(output_dir, f"{stem}-{width}{EXTENSIONS[fmt]}")
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                tmp = target + '.tmp'
+                out.save(tmp, format=fmt.upper(), **SAVE_OPTIONS[fmt])
+                os.replace(tmp, target)
+                entry['variants'][fmt].append({
+                    'path': _rel(target, root), 'width': width, 'height': height,
+                    'bytes': os.path.getsize(target),
+                })
+    return _rel(path, root), entry
+
+
+def load_manifest(path=MANIFEST_FILE):
+    if not os.path.exists(path):
+        return {'version': MANIFEST_VERSION, 'images': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('version') != MANIFEST_VERSION:
+        return {'version': MANIFEST_VERSION, 'images': {}}
+    return manifest
+
+
+def _up_to_date(entry, digest, widths, formats, root):
+    if not entry or entry.get('sha256') != digest:
+        return False
+    expected = variant_widths(entry['width'], widths)
+    for fmt in formats:
+        variants = entry['variants'].get(fmt)
+        if variants is None or [v['width'] for v in variants] != expected:
+            return False
+        if not all(os.path.exists(os.path.join(root, v['path'])) for v in variants):
+            return False
+    return True
+
+
+def optimize_images(widths=DEFAULT_WIDTHS, formats=DEFAULT_FORMATS, max_workers=None,
+                    img_dir=IMG_DIR, output_dir=OUTPUT_DIR, manifest_file=MANIFEST_FILE,
+                    root=ROOT_DIR, force=False):
+    """
+    Convert new or changed images and rewrite the manifest.
+    Returns (converted, skipped) lists of source paths.
+    """
+    manifest = load_manifest(manifest_file)
+    images = manifest['images']
+    jobs, skipped, seen = [], [], set()
+    for path in find_images(img_dir, output_dir):
+        rel = _rel(path, root)
+        seen.add(rel)
+        digest = file_sha256(path)
+        if not force and _up_to_date(images.get(rel), digest, widths, formats, root):
+            skipped.append(rel)
+            continue
+        jobs.append((path, digest, tuple(widths), tuple(formats), img_dir, output_dir, root))
+
+    converted = []
+    if jobs:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for rel, entry in executor.map(optimize_image, jobs):
+                images[rel] = entry
+                converted.append(rel)
+
+    # Forget images that were deleted from img/
+    for rel in set(images) - seen:
+        del images[rel]
+    manifest.update(widths=list(widths), formats=list(formats), images=dict(sorted(images.items())))
+    atomic_write(manifest_file, json.dumps(manifest, indent=2) + '\n')
+    return converted, skipped
+
+
+def srcset(entry, fmt):
+    """`srcset` attribute value for one format of a manifest entry."""
+    return ", ".join(f"{v['path']} {v['width']}w" for v in entry['variants'].get(fmt, []))
+
+
+def _supported_formats(formats):
+    from PIL import features
+    supported = []
+    for fmt in formats:
+        if fmt == 'jpeg' or features.check(fmt):
+            supported.append(fmt)
+        else:
+            print(f"⚠️  Pillow was built without {fmt.upper()} support, skipping {fmt}")
+    return supported
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build responsive WebP/AVIF/JPEG variants of img/")
+    parser.add_argument('--widths', type=int, nargs='+', default=list(DEFAULT_WIDTHS),
+                        help="Variant widths in pixels")
+    parser.add_argument('--formats', nargs='+', choices=DEFAULT_FORMATS, default=list(DEFAULT_FORMATS),
+                        help="Output formats")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Worker processes (default: one per CPU)")
+    parser.add_argument('--force', action='store_true', help="Reconvert images even if unchanged")
+    args = parser.parse_args()
+
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        print("Error: Pillow is required for image optimization (pip install Pillow)")
+        sys.exit(1)
+
+    formats = _supported_formats(args.formats)
+    start = time.perf_counter()
+    converted, skipped = optimize_images(args.widths, formats, args.workers, force=args.force)
+    elapsed = time.perf_counter() - start
+
+    manifest = load_manifest()
+    source_bytes = sum(os.path.getsize(os.path.join(ROOT_DIR, rel)) for rel in manifest['images'])
+    # Variants are listed narrowest first: compare the widest one per format
+    smallest = sum(min((variants[-1]['bytes'] for variants in entry['variants'].values() if variants),
+                       default=0)
+                   for entry in manifest['images'].values())
+    print(f"✅ Converted {len(converted)} image(s), skipped {len(skipped)} unchanged in {elapsed:.1f}s")
+    print(f"📊 Sources: {source_bytes / 1e6:.1f} MB; best full-width variants: {smallest / 1e6:.1f} MB")
+    print(f"Manifest written to {_rel(MANIFEST_FILE)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Optimize the PDFs linked from the site and build preview thumbnails.
+
+For every PDF under files/ and img/research/ (in parallel, one process per
+CPU):
+  * embedded 8-bit RGB/grey images wider than --max-image-width are
+    downsampled, and images that shrink noticeably as JPEG are re-encoded;
+  * streams are recompressed and the file is saved linearized ("fast web
+    view") so browsers can show the first page before the download ends;
+  * the first page is rendered to a small WebP thumbnail under
+    img/pdf-thumbs/.
+
+The optimized file replaces the original (atomically) only when it is
+smaller, or when it adds linearization for at most 5% more bytes. Results go
+to files/pdf_manifest.json (page count, bytes before/after, thumbnail);
+files whose SHA-256 matches the manifest are skipped on the next run.
+`pdf_label` turns a manifest entry into the "PDF, 6 pages, 184 KB" label the
+generators print next to links.
+
+Requires pikepdf and Pillow; thumbnails additionally need pypdfium2 or
+PyMuPDF. (`pip install pikepdf Pillow pypdfium2`)
+
+Usage:
+    python scripts/optimize_pdfs.py
+    python scripts/optimize_pdfs.py --dry-run     # report savings, keep originals
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from fsutil import atomic_write, file_sha256
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_ROOTS = ['files', 'img/research']
+THUMB_DIR = 'img/pdf-thumbs'
+MANIFEST_FILE = os.path.join(ROOT_DIR, 'files', 'pdf_manifest.json')
+
+DEFAULT_THUMB_WIDTH = 320
+DEFAULT_MAX_IMAGE_WIDTH = 1600
+DEFAULT_JPEG_QUALITY = 85
+# Linearization is worth this much growth on files that do not shrink
+MAX_GROWTH = 1.05
+
+
+def _rel(path, root=ROOT_DIR):
+    return os.path.relpath(path, root).replace(os.sep, '/')
+
+
+def find_pdfs(roots=DEFAULT_ROOTS, root=ROOT_DIR):
+    for top in roots:
+        for dirpath, dirnames, filenames in os.walk(os.path.join(root, top)):
+            dirnames.sort()
+            for name in sorted(filenames):
+                if name.lower().endswith('.pdf'):
+                    yield os.path.join(dirpath, name)
+
+
+def recompress_images(pdf, max_width, quality):
+    """Downsample/re-encode embedded images in place; returns bytes saved."""
+    import pikepdf
+    from PIL import Image
+
+    saved = 0
+    for obj in pdf.objects:
+        if not isinstance(obj, pikepdf.Stream) or obj.get('/Subtype') != '/Image':
+            continue
+        if obj.get('/ImageMask') or '/Decode' in obj:
+            continue
+        try:
+            pdf_image = pikepdf.PdfImage(obj)
+            if pdf_image.colorspace not in ('/DeviceRGB', '/DeviceGray') or pdf_image.bits_per_component != 8:
+                continue
+            image = pdf_image.as_pil_image()
+        except Exception:
+            # Unsupported filters/colour spaces are left untouched
+            continue
+        old_size = len(obj.read_raw_bytes())
+        if image.width > max_width:
+            image = image.resize((max_width, max(1, round(image.height * max_width / image.width))),
+                                 Image.LANCZOS)
+        elif pdf_image.filters == ['/DCTDecode']:
+            # Already JPEG at a sensible size: re-encoding would only lose quality
+            continue
+        buffer = io.BytesIO()
+        image.convert('L' if pdf_image.colorspace == '/DeviceGray' else 'RGB').save(
+            buffer, format='JPEG', quality=quality, optimize=True)
+        data = buffer.getvalue()
+        if len(data) >= old_size * 0.9:
+            continue
+        obj.write(data, filter=pikepdf.Name.DCTDecode)
+        obj.Width, obj.Height = image.width, image.height
+        obj.ColorSpace = pikepdf.Name(pdf_image.colorspace)
+        obj.BitsPerComponent = 8
+        if '/DecodeParms' in obj:
+            del obj['/DecodeParms']
+        saved += old_size - len(data)
+    return saved
+
+
+def render_thumbnail(path, target, width):
+    """Render page 1 of `path` to a WebP at `target`; returns (width, height) or None."""
+    try:
+        import pypdfium2 as pdfium
+        document = pdfium.PdfDocument(path)
+        page = document[0]
+        image = page.render(scale=width / page.get_width()).to_pil()
+    except ImportError:
+        try:
+            import fitz
+        except ImportError:
+            return None
+        from PIL import Image
+        page = fitz.open(path)[0]
+        scale = width / page.rect.width
+        pixmap = page.get_pixmap(matrix=fitz.Matrix(scale, scale))
+        image = Image.frombytes('RGB', (pixmap.width, pixmap.height), pixmap.samples)
+    buffer = io.BytesIO()
+    image.convert('RGB').save(buffer, format='WEBP', quality=75, method=6)
+    atomic_write(target, buffer.getvalue())
+    return image.size
+
+
+def optimize_pdf(job):
+    """
+    Worker: optimize one PDF. `job` is
+    (path, root, thumb_width, max_image_width, quality, recompress, dry_run).
+    Returns (relative path, manifest entry).
+    """
+    import pikepdf
+
+    path, root, thumb_width, max_image_width, quality, recompress, dry_run = job
+    rel = _rel(path, root)
+    original_bytes = os.path.getsize(path)
+    entry = {'original_bytes': original_bytes}
+    try:
+        with pikepdf.open(path) as pdf:
+            entry['pages'] = len(pdf.pages)
+            was_linearized = pdf.is_linearized
+            if recompress:
+                recompress_images(pdf, max_image_width, quality)
+            buffer = io.BytesIO()
+            pdf.remove_unreferenced_resources()
+            pdf.save(buffer, linearize=True, compress_streams=True,
+                     object_stream_mode=pikepdf.ObjectStreamMode.generate)
+        data = buffer.getvalue()
+        keep = len(data) < original_bytes or (not was_linearized and len(data) <= original_bytes * MAX_GROWTH)
+        entry['optimized_bytes'] = len(data)
+        if keep and not dry_run:
+            atomic_write(path, data)
+        entry['bytes'] = os.path.getsize(path)
+        entry['linearized'] = keep or was_linearized
+    except pikepdf.PdfError as e:
+        entry.update(error=str(e), bytes=original_bytes)
+        return rel, entry
+
+    if not dry_run:
+        thumb = f"{THUMB_DIR}/{os.path.splitext(rel)[0]}.webp"
+        size = render_thumbnail(path, os.path.join(root, thumb), thumb_width)
+        if size:
+            entry.update(thumbnail=thumb, thumb_width=size[0], thumb_height=size[1])
+    entry['sha256'] = file_sha256(path)
+    return rel, entry
+
+
+def load_pdf_manifest(path=MANIFEST_FILE):
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def format_bytes(n):
+    return f"{n / 1024:.0f} KB" if n < 1024 * 1024 else f"{n / 1024 / 1024:.1f} MB"
+
+
+def pdf_label(entry):
+    """'PDF, 6 pages, 184 KB' for a manifest entry."""
+    pages = entry.get('pages')
+    parts = ['PDF']
+    if pages:
+        parts.append(f"{pages} page{'s' if pages != 1 else ''}")
+    parts.append(format_bytes(entry['bytes']))
+    return ", ".join(parts)
+
+
+def optimize_pdfs(roots=DEFAULT_ROOTS, thumb_width=DEFAULT_THUMB_WIDTH,
+                  max_image_width=DEFAULT_MAX_IMAGE_WIDTH, quality=DEFAULT_JPEG_QUALITY,
+                  recompress=True, dry_run=False, max_workers=None, force=False,
+                  root=ROOT_DIR, manifest_file=MANIFEST_FILE):
+    """Optimize new or changed PDFs; returns (manifest, processed, skipped)."""
+    manifest = load_pdf_manifest(manifest_file)
+    jobs, skipped, seen = [], [], set()
+    for path in find_pdfs(roots, root):
+        rel = _rel(path, root)
+        seen.add(rel)
+        entry = manifest.get(rel)
+        if (not force and entry and entry.get('sha256') == file_sha256(path)
+                and (not entry.get('thumbnail') or os.path.exists(os.path.join(root, entry['thumbnail'])))):
+            skipped.append(rel)
+            continue
+        jobs.append((path, root, thumb_width, max_image_width, quality, recompress, dry_run))
+
+    processed = []
+    if jobs:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for rel, entry in executor.map(optimize_pdf, jobs):
+                manifest[rel] = entry
+                processed.append(rel)
+
+    manifest = {rel: manifest[rel] for rel in sorted(manifest) if rel in seen}
+    if not dry_run:
+        atomic_write(manifest_file, json.dumps(manifest, indent=2) + '\n')
+    return manifest, processed, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Linearize/recompress site PDFs and render thumbnails")
+    parser.add_argument('roots', nargs='*', default=DEFAULT_ROOTS,
+                        help=f"Directories to scan (default: {' '.join(DEFAULT_ROOTS)})")
+    parser.add_argument('--thumb-width', type=int, default=DEFAULT_THUMB_WIDTH, help="Thumbnail width in px")
+    parser.add_argument('--max-image-width', type=int, default=DEFAULT_MAX_IMAGE_WIDTH,
+                        help="Downsample embedded images wider than this")
+    parser.add_argument('--quality', type=int, default=DEFAULT_JPEG_QUALITY, help="JPEG quality for re-encoded images")
+    parser.add_argument('--no-recompress', action='store_true', help="Only linearize; leave images alone")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument('--force', action='store_true', help="Reprocess files already in the manifest")
+    parser.add_argument('--dry-run', action='store_true', help="Report savings without replacing files")
+    args = parser.parse_args()
+
+    try:
+        import pikepdf  # noqa: F401
+        import PIL  # noqa: F401
+    except ImportError:
+        print("Error: pikepdf and Pillow are required (pip install pikepdf Pillow pypdfium2)")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    manifest, processed, skipped = optimize_pdfs(
+        args.roots, args.thumb_width, args.max_image_width, args.quality,
+        not args.no_recompress, args.dry_run, args.workers, args.force)
+
+    before = after = 0
+    for rel in processed:
+        entry = manifest[rel]
+        if 'error' in entry:
+            print(f"❌ {rel}: {entry['error']}")
+            continue
+        new = entry['optimized_bytes'] if args.dry_run else entry['bytes']
+        before, after = before + entry['original_bytes'], after + min(new, entry['original_bytes'])
+        print(f"✅ {rel}: {entry['pages']} pages, {format_bytes(entry['original_bytes'])} → {format_bytes(new)}"
+              f"{'' if entry.get('thumbnail') or args.dry_run else ' (no thumbnail: install pypdfium2 or PyMuPDF)'}")
+    print(f"📊 Processed {len(processed)}, skipped {len(skipped)} unchanged in {time.perf_counter() - start:.1f}s; "
+          f"{format_bytes(before)} → {format_bytes(after)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Write precompressed .gz and .br siblings of the generated pages and assets.
+
+Run after the other build steps. Every matching file (index.html, cv.html,
+modal fragments, CSS and JS) is compressed at the maximum level (gzip -9,
+brotli quality 11) in a process pool, and each output is decompressed again
+and compared with the source before it is written, so a static host or the
+preview server can serve it as-is. Files whose SHA-256 matches the manifest
+(.cache/precompress.json) and whose siblings exist are skipped; variants
+that would not be smaller than the source are not written. The gzip header
+carries no timestamp, so unchanged input gives byte-identical output.
+
+Brotli output needs the `brotli` package (`pip install brotli`); without it
+only .gz files are written.
+
+Usage:
+    python scripts/precompress.py
+    python scripts/precompress.py css/dist/*.css    # just these files
+    python scripts/precompress.py --clean           # remove all .gz/.br siblings
+"""
+
+import argparse
+import glob
+import gzip
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from fsutil import atomic_write, file_sha256
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MANIFEST_FILE = os.path.join(ROOT_DIR, '.cache', 'precompress.json')
+DEFAULT_PATTERNS = [
+    'index.html',
+    'cv.html',
+    'fragments/*.html',
+    'css/**/*.css',
+    'js/**/*.js',
+    'css/**/*.svg',
+    'img/**/*.svg',
+]
+# Below this size the headers eat most of the savings
+MIN_SIZE = 256
+EXTENSIONS = {'gzip': '.gz', 'br': '.br'}
+
+
+def find_files(patterns=DEFAULT_PATTERNS, root=ROOT_DIR):
+    """Files matching `patterns` (relative to `root`), sorted and de-duplicated."""
+    found = set()
+    for pattern in patterns:
+        for path in glob.glob(os.path.join(root, pattern), recursive=True):
+            if os.path.isfile(path) and not path.endswith(tuple(EXTENSIONS.values())):
+                found.add(os.path.relpath(path, root).replace(os.sep, '/'))
+    return sorted(found)
+
+
+def _codecs():
+    codecs = {'gzip': (lambda data: gzip.compress(data, compresslevel=9, mtime=0), gzip.decompress)}
+    try:
+        import brotli
+    except ImportError:
+        return codecs
+    codecs['br'] = (lambda data: brotli.compress(data, quality=11), brotli.decompress)
+    return codecs
+
+
+def compress_file(job):
+    """
+    Worker: compress one file with every available codec. `job` is
+    (relative path, root, dry_run). Returns (path, entry) where entry maps
+    codec -> compressed size (None if not written) plus 'bytes'/'sha256', or
+    has an 'error' if a round trip failed.
+    """
+    rel, root, dry_run = job
+    path = os.path.join(root, rel)
+    with open(path, 'rb') as f:
+        data = f.read()
+    entry = {'bytes': len(data), 'sha256': file_sha256(path)}
+
+    for name, (compress, decompress) in _codecs().items():
+        target = path + EXTENSIONS[name]
+        packed = compress(data)
+        if decompress(packed) != data:
+            entry['error'] = f"{name} round trip mismatch"
+            return rel, entry
+        if len(packed) >= len(data) or len(data) < MIN_SIZE:
+            entry[name] = None
+            if os.path.exists(target) and not dry_run:
+                os.remove(target)
+            continue
+        entry[name] = len(packed)
+        if not dry_run:
+            atomic_write(target, packed)
+    return rel, entry
+
+
+def load_manifest(path=MANIFEST_FILE):
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _up_to_date(entry, rel, codecs, root):
+    if not entry or 'error' in entry or entry.get('sha256') != file_sha256(os.path.join(root, rel)):
+        return False
+    for name in codecs:
+        if name not in entry:
+            return False
+        if entry[name] is not None and not os.path.exists(os.path.join(root, rel + EXTENSIONS[name])):
+            return False
+    return True
+
+
+def precompress(patterns=DEFAULT_PATTERNS, root=ROOT_DIR, manifest_file=MANIFEST_FILE,
+                max_workers=None, force=False, dry_run=False):
+    """Compress new or changed files; returns (manifest, processed, skipped)."""
+    manifest = load_manifest(manifest_file)
+    codecs = list(_codecs())
+    files = find_files(patterns, root)
+    processed, skipped, jobs = [], [], []
+    for rel in files:
+        if not force and _up_to_date(manifest.get(rel), rel, codecs, root):
+            skipped.append(rel)
+        else:
+            jobs.append((rel, root, dry_run))
+
+    if jobs:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for rel, entry in executor.map(compress_file, jobs):
+                manifest[rel] = entry
+                processed.append(rel)
+
+    # Forget files that no longer exist
+    manifest = {rel: manifest[rel] for rel in sorted(manifest) if os.path.exists(os.path.join(root, rel))}
+    if not dry_run:
+        atomic_write(manifest_file, json.dumps(manifest, indent=1) + '\n')
+    return manifest, processed, skipped
+
+
+def clean(patterns=DEFAULT_PATTERNS, root=ROOT_DIR):
+    """Delete the .gz/.br siblings of every matching file; returns how many."""
+    removed = 0
+    for rel in find_files(patterns, root):
+        for ext in EXTENSIONS.values():
+            target = os.path.join(root, rel + ext)
+            if os.path.exists(target):
+                os.remove(target)
+                removed += 1
+    return removed
+
+
+def _ratio(size, original):
+    return f"{size / original:6.1%}" if size is not None else "   -  "
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write .gz/.br siblings of the generated pages and assets")
+    parser.add_argument('patterns', nargs='*', default=DEFAULT_PATTERNS,
+                        help="Glob patterns relative to the site root (default: pages, fragments, CSS, JS)")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument('--force', action='store_true', help="Recompress files even if unchanged")
+    parser.add_argument('--dry-run', action='store_true', help="Report ratios without writing")
+    parser.add_argument('--clean', action='store_true', help="Remove all precompressed siblings and exit")
+    args = parser.parse_args()
+
+    if args.clean:
+        print(f"✅ Removed {clean(args.patterns)} precompressed file(s)")
+        return
+
+    codecs = list(_codecs())
+    if 'br' not in codecs:
+        print("⚠️  brotli is not installed, writing .gz only (pip install brotli)")
+
+    start = time.perf_counter()
+    manifest, processed, skipped = precompress(args.patterns, max_workers=args.workers,
+                                               force=args.force, dry_run=args.dry_run)
+    elapsed = time.perf_counter() - start
+
+    failed = False
+    totals = {'bytes': 0, **{name: 0 for name in codecs}}
+    for rel in processed:
+        entry = manifest[rel]
+        if 'error' in entry:
+            print(f"❌ {rel}: {entry['error']}")
+            failed = True
+            continue
+        ratios = "  ".join(f"{name} {_ratio(entry[name], entry['bytes'])}" for name in codecs)
+        print(f"✅ {rel}: {entry['bytes'] / 1024:.1f} KB  {ratios}")
+    for entry in manifest.values():
+        if 'error' in entry:
+            continue
+        totals['bytes'] += entry['bytes']
+        for name in codecs:
+            totals[name] += entry.get(name) or entry['bytes']
+    if totals['bytes']:
+        summary = ", ".join(f"{name} {totals[name] / 1024:.0f} KB ({totals[name] / totals['bytes']:.1%})"
+                            for name in codecs)
+        print(f"📊 Processed {len(processed)}, skipped {len(skipped)} unchanged in {elapsed:.1f}s; "
+              f"{totals['bytes'] / 1024:.0f} KB → {summary}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Hash-indexed publication lookup used to deduplicate merges.
+
+Publications are keyed three ways: by normalized title, by DOI and by
+Google Scholar publication id, each held in a dict so an exact lookup is
+O(1) and merging N publications is O(N). Titles are normalized with NFKC,
+casefolded, have Unicode dashes folded to '-' and punctuation dropped, so
+"Simulation‐Tested" (U+2010) and "Simulation-Tested" collide.
+
+Near-duplicates (a typo, a dropped subtitle word) are found through an
+inverted index of character trigrams: candidates sharing trigrams with the
+query are scored by Jaccard similarity, so only publications that overlap
+the query are ever compared. A candidate whose DOI or Scholar id differs
+from the query's is never a near-duplicate ("... Part I" vs "... Part II").
+"""
+
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+# Hyphen, non-breaking hyphen, figure dash, en/em dash, horizontal bar, minus
+_DASHES = dict.fromkeys(map(ord, '‐‑‒–—―−﹣－'), '-')
+_NON_WORD = re.compile(r'[\W_]+')
+_DOI = re.compile(r'10\.\d{4,9}/[^\s"<>?#]+', re.I)
+
+DEFAULT_THRESHOLD = 0.8
+
+
+def normalize_title(title):
+    """Canonical form of a title for exact matching."""
+    text = unicodedata.normalize('NFKC', str(title or '')).casefold().translate(_DASHES)
+    return _NON_WORD.sub(' ', text).strip()
+
+
+def normalize_doi(value):
+    """Extract a lowercase DOI from a DOI string or URL, or None."""
+    match = _DOI.search(str(value or ''))
+    return match.group().rstrip('.').lower() if match else None
+
+
+def trigrams(normalized):
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class PublicationIndex:
+    """
+    Index of publication records by normalized title, DOI and Scholar id.
+
+    Records can be anything (YAML dicts, `Publication` objects); the index
+    only stores them and hands them back from lookups.
+    """
+
+    def __init__(self):
+        self.by_title = {}
+        self.by_doi = {}
+        self.by_scholar_id = {}
+        self._grams = {}
+        self._postings = defaultdict(set)
+        self._ids = {}
+
+    def __len__(self):
+        return len(self._grams)
+
+    def add(self, record, title, doi=None, scholar_id=None):
+        key = normalize_title(title)
+        if key:
+            self.by_title.setdefault(key, record)
+            self._ids.setdefault(key, (normalize_doi(doi), scholar_id or None))
+            if key not in self._grams:
+                self._grams[key] = trigrams(key)
+                for gram in self._grams[key]:
+                    self._postings[gram].add(key)
+        doi = normalize_doi(doi)
+        if doi:
+            self.by_doi.setdefault(doi, record)
+        if scholar_id:
+            self.by_scholar_id.setdefault(scholar_id, record)
+
+    def remove(self, title):
+        key = normalize_title(title)
+        record = self.by_title.pop(key, None)
+        self._ids.pop(key, None)
+        for gram in self._grams.pop(key, ()):
+            self._postings[gram].discard(key)
+        for table in (self.by_doi, self.by_scholar_id):
+            for k in [k for k, v in table.items() if v is record]:
+                del table[k]
+        return record
+
+    def _conflicts(self, key, doi, scholar_id):
+        """True if the record titled `key` has a different DOI or Scholar id."""
+        other_doi, other_scholar_id = self._ids.get(key, (None, None))
+        return bool(doi and other_doi and doi != other_doi
+                    or scholar_id and other_scholar_id and scholar_id != other_scholar_id)
+
+    def similar(self, title, threshold=DEFAULT_THRESHOLD, doi=None, scholar_id=None):
+        """
+        Best (record, score) among near-duplicate titles, or (None, 0.0).
+        Candidates with a DOI or Scholar id other than `doi`/`scholar_id`
+        are skipped.
+        """
+        key = normalize_title(title)
+        grams = trigrams(key) if key else set()
+        doi = normalize_doi(doi)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._postings.get(gram, ()))
+        best, best_score = None, 0.0
+        for candidate, overlap in shared.items():
+            score = overlap / (len(grams) + len(self._grams[candidate]) - overlap)
+            if score > best_score and not self._conflicts(candidate, doi, scholar_id):
+                best, best_score = candidate, score
+        if best is None or best_score < threshold:
+            return None, 0.0
+        return self.by_title[best], best_score
+
+    def find(self, title=None, doi=None, scholar_id=None, threshold=DEFAULT_THRESHOLD):
+        """
+        Look up an existing record: by Scholar id, then DOI, then exact
+        normalized title, then (unless `threshold` is None) fuzzy title match
+        against records without a conflicting DOI or Scholar id.
+        """
+        if scholar_id and scholar_id in self.by_scholar_id:
+            return self.by_scholar_id[scholar_id]
+        doi = normalize_doi(doi)
+        if doi and doi in self.by_doi:
+            return self.by_doi[doi]
+        key = normalize_title(title)
+        if key in self.by_title:
+            return self.by_title[key]
+        if threshold is None or not key:
+            return None
+        return self.similar(title, threshold, doi=doi, scholar_id=scholar_id)[0]
+
+    def __contains__(self, title):
+        return self.find(title) is not None
+
+    @classmethod
+    def from_publications(cls, publications):
+        """Index `site_model.Publication` records (DOI taken from the link)."""
+        index = cls()
+        for pub in publications:
+            index.add(pub, pub.title, doi=pub.link)
+        return index
+
+    @classmethod
+    def from_entries(cls, entries):
+        """Index `_data/publications.yml` entries."""
+        index = cls()
+        for entry in entries:
+            index.add(entry, entry.get('title'), doi=entry.get('doi') or entry.get('link'),
+                      scholar_id=entry.get('scholar_id'))
+        return index
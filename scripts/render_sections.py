@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Render the research and teaching sections of index.html from YAML.
+
+_data/research.yml describes the research cards and their modals,
+_data/teaching.yml the course grid. The generated markup lives between
+marker comments in index.html:
+
+    <!-- render:research-grid 3f2a9c1b0d4e -->
+    ...
+    <!-- /render:research-grid -->
+
+The hex digest in the opening marker is the SHA-1 of the YAML entry the
+region was rendered from plus the templates, so a rebuild only re-renders
+regions (and, inside `research-modals`, individual modals) whose data or
+template changed; everything else is copied through untouched. Markup
+outside the markers is never touched.
+
+With --lazy, each modal's content is written to fragments/<id>.html
+instead and the page keeps only the modal shell (title and close button)
+with a `data-fragment` placeholder; js/modal-fragments.js fetches the
+fragment the first time the modal opens, so the initial page carries none
+of the modal images. Fragments of modals that no longer exist are removed,
+and a render without --lazy removes fragments/ altogether. Switching
+between the two modes also adds or drops the modal-fragments.js script
+(rebuilding the bundles if the page uses them).
+
+Run rewrite_images.py and bundle_assets.py afterwards, as for any other
+edit of index.html.
+
+Usage:
+    python scripts/render_sections.py
+    python scripts/render_sections.py --dry-run   # list regions that would change
+    python scripts/render_sections.py --force     # re-render every region
+    python scripts/render_sections.py --lazy      # modal bodies as fragments/<id>.html
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import os
+import re
+import sys
+
+from bundle_assets import LAZY_MARKER, build_bundles, is_bundled, rewrite_html
+from fsutil import atomic_write, file_lock
+from site_data import load_yaml
+from template import Template
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_HTML_FILE = os.path.join(ROOT_DIR, 'index.html')
+RESEARCH_FILE = os.path.join(ROOT_DIR, '_data', 'research.yml')
+TEACHING_FILE = os.path.join(ROOT_DIR, '_data', 'teaching.yml')
+FRAGMENT_DIR = 'fragments'
+
+REGION_RE = re.compile(
+    r'^(?P<indent>[ \t]*)<!-- render:(?P<key>[\w-]+)(?: (?P<digest>[0-9a-f]*))? -->\n'
+    r'(?P<body>.*?)'
+    r'^[ \t]*<!-- /render:(?P=key) -->', re.M | re.S)
+
+RESEARCH_CARD = Template("""
+                <div class="col-md-4 col-sm-6 research-item">
+                    <a href="#{id}" class="research-link" data-toggle="modal">
+                        <div class="research-hover">
+                            <div class="research-hover-content">
+                                <i class="fa fa-plus fa-3x"></i>
+                            </div>
+                        </div>
+                        <img src="{thumbnail}" class="img-responsive img-centered" alt="{title}">
+                    </a>
+                    <div class="research-caption">
+                        <h4>{title}</h4>
+                        <p class="text-muted">{subtitle}</p>
+                    </div>
+                </div>
+""")
+
+MODAL_START = Template("""    <div class="research-modal modal fade" id="{id}" tabindex="-1" role="dialog" aria-hidden="true">
+        <div class="modal-content">
+            <div class="close-modal" data-dismiss="modal">
+                <div class="lr">
+                    <div class="rl">
+                    </div>
+                </div>
+            </div>
+            <div class="container">
+                <div class="row">
+                    <div class="col-lg-8 col-lg-offset-2">
+                        <div class="modal-body">
+                            <h2>{title}</h2>
+                            <hr class="star-primary">
+""")
+
+MODAL_END = """                            <br><br>
+                            <button type="button" class="btn btn-default" data-dismiss="modal"><i
+                                    class="fa fa-times"></i>
+                                Close</button>
+                        </div>
+                    </div>
+                </div>
+            </div>
+        </div>
+    </div>
+"""
+
+INDENT = " " * 28
+
+LAZY_BODY = Template(INDENT + """<div class="modal-fragment" data-fragment="{fragment}">
+                                <p class="text-muted"><a href="{fragment}">Loading…</a></p>
+                            </div>
+""")
+
+IMAGE = Template(INDENT + '<img src="{src}" class="img-responsive img-centered" alt="">\n')
+
+COURSE = Template("""                <div class="col-md-4">
+                    <a href="{link}" target="_blank" class="image featured"><img src="{image}"
+                            class="img-responsive img-centered" alt="{title}" /></a>
+                    <h4 class="service-heading"><a href="{link}" target="_blank">{title}</a></h4>
+                    <p>{course_id} @ {university}</p>
+                </div>
+""")
+
+COURSES_PER_ROW = 3
+
+# Any change to the markup invalidates every rendered region
+_TEMPLATES_DIGEST = hashlib.sha1("".join(
+    t.source for t in (RESEARCH_CARD, MODAL_START, IMAGE, COURSE)).encode('utf-8')
+    + MODAL_END.encode('utf-8')).hexdigest()
+
+
+def digest(data, salt=''):
+    """Short SHA-1 of a region's data and the templates it is rendered with."""
+    payload = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str) + _TEMPLATES_DIGEST + salt
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:12]
+
+
+def _attr(value):
+    return html.escape(str(value).strip(), quote=True)
+
+
+def inline_html(text):
+    """YAML item text -> HTML: `**bold**` becomes <strong>, embedded tags pass through."""
+    return re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', str(text).strip())
+
+
+def render_research_grid(entries):
+    for entry in entries:
+        yield from RESEARCH_CARD.stream(id=_attr(entry['id']), thumbnail=_attr(entry.get('thumbnail', '')),
+                                        title=_attr(entry['title']), subtitle=_attr(entry.get('subtitle', '')))
+
+
+def _render_item(item):
+    title, link = item.get('title'), item.get('link')
+    if item.get('heading'):
+        # A subheading inside a section, not a separate project
+        yield f"{INDENT}<h4>{_attr(item['heading'])}</h4>\n"
+    if title:
+        heading = f'<a href="{_attr(link)}" target="_blank">{_attr(title)}</a>' if link else _attr(title)
+        yield f"{INDENT}<h4>{heading}</h4>\n"
+    if item.get('text'):
+        yield f'{INDENT}<p class="large">\n{INDENT}    {inline_html(item["text"])}\n{INDENT}</p>\n'
+    images = [IMAGE.render(src=_attr(src)) for src in item.get('images') or []]
+    if link and not title and images:
+        # Untitled items link through their images
+        images = [f'{INDENT}<a href="{_attr(link)}" target="_blank">\n    {img}{INDENT}</a>\n' for img in images]
+    yield from images
+
+
+def render_modal_content(entry):
+    """Everything inside a modal between its title and the close button."""
+    if entry.get('expertise'):
+        yield f"{INDENT}<h4>Areas of expertise:</h4>\n{INDENT}<ul>\n"
+        for area in entry['expertise']:
+            yield f'{INDENT}    <li style="margin:10px">{_attr(area)}</li>\n'
+        yield f"{INDENT}</ul>\n"
+    for index, section in enumerate(entry.get('sections') or []):
+        if index or entry.get('expertise'):
+            yield f"{INDENT}<hr>\n"
+        if section.get('title') and section['title'] != entry['title']:
+            yield f"{INDENT}<h3>{_attr(section['title'])}</h3>\n"
+        for item_index, item in enumerate(section.get('items') or []):
+            # Titled items are separate projects: rule them off from each other
+            if item_index and item.get('title'):
+                yield f"{INDENT}<hr>\n"
+            yield from _render_item(item)
+
+
+def render_modal(entry, fragment=None):
+    """A full modal, or with `fragment` (a URL) its shell with a lazy-load placeholder."""
+    yield from MODAL_START.stream(id=_attr(entry['id']), title=_attr(entry['title']))
+    if fragment:
+        yield from LAZY_BODY.stream(fragment=_attr(fragment))
+    else:
+        yield from render_modal_content(entry)
+    yield MODAL_END
+
+
+def render_courses(courses):
+    for start in range(0, len(courses), COURSES_PER_ROW):
+        yield '            <div class="row text-center">\n'
+        for course in courses[start:start + COURSES_PER_ROW]:
+            yield from COURSE.stream(**{key: _attr(course.get(key, '')) for key in
+                                        ('link', 'image', 'title', 'course_id', 'university')})
+        yield '            </div>\n'
+
+
+def _marker(indent, key, data_digest, body):
+    return f"{indent}<!-- render:{key} {data_digest} -->\n{body}{indent}<!-- /render:{key} -->"
+
+
+def write_fragment(entry, root=ROOT_DIR):
+    """Write fragments/<id>.html for one modal; returns its site-relative URL."""
+    rel = f"{FRAGMENT_DIR}/{entry['id']}.html"
+    path = os.path.join(root, rel)
+    content = "".join(render_modal_content(entry))
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return rel
+    atomic_write(path, content)
+    return rel
+
+
+def remove_stale_fragments(ids, root=ROOT_DIR):
+    """Remove fragments whose id is not in `ids`, and the directory once it is empty."""
+    fragment_dir = os.path.join(root, FRAGMENT_DIR)
+    if not os.path.isdir(fragment_dir):
+        return
+    for name in os.listdir(fragment_dir):
+        if name.endswith('.html') and name[:-len('.html')] not in ids:
+            os.remove(os.path.join(fragment_dir, name))
+    if not os.listdir(fragment_dir):
+        os.rmdir(fragment_dir)
+
+
+def render_modals(entries, existing_body, force=False, lazy=False, dry_run=False, root=ROOT_DIR):
+    """
+    Body of the `research-modals` region: one marked-up modal per entry,
+    reusing the existing markup of modals whose digest is unchanged.
+    With `lazy`, modal contents go to fragment files instead.
+    Returns (body, ids of re-rendered modals).
+    """
+    existing = {m.group('key'): m for m in REGION_RE.finditer(existing_body or '')}
+    salt = LAZY_BODY.source if lazy else ''
+    parts, rendered = [], []
+    for entry in entries:
+        key, data_digest = entry['id'], digest(entry, salt)
+        old = existing.get(key)
+        fragment_missing = lazy and not os.path.exists(os.path.join(root, FRAGMENT_DIR, key + '.html'))
+        if old and old.group('digest') == data_digest and not force and not fragment_missing:
+            parts.append(old.group())
+            continue
+        fragment = None
+        if lazy:
+            fragment = f"{FRAGMENT_DIR}/{key}.html" if dry_run else write_fragment(entry, root)
+        parts.append(_marker('    ', key, data_digest, "".join(render_modal(entry, fragment))))
+        rendered.append(key)
+    if not dry_run:
+        # Without --lazy no fragment is referenced any more
+        remove_stale_fragments({entry['id'] for entry in entries} if lazy else set(), root)
+    return "\n\n".join(parts) + "\n", rendered
+
+
+def render_sections(html_file=DEFAULT_HTML_FILE, research_file=RESEARCH_FILE, teaching_file=TEACHING_FILE,
+                    force=False, dry_run=False, lazy=False, root=ROOT_DIR):
+    """
+    Re-render the marked regions of `html_file` whose data changed.
+    Returns {region: list of re-rendered items (empty if unchanged)} for
+    every region found in the page.
+    """
+    research = load_yaml(research_file, [])
+    courses = load_yaml(teaching_file, [])
+    regions = {
+        'research-grid': (research, lambda body: ("".join(render_research_grid(research)), ['grid'])),
+        'research-modals': ([entry['id'] for entry in research],
+                            lambda body: render_modals(research, body, force, lazy, dry_run, root)),
+        'teaching-courses': (courses, lambda body: ("".join(render_courses(courses)), ['courses'])),
+    }
+    report = {}
+
+    def replace(match):
+        key = match.group('key')
+        if key not in regions:
+            return match.group()
+        data, render = regions[key]
+        data_digest = digest(data)
+        body = match.group('body')
+        changed_items = []
+        if key == 'research-modals':
+            # Always descend: a modal may change without the id list changing
+            body, changed_items = render(body)
+        elif force or match.group('digest') != data_digest:
+            body, changed_items = render(body)
+        report[key] = changed_items
+        return _marker(match.group('indent'), key, data_digest, body)
+
+    with file_lock(html_file):
+        with open(html_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+        new_content = REGION_RE.sub(replace, content)
+        if new_content != content and not dry_run:
+            atomic_write(html_file, new_content)
+
+    if not dry_run and (LAZY_MARKER in new_content) != (LAZY_MARKER in content):
+        # Lazy placeholders appeared or went away: add or drop the modal loader
+        rewrite_html(html_file, build_bundles(root) if is_bundled(new_content) else None)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render research/teaching sections of index.html from _data/*.yml")
+    parser.add_argument('html_file', nargs='?', default=DEFAULT_HTML_FILE, help="Page to update")
+    parser.add_argument('--force', action='store_true', help="Re-render every region")
+    parser.add_argument('--dry-run', action='store_true', help="Report what would change without writing")
+    parser.add_argument('--lazy', action='store_true',
+                        help=f"Move modal contents to {FRAGMENT_DIR}/<id>.html, loaded on first open")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.html_file):
+        print(f"Error: {args.html_file} not found!")
+        sys.exit(1)
+
+    report = render_sections(args.html_file, force=args.force, dry_run=args.dry_run, lazy=args.lazy)
+    verb = "Would re-render" if args.dry_run else "Re-rendered"
+    for key in ('research-grid', 'research-modals', 'teaching-courses'):
+        if key not in report:
+            print(f"⚠️  No <!-- render:{key} --> marker in {os.path.basename(args.html_file)}, skipped")
+        elif report[key]:
+            print(f"✅ {verb} {key}: {', '.join(report[key])}")
+        else:
+            print(f"⏭️  {key} unchanged")
+
+
+if __name__ == "__main__":
+    main()
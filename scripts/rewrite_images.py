@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Post-process <img> tags in index.html for lazy, layout-stable loading.
+
+Every local <img> gets `loading="lazy"`, `decoding="async"`, its intrinsic
+`width`/`height` and, when the image has optimized variants in
+img/optimized/manifest.json (see optimize_images.py), `srcset`/`sizes`.
+Images that already carry a `loading` attribute (e.g. `loading="eager"` on
+the header photo) keep it.
+
+Tags are located with BeautifulSoup but rewritten in place: only the
+`<img ...>` span of each changed tag is replaced, so the rest of the file
+keeps its formatting byte for byte. Re-running is a no-op.
+
+Usage:
+    python scripts/rewrite_images.py                 # rewrite index.html
+    python scripts/rewrite_images.py --dry-run       # report only
+    python scripts/rewrite_images.py --format avif   # srcset from AVIF variants
+"""
+
+import argparse
+import html
+import os
+import re
+import struct
+import sys
+
+from fsutil import atomic_write, file_lock
+from optimize_images import DEFAULT_SIZES, MANIFEST_FILE, load_manifest, srcset
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_HTML_FILE = os.path.join(ROOT_DIR, 'index.html')
+
+_IMG_TAG = re.compile(r'<img\b[^>]*>', re.I)
+
+
+def image_size(path):
+    """(width, height) read from a PNG, GIF or JPEG header, or None."""
+    with open(path, 'rb') as f:
+        head = f.read(26)
+        if head.startswith(b'\x89PNG\r\n\x1a\n'):
+            return struct.unpack('>II', head[16:24])
+        if head[:6] in (b'GIF87a', b'GIF89a'):
+            return struct.unpack('<HH', head[6:10])
+        if not head.startswith(b'\xff\xd8'):
+            return None
+        # JPEG: walk the segments up to the first start-of-frame marker
+        f.seek(2)
+        while True:
+            marker = f.read(2)
+            if len(marker) < 2 or marker[0] != 0xFF:
+                return None
+            if marker[1] in (0xD8, 0x01) or 0xD0 <= marker[1] <= 0xD7:
+                continue
+            length = struct.unpack('>H', f.read(2))[0]
+            if 0xC0 <= marker[1] <= 0xCF and marker[1] not in (0xC4, 0xC8, 0xCC):
+                height, width = struct.unpack('>xHH', f.read(5))
+                return width, height
+            f.seek(length - 2, 1)
+
+
+def _render_tag(attrs, self_closing):
+    parts = ['<img']
+    for name, value in attrs.items():
+        if isinstance(value, list):
+            value = " ".join(value)
+        parts.append(f' {name}="{html.escape(str(value), quote=True)}"')
+    parts.append(' />' if self_closing else '>')
+    return "".join(parts)
+
+
+def rewrite_attrs(attrs, manifest, root=ROOT_DIR, fmt='webp', sizes=DEFAULT_SIZES):
+    """
+    Return the new attribute dict for one <img> (insertion order kept), and
+    a note ('missing' / 'remote' / None) about its source.
+    """
+    attrs = dict(attrs)
+    src = attrs.get('src', '')
+    if src != src.strip():
+        attrs['src'] = src = src.strip()
+    if not src or re.match(r'^(?:[a-z]+:)?//|^data:', src, re.I):
+        return attrs, 'remote'
+
+    attrs.setdefault('loading', 'lazy')
+    attrs['decoding'] = 'async'
+
+    entry = manifest['images'].get(src.lstrip('/'))
+    path = os.path.join(root, src.lstrip('/'))
+    size = (entry['width'], entry['height']) if entry else (
+        image_size(path) if os.path.exists(path) else None)
+    if size is None:
+        return attrs, 'missing'
+    attrs['width'], attrs['height'] = str(size[0]), str(size[1])
+
+    if entry and entry['variants'].get(fmt):
+        attrs['srcset'] = srcset(entry, fmt)
+        attrs['sizes'] = sizes
+    return attrs, None
+
+
+def rewrite_images(html_file=DEFAULT_HTML_FILE, manifest_file=MANIFEST_FILE, fmt='webp',
+                   sizes=DEFAULT_SIZES, dry_run=False, root=ROOT_DIR):
+    """
+    Rewrite every <img> in `html_file`. Returns a report dict with the
+    number of tags seen and changed and the lists of missing/remote sources.
+    """
+    from bs4 import BeautifulSoup
+
+    manifest = load_manifest(manifest_file)
+    report = {'images': 0, 'changed': 0, 'missing': [], 'remote': []}
+
+    with file_lock(html_file):
+        with open(html_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+
+        line_starts = [0] + [m.end() for m in re.finditer('\n', content)]
+        chunks, pos = [], 0
+        for tag in BeautifulSoup(content, 'html.parser').find_all('img'):
+            report['images'] += 1
+            start = line_starts[tag.sourceline - 1] + tag.sourcepos
+            match = _IMG_TAG.match(content, start)
+            if not match:
+                continue
+            attrs, note = rewrite_attrs(tag.attrs, manifest, root, fmt, sizes)
+            if note:
+                report[note].append(tag.get('src', ''))
+            new_tag = _render_tag(attrs, match.group().endswith('/>'))
+            if new_tag != match.group():
+                chunks += [content[pos:start], new_tag]
+                pos = match.end()
+                report['changed'] += 1
+        chunks.append(content[pos:])
+
+        if report['changed'] and not dry_run:
+            atomic_write(html_file, "".join(chunks))
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Add lazy loading, dimensions and srcset to <img> tags")
+    parser.add_argument('html_file', nargs='?', default=DEFAULT_HTML_FILE, help="Page to rewrite")
+    parser.add_argument('--manifest', default=MANIFEST_FILE, help="Optimized image manifest")
+    parser.add_argument('--format', default='webp', choices=('webp', 'avif', 'jpeg'),
+                        help="Variant format used for srcset (default: webp)")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help="`sizes` attribute for srcset images")
+    parser.add_argument('--dry-run', action='store_true', help="Report changes without writing")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.html_file):
+        print(f"Error: {args.html_file} not found!")
+        sys.exit(1)
+    if not os.path.exists(args.manifest):
+        print(f"⚠️  {args.manifest} not found; run optimize_images.py first for srcset support")
+
+    report = rewrite_images(args.html_file, args.manifest, args.format, args.sizes, args.dry_run)
+    verb = "Would rewrite" if args.dry_run else "Rewrote"
+    print(f"✅ {verb} {report['changed']} of {report['images']} <img> tags")
+    for src in report['missing']:
+        print(f"❌ Missing image file: {src}")
+    if report['remote']:
+        print(f"Skipped {len(report['remote'])} remote image(s)")
+
+
+if __name__ == "__main__":
+    main()
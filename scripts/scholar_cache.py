@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Persistent on-disk cache of filled Google Scholar publications.
+
+Filled records are stored in a small SQLite database keyed by the
+publication's `author_pub_id`. An entry is reused until it is older than the
+TTL or its citation count in the author's publication list changes, so a
+re-run only refills publications that are new or stale. The cache is capped
+at `max_entries`, evicting the least recently used entries first.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from instrument import count
+from scholar_pool import FillResult, fill_publications
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CACHE_PATH = os.path.join(ROOT_DIR, '.cache', 'scholar_cache.sqlite')
+DEFAULT_TTL_DAYS = 30
+DEFAULT_MAX_ENTRIES = 5000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS publications (
+    pub_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    num_citations INTEGER,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+)
+"""
+
+
+def publication_key(pub):
+    """Stable id of a Scholar publication, or None if it has none."""
+    return pub.get('author_pub_id') or pub.get('pub_id')
+
+
+class ScholarCache:
+    """SQLite-backed store of filled publications with TTL and size-based eviction."""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl_days=DEFAULT_TTL_DAYS,
+                 max_entries=DEFAULT_MAX_ENTRIES, clock=time.time):
+        self.path = path
+        self.ttl = ttl_days * 86400 if ttl_days else None
+        self.max_entries = max_entries
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(SCHEMA)
+        self._conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._conn is not None:
+            self.evict()
+            self._conn.close()
+            self._conn = None
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM publications").fetchone()[0]
+
+    def get(self, pub):
+        """
+        Return the cached filled record for `pub`, or None if it is missing or
+        stale (expired, or `num_citations` differs from the cached value).
+        """
+        pub_id = publication_key(pub)
+        if not pub_id:
+            self.misses += 1
+            return None
+
+        now = self.clock()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, num_citations, fetched_at FROM publications WHERE pub_id = ?",
+                (pub_id,)).fetchone()
+            if row is not None:
+                data, num_citations, fetched_at = row
+                expired = self.ttl is not None and now - fetched_at > self.ttl
+                citations = pub.get('num_citations')
+                changed = citations is not None and citations != num_citations
+                if not expired and not changed:
+                    self._conn.execute("UPDATE publications SET accessed_at = ? WHERE pub_id = ?",
+                                       (now, pub_id))
+                    self._conn.commit()
+                    self.hits += 1
+                    return json.loads(data)
+        self.misses += 1
+        return None
+
+    def put(self, pub, filled):
+        pub_id = publication_key(pub) or publication_key(filled)
+        if not pub_id:
+            return
+        now = self.clock()
+        num_citations = pub.get('num_citations', filled.get('num_citations'))
+        data = json.dumps(filled, default=str, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO publications VALUES (?, ?, ?, ?, ?)",
+                (pub_id, data, num_citations, now, now))
+            self._conn.commit()
+
+    def evict(self):
+        """Drop expired entries, then the least recently used ones beyond `max_entries`."""
+        with self._lock:
+            if self.ttl is not None:
+                self._conn.execute("DELETE FROM publications WHERE fetched_at < ?",
+                                   (self.clock() - self.ttl,))
+            if self.max_entries:
+                self._conn.execute(
+                    """DELETE FROM publications WHERE pub_id NOT IN (
+                           SELECT pub_id FROM publications ORDER BY accessed_at DESC LIMIT ?)""",
+                    (self.max_entries,))
+            self._conn.commit()
+
+
+def fill_with_cache(pubs, fill, cache=None, **pool_kwargs):
+    """
+    Like `fill_publications`, but serve fresh entries from `cache` and only
+    send new or stale publications to the network. Results keep input order.
+    """
+    pubs = list(pubs)
+    if cache is None:
+        return fill_publications(pubs, fill, **pool_kwargs)
+
+    results = [None] * len(pubs)
+    missing = []
+    for i, pub in enumerate(pubs):
+        cached = cache.get(pub)
+        if cached is not None:
+            results[i] = FillResult(pub, cached, None)
+        else:
+            missing.append(i)
+
+    print(f"Scholar cache: {len(pubs) - len(missing)} hits, {len(missing)} to fill")
+    count('scholar_cache.hits', len(pubs) - len(missing))
+    count('scholar_cache.misses', len(missing))
+    filled = fill_publications([pubs[i] for i in missing], fill, **pool_kwargs)
+    for i, result in zip(missing, filled):
+        if result.error is None:
+            cache.put(result.source, result.filled)
+        results[i] = result
+    return results
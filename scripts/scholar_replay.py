@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Record and replay Google Scholar responses.
+
+`RecordingScholarly` wraps the real `scholarly` backend and keeps a copy of
+every successful `search_author_id` and `fill` response; `save` writes them
+to a cassette, a gzipped JSON file keyed by call. `ReplayScholarly` serves
+the same interface from a cassette without touching the network, sleeping
+an optional simulated latency (plus jitter) per call, so sync runs are
+deterministic and their throughput, concurrency and caching behaviour can
+be measured offline. A call missing from the cassette raises `CassetteMiss`.
+
+The sync scripts take `--record CASSETTE` and `--replay CASSETTE` (plus
+`--latency`/`--jitter`) through `add_replay_arguments`. A recorded run skips
+the Scholar cache and fills every publication, so the cassette holds every
+call a replay will make; a replayed run keeps its own Scholar cache and
+incremental snapshot, apart from the live ones, and writes its results to
+copies of the site files under .cache/replay/ (`replay_output`), never to
+_data/publications.yml or index.html themselves:
+
+    python update_from_scholar.py --record .cache/scholar.cassette.json.gz
+    python update_from_scholar.py --replay .cache/scholar.cassette.json.gz --latency 0.2
+"""
+
+import copy
+import gzip
+import json
+import os
+import random
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from fsutil import atomic_write
+from scholar_cache import publication_key
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Scholar cache and incremental snapshot used by replayed runs, kept apart
+# from the live ones
+REPLAY_CACHE_PATH = os.path.join(ROOT_DIR, '.cache', 'scholar_cache.replay.sqlite')
+REPLAY_SNAPSHOT_PATH = os.path.join(ROOT_DIR, '.cache', 'scholar_snapshot.replay.json')
+# Copies of the site files that replayed runs update instead of the real ones
+REPLAY_OUTPUT_DIR = os.path.join(ROOT_DIR, '.cache', 'replay')
+CASSETTE_VERSION = 1
+
+
+class CassetteMiss(LookupError):
+    """The replayed run made a call that was never recorded."""
+
+
+def call_key(method, obj, sections=None):
+    """Cassette key of a backend call."""
+    if method == 'search_author_id':
+        return f"author:{obj}"
+    if obj.get('container_type') == 'Author':
+        return f"author_fill:{obj.get('scholar_id')}:{','.join(sections or ['publications'])}"
+    return f"pub:{publication_key(obj) or obj.get('bib', {}).get('title')}"
+
+
+def _snapshot(value):
+    # scholarly's records hold a few non-JSON values; store them as strings
+    return json.loads(json.dumps(value, default=str, ensure_ascii=False))
+
+
+def replay_output(path, root=ROOT_DIR):
+    """
+    The file a replayed run reads and writes in place of the site file
+    `path` (relative to `root`): its copy under REPLAY_OUTPUT_DIR, taken
+    from the live file on first use.
+    """
+    source = os.path.join(root, path)
+    target = os.path.join(REPLAY_OUTPUT_DIR, os.path.relpath(source, root))
+    if not os.path.exists(target) and os.path.exists(source):
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copyfile(source, target)
+    return target
+
+
+def load_cassette(path):
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        cassette = json.load(f)
+    if cassette.get('version') != CASSETTE_VERSION:
+        raise ValueError(f"{path}: unsupported cassette version {cassette.get('version')}")
+    return cassette['calls']
+
+
+class RecordingScholarly:
+    """Pass calls through to `backend` and remember their responses."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def _record(self, key, value):
+        value = _snapshot(value)
+        with self._lock:
+            self.calls[key] = value
+
+    def search_author_id(self, scholar_id, *args, **kwargs):
+        author = self.backend.search_author_id(scholar_id, *args, **kwargs)
+        self._record(call_key('search_author_id', scholar_id), author)
+        return author
+
+    def fill(self, obj, sections=None, **kwargs):
+        key = call_key('fill', obj, sections)
+        if sections is None:
+            filled = self.backend.fill(obj, **kwargs)
+        else:
+            filled = self.backend.fill(obj, sections=sections, **kwargs)
+        self._record(key, filled)
+        return filled
+
+    def save(self, path, merge=True):
+        """
+        Write the cassette. With `merge`, calls already in an existing
+        cassette at `path` are kept unless this run recorded them again.
+        """
+        calls = {}
+        if merge and os.path.exists(path):
+            calls = load_cassette(path)
+        with self._lock:
+            calls.update(self.calls)
+        cassette = {
+            'version': CASSETTE_VERSION,
+            'recorded': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'calls': dict(sorted(calls.items())),
+        }
+        data = json.dumps(cassette, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        atomic_write(path, gzip.compress(data, compresslevel=9, mtime=0))
+        return len(calls)
+
+
+class ReplayScholarly:
+    """
+    Serve `search_author_id`/`fill` from a cassette. Every call sleeps
+    `latency` seconds plus up to `jitter` more; `fill` updates the object it
+    is given in place and returns it, like scholarly does.
+    """
+
+    def __init__(self, path, latency=0.0, jitter=0.0, seed=0):
+        self.path = path
+        self.responses = load_cassette(path)
+        self.latency = latency
+        self.jitter = jitter
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = {'search_author_id': 0, 'fill': 0, 'miss': 0}
+        self.max_in_flight = 0
+        self._in_flight = 0
+
+    def _respond(self, method, key):
+        with self._lock:
+            self.calls[method] += 1
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        try:
+            if delay:
+                time.sleep(delay)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+        if key not in self.responses:
+            with self._lock:
+                self.calls['miss'] += 1
+            raise CassetteMiss(f"{key} is not in {self.path}; record it again with --record")
+        return copy.deepcopy(self.responses[key])
+
+    def search_author_id(self, scholar_id, *args, **kwargs):
+        return self._respond('search_author_id', call_key('search_author_id', scholar_id))
+
+    def fill(self, obj, sections=None, **kwargs):
+        obj.update(self._respond('fill', call_key('fill', obj, sections)))
+        return obj
+
+
+def add_replay_arguments(parser):
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--record', metavar='CASSETTE',
+                       help="Save every Google Scholar response to this cassette (bypasses the cache)")
+    group.add_argument('--replay', metavar='CASSETTE',
+                       help="Answer Google Scholar calls from this cassette instead of the network")
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help="Seconds slept per replayed call (with --replay)")
+    parser.add_argument('--jitter', type=float, default=0.0,
+                        help="Extra random latency per replayed call (with --replay)")
+
+
+@contextmanager
+def scholar_backend(live, record=None, replay=None, latency=0.0, jitter=0.0, log=print):
+    """
+    The backend the sync scripts should use: `live` (normally
+    `scholarly.scholarly`), a recorder around it that saves to `record` on
+    exit, or a replay of the `replay` cassette.
+    """
+    if replay:
+        backend = ReplayScholarly(replay, latency=latency, jitter=jitter)
+        log(f"⏭️  Replaying Google Scholar from {replay}")
+        yield backend
+        if backend.calls['miss']:
+            log(f"⚠️  {backend.calls['miss']} call(s) were not in the cassette")
+        return
+    if not record:
+        yield live
+        return
+    recorder = RecordingScholarly(live)
+    try:
+        yield recorder
+    finally:
+        log(f"✅ Recorded {recorder.save(record)} Google Scholar response(s) to {record}")
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Incremental Google Scholar sync support.
+
+A snapshot of the author's publication list (id, title, year and citation
+count per publication) is stored after every sync. The next run fetches only
+the publication list, diffs it against the snapshot, fills just the added or
+changed publications and patches `_data/publications.yml` in place.
+"""
+
+import json
+import os
+from collections import namedtuple
+from datetime import datetime, timezone
+
+from pub_index import PublicationIndex, normalize_title
+from scholar_cache import publication_key
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SNAPSHOT_PATH = os.path.join(ROOT_DIR, '.cache', 'scholar_snapshot.json')
+
+PublicationDiff = namedtuple('PublicationDiff', ['added', 'changed', 'removed', 'unchanged'])
+
+
+def snapshot_record(pub):
+    bib = pub.get('bib', {})
+    return {
+        'title': bib.get('title'),
+        'year': str(bib.get('pub_year') or ''),
+        'num_citations': pub.get('num_citations', 0),
+    }
+
+
+def load_snapshot(path=DEFAULT_SNAPSHOT_PATH):
+    if not os.path.exists(path):
+        return {'scholar_id': None, 'publications': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_snapshot(scholar_id, records, path=DEFAULT_SNAPSHOT_PATH):
+    snapshot = {
+        'scholar_id': scholar_id,
+        'updated': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'publications': dict(sorted(records.items())),
+    }
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+    os.replace(tmp_path, path)
+
+
+def diff_publications(pub_list, snapshot):
+    """
+    Compare the unfilled publication list with the last snapshot.
+
+    `added`, `changed` and `unchanged` hold publication dicts from `pub_list`;
+    `removed` holds the snapshot records of ids no longer listed. A
+    publication without an id is always treated as added.
+    """
+    previous = snapshot.get('publications', {})
+    added, changed, unchanged = [], [], []
+    seen = set()
+    for pub in pub_list:
+        pub_id = publication_key(pub)
+        old = previous.get(pub_id) if pub_id else None
+        if old is None:
+            added.append(pub)
+            continue
+        seen.add(pub_id)
+        if old != snapshot_record(pub):
+            changed.append(pub)
+        else:
+            unchanged.append(pub)
+    removed = [dict(record, id=pub_id) for pub_id, record in previous.items() if pub_id not in seen]
+    return PublicationDiff(added, changed, removed, unchanged)
+
+
+def _insert_by_year(entries, entry):
+    """Insert `entry` before the first entry with an older year (list is newest first)."""
+    year = str(entry.get('year'))
+    for i, existing in enumerate(entries):
+        if str(existing.get('year')) < year:
+            entries.insert(i, entry)
+            return
+    entries.append(entry)
+
+
+def patch_publications(entries, updates, removed_titles=()):
+    """
+    Patch the YAML publication entries in place.
+
+    `updates` are freshly formatted entries: ones matching an existing entry
+    by DOI or normalized title update it (keeping hand-curated fields the new
+    data leaves empty), the rest are inserted in year order. An update that
+    only nearly matches an existing title (see pub_index) is neither merged
+    nor inserted but reported under 'similar' as (new title, existing title)
+    for a manual check. Entries whose title is in `removed_titles` are
+    dropped. Returns a report dict of changed titles.
+    """
+    report = {'added': [], 'updated': [], 'removed': [], 'similar': []}
+    index = PublicationIndex.from_entries(entries)
+
+    for update in updates:
+        existing = index.find(update.get('title'), doi=update.get('link'), threshold=None)
+        if existing is None:
+            similar = index.find(update.get('title'), doi=update.get('link'))
+            if similar is not None:
+                report['similar'].append((update['title'], similar['title']))
+                continue
+            _insert_by_year(entries, update)
+            index.add(update, update.get('title'), doi=update.get('link'))
+            report['added'].append(update['title'])
+            continue
+        fields = {k: v for k, v in update.items() if v not in (None, '') and existing.get(k) != v}
+        if fields:
+            existing.update(fields)
+            report['updated'].append(existing['title'])
+
+    removed = {normalize_title(t) for t in removed_titles}
+    if removed:
+        kept = [e for e in entries if normalize_title(e.get('title')) not in removed]
+        report['removed'] = [e['title'] for e in entries if normalize_title(e.get('title')) in removed]
+        entries[:] = kept
+
+    return report
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Local preview server for the site, serving the repository tree the way a
+static host would.
+
+  * strong ETags from each file's SHA-256 (cached per path/mtime/size), with
+    If-None-Match -> 304;
+  * Cache-Control per asset class: fingerprinted bundles and fonts are
+    immutable, pages always revalidate, images and documents are cached
+    for a while (see CACHE_POLICIES);
+  * the .br/.gz siblings written by precompress.py are served when the
+    client accepts them and they are not older than the source;
+  * single byte-range requests (206/416, If-Range), so PDFs open at any page
+    without downloading the whole file;
+  * bodies are sent with `loop.sendfile`, which uses os.sendfile where the
+    transport supports it.
+
+Unless --no-watch is given, the data files and generators are polled and the
+matching build steps (render_sections.py, build.py) are re-run when one of
+them changes.
+
+Usage:
+    python scripts/serve.py                 # http://127.0.0.1:8000/
+    python scripts/serve.py --port 4000 --no-watch
+"""
+
+import argparse
+import asyncio
+import email.utils
+import glob
+import hashlib
+import mimetypes
+import os
+import posixpath
+import re
+import sys
+import time
+from urllib.parse import unquote, urlsplit
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8000
+POLL_INTERVAL = 1.0
+MAX_HEADER_BYTES = 64 * 1024
+
+# First matching rule wins; patterns are matched against the URL path
+CACHE_POLICIES = [
+    # Content-hashed file names (site.3f2a9c1b0d.css, lato-400.1a2b3c4d.woff2)
+    (re.compile(r'\.[0-9a-f]{8,}\.\w+$'), 'public, max-age=31536000, immutable'),
+    (re.compile(r'\.html?$|/$'), 'no-cache'),
+    (re.compile(r'\.(?:css|js|json)$'), 'public, max-age=3600, must-revalidate'),
+    (re.compile(r'\.(?:woff2?|ttf|otf|eot)$'), 'public, max-age=2592000'),
+    (re.compile(r'\.(?:png|jpe?g|gif|webp|avif|svg|ico)$'), 'public, max-age=604800'),
+    (re.compile(r'\.pdf$'), 'public, max-age=86400'),
+]
+DEFAULT_CACHE_POLICY = 'public, max-age=3600'
+
+# Precompressed siblings in order of preference
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+# Watched inputs (globs relative to the root) -> build step to re-run
+REBUILD_STEPS = [
+    (['_data/research.yml', '_data/teaching.yml', 'scripts/render_sections.py'],
+     ['scripts/render_sections.py']),
+    (['_config.yml', '_data/*.yml', 'generate_cv.py', 'update_readme.py', 'scripts/site_*.py',
+      'scripts/template.py', 'scripts/build.py', 'css/fonts.css', 'files/pdf_manifest.json'],
+     ['scripts/build.py']),
+]
+
+STATUS_TEXT = {
+    200: 'OK', 206: 'Partial Content', 304: 'Not Modified', 400: 'Bad Request',
+    403: 'Forbidden', 404: 'Not Found', 405: 'Method Not Allowed',
+    416: 'Range Not Satisfiable', 500: 'Internal Server Error',
+}
+
+mimetypes.add_type('font/woff2', '.woff2')
+mimetypes.add_type('image/webp', '.webp')
+mimetypes.add_type('image/avif', '.avif')
+mimetypes.add_type('application/javascript', '.js')
+
+
+def cache_policy(url_path):
+    for pattern, policy in CACHE_POLICIES:
+        if pattern.search(url_path):
+            return policy
+    return DEFAULT_CACHE_POLICY
+
+
+def content_type(path):
+    mime, _ = mimetypes.guess_type(path)
+    mime = mime or 'application/octet-stream'
+    if mime.startswith('text/') or mime in ('application/javascript', 'application/json', 'image/svg+xml'):
+        mime += '; charset=utf-8'
+    return mime
+
+
+def parse_range(header, size):
+    """
+    (start, end) inclusive for a single `bytes=` range, None to ignore the
+    header (malformed or multiple ranges: serve the whole file), or 'invalid'
+    when the range cannot be satisfied.
+    """
+    match = re.fullmatch(r'\s*bytes\s*=\s*(\d*)\s*-\s*(\d*)\s*', header or '')
+    if not match or (not match.group(1) and not match.group(2)):
+        return None
+    first, last = match.groups()
+    if not first:
+        length = int(last)
+        if length == 0:
+            return 'invalid'
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return 'invalid'
+    return start, end
+
+
+class ETagCache:
+    """Strong ETags from file contents, recomputed only when mtime or size change."""
+
+    def __init__(self):
+        self._entries = {}
+
+    def get(self, path, stat):
+        key = (stat.st_mtime_ns, stat.st_size)
+        cached = self._entries.get(path)
+        if cached and cached[0] == key:
+            return cached[1]
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 16), b''):
+                digest.update(chunk)
+        etag = f'"{digest.hexdigest()[:32]}"'
+        self._entries[path] = (key, etag)
+        return etag
+
+
+class PreviewServer:
+    def __init__(self, root=ROOT_DIR, log=print):
+        self.root = os.path.realpath(root)
+        self.etags = ETagCache()
+        self.log = log
+
+    def resolve(self, url_path):
+        """Filesystem path for a URL path, or None if it is outside the root or missing."""
+        rel = posixpath.normpath(unquote(url_path)).lstrip('/')
+        if rel in ('.', ''):
+            rel = ''
+        path = os.path.realpath(os.path.join(self.root, rel))
+        if path != self.root and not path.startswith(self.root + os.sep):
+            return None
+        if os.path.isdir(path):
+            path = os.path.join(path, 'index.html')
+        return path if os.path.isfile(path) else None
+
+    def negotiate(self, path, accept_encoding):
+        """(file to send, Content-Encoding or None), preferring fresh precompressed siblings."""
+        accepted = {token.split(';')[0].strip().lower() for token in (accept_encoding or '').split(',')}
+        source_mtime = os.stat(path).st_mtime_ns
+        for encoding, suffix in ENCODINGS:
+            candidate = path + suffix
+            if encoding in accepted and os.path.isfile(candidate) \
+                    and os.stat(candidate).st_mtime_ns >= source_mtime:
+                return candidate, encoding
+        return path, None
+
+    async def handle(self, reader, writer):
+        peer = writer.get_extra_info('peername')
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self.send_error(writer, 400, keep_alive=False)
+                    break
+                keep_alive = await self.respond(head, writer)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        except Exception as e:
+            self.log(f"❌ {peer}: {e!r}")
+        finally:
+            writer.close()
+
+    async def respond(self, head, writer):
+        """Answer one request; returns whether the connection stays open."""
+        lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, target, version = lines[0].split(' ', 2)
+        except ValueError:
+            await self.send_error(writer, 400, keep_alive=False)
+            return False
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+        connection = headers.get('connection', '').lower()
+        keep_alive = connection != 'close' and (version == 'HTTP/1.1' or connection == 'keep-alive')
+
+        url_path = urlsplit(target).path or '/'
+        if method not in ('GET', 'HEAD'):
+            await self.send_error(writer, 405, keep_alive, {'Allow': 'GET, HEAD'})
+            return keep_alive
+        path = self.resolve(url_path)
+        if path is None:
+            await self.send_error(writer, 404, keep_alive, method=method)
+            self.log(f"{method} {url_path} 404")
+            return keep_alive
+
+        # Ranges apply to the identity encoding only
+        range_header = headers.get('range')
+        body_path, encoding = self.negotiate(path, None if range_header else headers.get('accept-encoding'))
+        stat = os.stat(body_path)
+        etag = self.etags.get(body_path, stat)
+        response = {
+            'Content-Type': content_type(path),
+            'Cache-Control': cache_policy(url_path),
+            'ETag': etag,
+            'Last-Modified': email.utils.formatdate(stat.st_mtime, usegmt=True),
+            'Accept-Ranges': 'bytes',
+            'Vary': 'Accept-Encoding',
+        }
+        if encoding:
+            response['Content-Encoding'] = encoding
+
+        if_none_match = headers.get('if-none-match')
+        if if_none_match and (if_none_match.strip() == '*' or etag in [t.strip() for t in if_none_match.split(',')]):
+            await self.send_head(writer, 304, response, keep_alive)
+            self.log(f"{method} {url_path} 304")
+            return keep_alive
+
+        status, offset, count = 200, 0, stat.st_size
+        byte_range = parse_range(range_header, stat.st_size)
+        if byte_range and headers.get('if-range') not in (None, etag):
+            byte_range = None  # file changed since the client's partial copy
+        if byte_range == 'invalid':
+            response['Content-Range'] = f"bytes */{stat.st_size}"
+            await self.send_error(writer, 416, keep_alive, response, method)
+            self.log(f"{method} {url_path} 416")
+            return keep_alive
+        if byte_range:
+            start, end = byte_range
+            status, offset, count = 206, start, end - start + 1
+            response['Content-Range'] = f"bytes {start}-{end}/{stat.st_size}"
+        response['Content-Length'] = str(count)
+
+        await self.send_head(writer, status, response, keep_alive)
+        if method == 'GET' and count:
+            loop = asyncio.get_running_loop()
+            with open(body_path, 'rb') as f:
+                await loop.sendfile(writer.transport, f, offset, count)
+        self.log(f"{method} {url_path} {status} {count}B{' ' + encoding if encoding else ''}")
+        return keep_alive
+
+    async def send_head(self, writer, status, headers, keep_alive):
+        lines = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}",
+                 f"Date: {email.utils.formatdate(usegmt=True)}",
+                 f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1'))
+        await writer.drain()
+
+    async def send_error(self, writer, status, keep_alive, headers=None, method='GET'):
+        body = f"{status} {STATUS_TEXT.get(status, '')}\n".encode('utf-8')
+        headers = dict(headers or {}, **{'Content-Type': 'text/plain; charset=utf-8',
+                                         'Content-Length': str(len(body)), 'Cache-Control': 'no-store'})
+        headers.pop('ETag', None)
+        headers.pop('Content-Encoding', None)
+        await self.send_head(writer, status, headers, keep_alive)
+        if method != 'HEAD':
+            writer.write(body)
+            await writer.drain()
+
+
+def _snapshot(patterns, root=ROOT_DIR):
+    mtimes = {}
+    for pattern in patterns:
+        for path in glob.glob(os.path.join(root, pattern)):
+            mtimes[path] = os.stat(path).st_mtime_ns
+    return mtimes
+
+
+async def watch_and_rebuild(root=ROOT_DIR, steps=REBUILD_STEPS, interval=POLL_INTERVAL, log=print):
+    """Poll the watched inputs and re-run the build steps whose inputs changed."""
+    snapshots = [_snapshot(patterns, root) for patterns, _ in steps]
+    while True:
+        await asyncio.sleep(interval)
+        current = [_snapshot(patterns, root) for patterns, _ in steps]
+        for (patterns, command), old, new in zip(steps, snapshots, current):
+            if new == old:
+                continue
+            changed = sorted(os.path.relpath(p, root) for p in set(old) | set(new) if old.get(p) != new.get(p))
+            log(f"🔄 {', '.join(changed)} changed: running {' '.join(command)}")
+            start = time.perf_counter()
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, *command, cwd=root,
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT)
+            output, _ = await process.communicate()
+            for line in output.decode('utf-8', 'replace').splitlines():
+                log(f"   {line}")
+            status = "✅" if process.returncode == 0 else f"❌ exit {process.returncode}"
+            log(f"{status} {command[0]} in {time.perf_counter() - start:.1f}s")
+        # Build steps may rewrite watched files themselves: start from what they left
+        snapshots = [_snapshot(patterns, root) for patterns, _ in steps]
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, root=ROOT_DIR, watch=True):
+    server = PreviewServer(root)
+    listener = await asyncio.start_server(server.handle, host, port, limit=MAX_HEADER_BYTES)
+    print(f"✅ Serving {root} at http://{host}:{port}/ (Ctrl+C to stop)")
+    tasks = [asyncio.create_task(listener.serve_forever())]
+    if watch:
+        tasks.append(asyncio.create_task(watch_and_rebuild(root)))
+    await asyncio.gather(*tasks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the site locally with production-like caching")
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f"Interface to bind (default: {DEFAULT_HOST})")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"Port (default: {DEFAULT_PORT})")
+    parser.add_argument('--root', default=ROOT_DIR, help="Directory to serve (default: the repository)")
+    parser.add_argument('--no-watch', action='store_true', help="Don't rebuild when data files change")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.root, not args.no_watch))
+    except KeyboardInterrupt:
+        print("\nStopped")
+
+
+if __name__ == "__main__":
+    main()
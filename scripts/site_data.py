@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Build the `SiteModel` straight from the structured data in `_data/*.yml`
+and `_config.yml`, without scraping the rendered HTML.
+
+YAML is loaded with libyaml's C-accelerated `CSafeLoader` when PyYAML was
+built with it, falling back to the pure-Python `SafeLoader` otherwise.
+BeautifulSoup is never imported on this path.
+"""
+
+import html
+import os
+import re
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+from site_model import SiteModel, TimelineEntry, Publication, Award, blank_site_model
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Files the data-driven model is built from, relative to the site root
+DATA_FILES = [
+    '_config.yml',
+    '_data/education.yml',
+    '_data/experience.yml',
+    '_data/publications.yml',
+    '_data/awards.yml',
+]
+
+
+def load_yaml(path, default=None):
+    if not os.path.exists(path):
+        return default
+    with open(path, 'r', encoding='utf-8') as f:
+        data = yaml.load(f, Loader=SafeLoader)
+    return default if data is None else data
+
+
+def _split_venue(journal):
+    """'Transactions in GIS, 29(2), e70019' -> ('Transactions in GIS', ', 29(2), e70019')"""
+    match = re.match(r'^(.*?)((?:,\s*\d.*)?)$', journal or '')
+    return match.group(1), match.group(2)
+
+
+def format_publication(entry):
+    """Render one `_data/publications.yml` entry as a `Publication` record."""
+    year = str(entry.get('year', ''))
+    title = str(entry.get('title', '')).strip()
+    link = entry.get('link')
+    author_list = [a.strip() for a in str(entry.get('authors', '')).split(' and ') if a.strip()]
+    # APA style: "A, B, & C"
+    authors = ", & ".join(filter(None, (", ".join(author_list[:-1]), "".join(author_list[-1:]))))
+    venue, details = _split_venue(str(entry.get('journal', '')))
+
+    authors_html = re.sub(r'\*\*(.+?)\*\*', r'<b>\1</b>', html.escape(authors, quote=False))
+    title_html = html.escape(title, quote=False)
+    if link:
+        title_html = f'<a href="{html.escape(link)}" target="_blank">{title_html}</a>'
+    content = f"{authors_html} ({year}). {title_html}. <em>{html.escape(venue, quote=False)}</em>{details}."
+
+    text = f"{authors.replace('**', '')} ({year}). {title}. {venue}{details}."
+    return Publication(year=year, title=title, text=text, content=content, link=link,
+                       authors=[a.replace('**', '') for a in author_list],
+                       venue=venue)
+
+
+def load_site_data(root=ROOT_DIR, defaults=True):
+    """
+    Assemble a `SiteModel` from `_config.yml` and `_data/*.yml` under `root`.
+    Without `defaults`, fields missing from `_config.yml` stay empty instead
+    of falling back to this site's owner.
+    """
+    config = load_yaml(os.path.join(root, '_config.yml'), {})
+    author = config.get('authorv', {})
+    social = config.get('social', {})
+
+    model = SiteModel() if defaults else blank_site_model()
+    website = (config.get('url') or model.contact['website']).rstrip('/')
+    model.name = author.get('name', model.name)
+    model.title = author.get('role', model.title)
+    model.center = author.get('organization', model.center)
+    model.institution = author.get('university', model.institution)
+    model.contact = {
+        'email': config.get('email', model.contact['email']),
+        'phone': author.get('phone', model.contact['phone']),
+        'office': author.get('office', model.contact['office']),
+        'location': author.get('location', model.contact['location']),
+        'website': website + '/' if website else '',
+    }
+    for label, key in (('Google Scholar', 'scholar'), ('GitHub', 'github'), ('LinkedIn', 'linkedin')):
+        if social.get(key):
+            model.social_links[label] = social[key]
+
+    model.education = [
+        TimelineEntry(str(e.get('year', '')),
+                      ", ".join(str(p) for p in (e.get('degree'), e.get('university')) if p),
+                      e.get('location', ''), title=e.get('degree', ''),
+                      organization=e.get('university', ''))
+        for e in load_yaml(os.path.join(root, '_data', 'education.yml'), [])
+    ]
+    model.appointments = [
+        TimelineEntry(str(e.get('year', '')),
+                      ", ".join(str(p) for p in (e.get('role'), e.get('organization')) if p),
+                      e.get('location', ''), title=e.get('role', ''),
+                      organization=e.get('organization', ''))
+        for e in load_yaml(os.path.join(root, '_data', 'experience.yml'), [])
+    ]
+    model.publications = [
+        format_publication(e) for e in load_yaml(os.path.join(root, '_data', 'publications.yml'), [])
+    ]
+    model.awards = [
+        Award(year=str(a.get('year', '')), title=a.get('title', ''),
+              text=" ".join(str(p) for p in (a.get('year'), a.get('title'), a.get('organization')) if p),
+              organization=a.get('organization', ''), link=a.get('link'))
+        for a in load_yaml(os.path.join(root, '_data', 'awards.yml'), [])
+    ]
+    return model
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Parsed model of the website shared by the CV, README and publication tools.
+
+`index.html` is parsed once with BeautifulSoup into typed records (education,
+appointments, publications, awards, contact links). The result is pickled to
+`.cache/site_model-*.pickle`, keyed by the file's mtime, size and SHA-256, so
+every generator after the first reads the cached model instead of
+re-parsing the page.
+"""
+
+import hashlib
+import os
+import pickle
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_HTML_FILE = os.path.join(ROOT_DIR, 'index.html')
+CACHE_DIR = os.path.join(ROOT_DIR, '.cache')
+
+# Bump when the parser or the record layout changes to invalidate old caches
+MODEL_VERSION = 3
+
+
+@dataclass
+class TimelineEntry:
+    """One education or appointment line, e.g. period "2019–2024"."""
+    period: str
+    description: str
+    location: str = ""
+    # Structured parts, when the source has them (degree/role and school/employer)
+    title: str = ""
+    organization: str = ""
+
+    def __str__(self):
+        return f"{self.period}: {self.description}" if self.period else self.description
+
+    @property
+    def full_description(self):
+        return ", ".join(part for part in (self.description, self.location) if part)
+
+
+@dataclass
+class Publication:
+    year: str
+    title: str
+    text: str            # plain-text citation
+    content: str         # citation HTML, keeps <b>Yang, Y.</b> and links
+    link: str = None
+    authors: List[str] = field(default_factory=list)
+    venue: str = ""      # journal name without volume/pages
+
+
+@dataclass
+class Award:
+    year: str
+    title: str
+    text: str            # plain-text line, e.g. "2024 Award Name Organization"
+    organization: str = ""
+    link: str = None
+
+
+@dataclass
+class SiteModel:
+    name: str = "Yalin Yang"
+    title: str = "Research Associate & GIS Programmer"
+    center: str = "West Virginia GIS Technical Center"
+    institution: str = "West Virginia University"
+    contact: Dict[str, str] = field(default_factory=lambda: {
+        'email': "yy00021@mail.wvu.edu",
+        'phone': "+1-607-374-9844",
+        'office': "330 Brooks Hall",
+        'location': "Morgantown, WV 26506",
+        'website': "https://gisyaliny.github.io/"
+    })
+    social_links: Dict[str, str] = field(default_factory=dict)
+    education: List[TimelineEntry] = field(default_factory=list)
+    appointments: List[TimelineEntry] = field(default_factory=list)
+    publications: List[Publication] = field(default_factory=list)
+    awards: List[Award] = field(default_factory=list)
+
+
+def blank_site_model():
+    """A `SiteModel` without this site's name and contact defaults, for other profiles."""
+    return SiteModel(name="", title="", center="", institution="",
+                     contact={key: "" for key in ('email', 'phone', 'office', 'location', 'website')})
+
+
+def _clean(text):
+    text = re.sub(r'\s+', ' ', text).strip()
+    return re.sub(r'\s+([,.])', r'\1', text)
+
+
+def _timeline_entries(soup, label):
+    """Parse the `&bull; period &emsp; description<br />` paragraph headed by `label`."""
+    from bs4 import BeautifulSoup
+
+    header = soup.find(string=re.compile(label))
+    if not header:
+        return []
+    paragraph = header.find_parent('p')
+    entries = []
+    for chunk in re.split(r'<br\s*/?>', paragraph.decode_contents()):
+        text = BeautifulSoup(chunk, 'html.parser').get_text()
+        if label in text or not re.search(r'\d{4}', text):
+            continue
+        text = text.replace("•", "").strip()
+        period, _, description = text.partition(" ")
+        if not description:
+            period, description = "", period
+        entries.append(TimelineEntry(_clean(period), _clean(description)))
+    return entries
+
+
+def parse_site_html(content):
+    """Parse the HTML of index.html into a `SiteModel`."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(content, 'html.parser')
+    model = SiteModel()
+
+    email_match = re.search(r'mailto:([^"]+)', content)
+    if email_match:
+        model.contact['email'] = email_match.group(1)
+
+    for link in soup.find_all('a', href=True):
+        href = link.get('href')
+        if 'scholar.google.com' in href:
+            model.social_links.setdefault('Google Scholar', href)
+        elif 'github.com' in href:
+            model.social_links.setdefault('GitHub', href)
+        elif 'linkedin.com' in href:
+            model.social_links.setdefault('LinkedIn', href)
+
+    model.education = _timeline_entries(soup, "Education:")
+    model.appointments = _timeline_entries(soup, "Appointments:")
+
+    pub_ul = soup.find('ul', id='publications-list')
+    if pub_ul:
+        for li in pub_ul.find_all('li'):
+            text = re.sub(r'\s+', ' ', li.get_text(" ", strip=True))
+            year_match = re.search(r'\((\d{4})\)', text)
+            anchor = li.find('a')
+            model.publications.append(Publication(
+                year=year_match.group(1) if year_match else "Unknown",
+                title=anchor.get_text(strip=True) if anchor else "",
+                text=text,
+                # Keep the inner HTML so bolding and links survive
+                content="".join(str(x) for x in li.contents),
+                link=anchor.get('href') if anchor else None,
+            ))
+
+    for header in soup.find_all(['h2', 'h3']):
+        if "Grants & Awards" in header.get_text():
+            next_ul = header.find_next('ul')
+            if next_ul:
+                for li in next_ul.find_all('li'):
+                    text = re.sub(r'\s+', ' ', li.get_text(" ", strip=True))
+                    year_match = re.search(r'^(\d{4})', text)
+                    anchor = li.find('a')
+                    title = _clean(anchor.get_text(" ")).rstrip('.') if anchor else ""
+                    organization = ""
+                    if anchor:
+                        organization = _clean(" ".join(
+                            s.get_text(" ") if hasattr(s, 'get_text') else str(s)
+                            for s in anchor.next_siblings))
+                    model.awards.append(Award(
+                        year=year_match.group(1) if year_match else "Unknown",
+                        title=title,
+                        text=text,
+                        organization=organization.strip(" ,."),
+                        link=anchor.get('href') if anchor else None,
+                    ))
+            break
+
+    return model
+
+
+def default_cache_file(html_file):
+    """One cache file per source page, so different pages don't evict each other."""
+    path_key = hashlib.sha1(os.path.abspath(html_file).encode('utf-8')).hexdigest()[:12]
+    return os.path.join(CACHE_DIR, f"site_model-{path_key}.pickle")
+
+
+def load_site_model(html_file=DEFAULT_HTML_FILE, cache_file=None):
+    """
+    Return the `SiteModel` for `html_file`, parsing it only if the cached copy
+    is missing or out of date (`cache_file=False` disables caching). The
+    mtime is checked first; the content hash is only computed when the mtime
+    moved, so a touched-but-unchanged file still hits the cache.
+    """
+    if cache_file is None:
+        cache_file = default_cache_file(html_file)
+    stat = os.stat(html_file)
+    cached = None
+    if cache_file and os.path.exists(cache_file):
+        try:
+            with open(cache_file, 'rb') as f:
+                cached = pickle.load(f)
+        except Exception:
+            cached = None
+    if cached and cached.get('version') != MODEL_VERSION:
+        cached = None
+
+    if cached and cached['mtime_ns'] == stat.st_mtime_ns and cached['size'] == stat.st_size:
+        return cached['model']
+
+    with open(html_file, 'rb') as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+    if cached and cached['sha256'] == digest:
+        model = cached['model']
+    else:
+        model = parse_site_html(raw.decode('utf-8'))
+
+    if cache_file:
+        os.makedirs(os.path.dirname(cache_file) or '.', exist_ok=True)
+        tmp_file = cache_file + '.tmp'
+        with open(tmp_file, 'wb') as f:
+            pickle.dump({
+                'version': MODEL_VERSION,
+                'mtime_ns': stat.st_mtime_ns,
+                'size': stat.st_size,
+                'sha256': digest,
+                'model': model,
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+    return model
+
+
+# Sections of the model that generators render independently
+SECTIONS = ('profile', 'education', 'appointments', 'publications', 'awards')
+
+
+def section_digests(model):
+    """SHA-1 of each section's records, used to tell which sections changed."""
+    values = {
+        'profile': (model.name, model.title, model.center, model.institution,
+                    sorted(model.contact.items()), sorted(model.social_links.items())),
+        'education': model.education,
+        'appointments': model.appointments,
+        'publications': model.publications,
+        'awards': model.awards,
+    }
+    return {name: hashlib.sha1(repr(values[name]).encode('utf-8')).hexdigest() for name in SECTIONS}
+
+
+def diff_sections(old_digests, new_digests):
+    """Names of the sections whose digest differs (all of them if nothing is known)."""
+    return {name for name, digest in new_digests.items() if old_digests.get(name) != digest}
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Self-host subsetted WOFF2 web fonts for the homepage and the CV.
+
+For every face in FACES the original TTF is taken from --source-dir
+(default .cache/fonts/, downloaded from Google Fonts on first use), cut down
+to the characters that actually appear in the pages that use it, and saved
+as fonts/subset/<face>.<hash>.woff2. css/fonts.css gets one @font-face per
+file with `font-display: swap` and a `unicode-range` matching the subset.
+
+Montserrat has no CJK glyphs, so the Chinese name on the homepage (and
+`authorv.chinese_name` from _config.yml) is covered by a tiny Noto Sans SC
+subset declared as an extra face of the Montserrat family, limited by
+`unicode-range` to exactly those characters.
+
+index.html's Google Fonts <link>s are replaced by css/fonts.css, and
+generate_cv.py links css/fonts.css instead of Google Fonts once it exists.
+Faces whose source font and text are unchanged are skipped.
+
+Requires fontTools with Brotli (`pip install fonttools brotli`).
+
+Usage:
+    python scripts/subset_fonts.py
+    python scripts/subset_fonts.py --source-dir ~/fonts   # use local TTFs, no downloads
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import urllib.parse
+import urllib.request
+from collections import namedtuple
+
+from fsutil import atomic_write, file_lock, file_sha256
+from site_data import load_yaml
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE_DIR = os.path.join(ROOT_DIR, '.cache', 'fonts')
+OUTPUT_DIR = 'fonts/subset'
+FONTS_CSS = 'css/fonts.css'
+MANIFEST_FILE = os.path.join(ROOT_DIR, OUTPUT_DIR, 'manifest.json')
+GOOGLE_FONTS_CSS_API = 'https://fonts.googleapis.com/css2?family={family}:ital,wght@{ital},{weight}'
+
+Face = namedtuple('Face', ['family', 'weight', 'style', 'pages', 'source', 'cjk'],
+                  defaults=(None, False))
+
+FACES = [
+    # cv.html (generate_cv.py)
+    Face('Merriweather', 300, 'normal', ['cv.html']),
+    Face('Merriweather', 400, 'normal', ['cv.html']),
+    Face('Merriweather', 700, 'normal', ['cv.html']),
+    Face('Merriweather', 900, 'normal', ['cv.html']),
+    Face('Merriweather', 300, 'italic', ['cv.html']),
+    Face('Merriweather', 400, 'italic', ['cv.html']),
+    Face('Open Sans', 300, 'normal', ['cv.html']),
+    Face('Open Sans', 400, 'normal', ['cv.html']),
+    Face('Open Sans', 600, 'normal', ['cv.html']),
+    Face('Open Sans', 700, 'normal', ['cv.html']),
+    Face('Open Sans', 400, 'italic', ['cv.html']),
+    # index.html (css/style.css)
+    Face('Montserrat', 400, 'normal', ['index.html']),
+    Face('Montserrat', 700, 'normal', ['index.html']),
+    Face('Kaushan Script', 400, 'normal', ['index.html']),
+    Face('Montserrat', 700, 'normal', ['index.html'], source='Noto Sans SC', cjk=True),
+]
+
+# Always kept so small content edits do not need a rebuild to render
+BASE_CHARS = ''.join(map(chr, range(0x20, 0x7f))) + ' –—‘’“”•…·©'
+GOOGLE_FONTS_LINK_RE = re.compile(
+    r'[ \t]*<link\b[^>]*fonts\.googleapis\.com[^>]*>[ \t]*\n', re.I)
+
+
+def face_id(face):
+    slug = re.sub(r'[^a-z0-9]+', '-', face.family.lower()).strip('-')
+    return f"{slug}-{face.weight}{'i' if face.style == 'italic' else ''}{'-cjk' if face.cjk else ''}"
+
+
+def is_cjk(char):
+    return ord(char) >= 0x2e80
+
+
+# --- Text collection -------------------------------------------------------
+
+def page_text(path):
+    """Visible text of an HTML page (plus alt/title/placeholder/value attributes)."""
+    from bs4 import BeautifulSoup
+
+    with open(path, 'r', encoding='utf-8') as f:
+        soup = BeautifulSoup(f.read(), 'html.parser')
+    for tag in soup(['script', 'style']):
+        tag.decompose()
+    attrs = [v for tag in soup.find_all(True)
+             for k, v in tag.attrs.items() if k in ('alt', 'title', 'placeholder', 'value')]
+    return soup.get_text() + ''.join(str(v) for v in attrs)
+
+
+def face_text(face, texts, extra=''):
+    """Characters a face must cover, in both cases (the theme uppercases headings)."""
+    chars = set(''.join(texts[p] for p in face.pages) + extra)
+    chars |= {c.upper() for c in chars} | {c.lower() for c in chars}
+    chars = {c for c in chars if not c.isspace() or c == ' '}
+    if face.cjk:
+        return ''.join(sorted(c for c in chars if is_cjk(c)))
+    return ''.join(sorted((chars | set(BASE_CHARS)) - {c for c in chars if is_cjk(c)}))
+
+
+# --- Source fonts ----------------------------------------------------------
+
+def download_source(face, source_dir):
+    """Fetch the face's TTF from Google Fonts into `source_dir` (once)."""
+    family = face.source or face.family
+    path = os.path.join(source_dir, face_id(face) + '.ttf')
+    if os.path.exists(path):
+        return path
+    url = GOOGLE_FONTS_CSS_API.format(family=urllib.parse.quote_plus(family),
+                                      ital=int(face.style == 'italic'), weight=face.weight)
+    # Without a browser User-Agent the API serves plain TrueType files
+    with urllib.request.urlopen(url, timeout=30) as response:
+        css = response.read().decode('utf-8')
+    match = re.search(r"url\((https://[^)]+)\)\s*format\('truetype'\)", css)
+    if not match:
+        raise RuntimeError(f"No TrueType source for {family} {face.weight} {face.style}")
+    with urllib.request.urlopen(match.group(1), timeout=120) as response:
+        atomic_write(path, response.read())
+    return path
+
+
+def find_source(face, source_dir, download=True):
+    path = os.path.join(source_dir, face_id(face) + '.ttf')
+    if os.path.exists(path) or not download:
+        return path if os.path.exists(path) else None
+    return download_source(face, source_dir)
+
+
+# --- Subsetting ------------------------------------------------------------
+
+def unicode_range(codepoints):
+    """'U+20-7E,U+A0,...' for a set of code points."""
+    ranges, points = [], sorted(codepoints)
+    start = prev = None
+    for cp in points + [None]:
+        if start is not None and cp == prev + 1:
+            prev = cp
+            continue
+        if start is not None:
+            ranges.append(f"U+{start:X}" if start == prev else f"U+{start:X}-{prev:X}")
+        start = prev = cp
+    return ','.join(ranges)
+
+
+def subset_face(source, text, output_base):
+    """
+    Subset `source` to `text` and write `output_base.<hash>.woff2`.
+    Returns (relative path, unicode-range, size in bytes).
+    """
+    from io import BytesIO
+    from fontTools import subset
+    from fontTools.ttLib import TTFont
+
+    options = subset.Options()
+    options.flavor = 'woff2'
+    options.layout_features = ['*']
+    options.name_IDs = ['*']
+    options.notdef_outline = True
+    font = TTFont(source)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(text=text)
+    subsetter.subset(font)
+    covered = set(font.getBestCmap()) & {ord(c) for c in text}
+    buffer = BytesIO()
+    font.flavor = 'woff2'
+    font.save(buffer)
+    data = buffer.getvalue()
+
+    rel = f"{output_base}.{hashlib.sha256(data).hexdigest()[:10]}.woff2"
+    atomic_write(os.path.join(ROOT_DIR, rel), data)
+    return rel, unicode_range(covered), len(data)
+
+
+def _remove_stale(output_dir, keep):
+    directory = os.path.join(ROOT_DIR, output_dir)
+    if not os.path.isdir(directory):
+        return
+    for name in os.listdir(directory):
+        rel = f"{output_dir}/{name}"
+        if name.endswith('.woff2') and rel not in keep:
+            os.remove(os.path.join(directory, name))
+
+
+# --- Stylesheets -----------------------------------------------------------
+
+def render_fonts_css(manifest):
+    rules = []
+    for face in FACES:
+        entry = manifest.get(face_id(face))
+        if not entry or not entry['unicode_range']:
+            continue
+        url = os.path.relpath(os.path.join(ROOT_DIR, entry['file']),
+                              os.path.dirname(os.path.join(ROOT_DIR, FONTS_CSS))).replace(os.sep, '/')
+        rules.append(
+            "@font-face {\n"
+            f"    font-family: '{face.family}';\n"
+            f"    font-style: {face.style};\n"
+            f"    font-weight: {face.weight};\n"
+            "    font-display: swap;\n"
+            f"    src: url('{url}') format('woff2');\n"
+            f"    unicode-range: {entry['unicode_range']};\n"
+            "}\n")
+    return "/* Generated by scripts/subset_fonts.py - do not edit */\n" + "\n".join(rules)
+
+
+def rewrite_index_links(html_file):
+    """Replace Google Fonts <link>s in `html_file` with one link to css/fonts.css."""
+    link = f'    <link rel="stylesheet" href="/{FONTS_CSS}">\n'
+    with file_lock(html_file):
+        with open(html_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+        matches = list(GOOGLE_FONTS_LINK_RE.finditer(content))
+        if not matches:
+            return False
+        new_content = (content[:matches[0].start()] + link
+                       + GOOGLE_FONTS_LINK_RE.sub('', content[matches[0].end():]))
+        atomic_write(html_file, new_content)
+    return True
+
+
+# --- Build -----------------------------------------------------------------
+
+def subset_fonts(source_dir=SOURCE_DIR, download=True, force=False):
+    """
+    Subset every face; returns (manifest, report of (face id, status, bytes)).
+    css/fonts.css is only written when every face has a subset, so a partial
+    run never replaces Google Fonts with a stylesheet missing faces.
+    """
+    manifest = {}
+    if os.path.exists(MANIFEST_FILE):
+        with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+    pages = {p for face in FACES for p in face.pages}
+    texts = {p: page_text(os.path.join(ROOT_DIR, p)) if os.path.exists(os.path.join(ROOT_DIR, p)) else ''
+             for p in pages}
+    config = load_yaml(os.path.join(ROOT_DIR, '_config.yml'), {})
+    chinese_name = config.get('authorv', {}).get('chinese_name', '')
+
+    report = []
+    for face in FACES:
+        key = face_id(face)
+        text = face_text(face, texts, chinese_name)
+        try:
+            source = find_source(face, source_dir, download)
+        except (OSError, RuntimeError) as e:
+            print(f"  Could not download {face.source or face.family}: {e}")
+            source = None
+        if source is None:
+            report.append((key, 'missing source', 0))
+            continue
+        source_hash = file_sha256(source)
+        text_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        entry = manifest.get(key)
+        if (not force and entry and entry['source_sha256'] == source_hash
+                and entry['text_sha256'] == text_hash
+                and os.path.exists(os.path.join(ROOT_DIR, entry['file']))):
+            report.append((key, 'unchanged', entry['bytes']))
+            continue
+        rel, urange, size = subset_face(source, text, f"{OUTPUT_DIR}/{key}")
+        manifest[key] = {'file': rel, 'unicode_range': urange, 'bytes': size,
+                         'source_sha256': source_hash, 'text_sha256': text_hash,
+                         'source_bytes': os.path.getsize(source)}
+        report.append((key, 'subset', size))
+
+    _remove_stale(OUTPUT_DIR, {entry['file'] for entry in manifest.values()})
+    atomic_write(MANIFEST_FILE, json.dumps(manifest, indent=2, sort_keys=True) + '\n')
+    if not any(status == 'missing source' for _, status, _ in report):
+        atomic_write(os.path.join(ROOT_DIR, FONTS_CSS), render_fonts_css(manifest))
+    return manifest, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Subset and self-host the site's web fonts")
+    parser.add_argument('--source-dir', default=SOURCE_DIR,
+                        help="Directory of <face-id>.ttf originals (default: .cache/fonts)")
+    parser.add_argument('--no-download', action='store_true',
+                        help="Do not fetch missing originals from Google Fonts")
+    parser.add_argument('--force', action='store_true', help="Re-subset even if unchanged")
+    args = parser.parse_args()
+
+    try:
+        import brotli  # noqa: F401
+        from fontTools import subset  # noqa: F401
+    except ImportError:
+        print("Error: fontTools and brotli are required (pip install fonttools brotli)")
+        sys.exit(1)
+
+    manifest, report = subset_fonts(args.source_dir, not args.no_download, args.force)
+    for key, status, size in report:
+        icon = '❌' if status == 'missing source' else '✅'
+        print(f"{icon} {key:<24} {status:<15} {size / 1024:6.1f} KB")
+    total = sum(e['bytes'] for e in manifest.values())
+    print(f"📊 {len(manifest)} faces, {total / 1024:.0f} KB of WOFF2 in {OUTPUT_DIR}/")
+
+    missing = [key for key, status, _ in report if status == 'missing source']
+    if missing:
+        print(f"❌ No source font for {len(missing)} face(s); {FONTS_CSS} not written, "
+              f"index.html keeps Google Fonts")
+        sys.exit(1)
+    if rewrite_index_links(os.path.join(ROOT_DIR, 'index.html')):
+        print(f"✅ index.html now loads /{FONTS_CSS} instead of Google Fonts")
+    print("Regenerate cv.html (python scripts/build.py) to switch it to the local fonts")
+
+
+if __name__ == "__main__":
+    main()
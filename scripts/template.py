@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+A tiny compiled template engine.
+
+Templates use `str.format` syntax (`{info.name}`, `{item[year]}`). They are
+parsed once, at import time, into literal/field parts; rendering then only
+looks up fields and yields the pieces, so a page can be streamed straight to
+a file without building intermediate copies of the document.
+"""
+
+from string import Formatter
+
+_formatter = Formatter()
+
+
+class Template:
+    def __init__(self, source):
+        self.source = source
+        self.parts = []
+        for literal, field_name, format_spec, conversion in _formatter.parse(source):
+            if literal:
+                self.parts.append((literal, None, None, None))
+            if field_name is not None:
+                self.parts.append((None, field_name, format_spec, conversion))
+
+    def stream(self, **context):
+        """Yield the rendered template piece by piece."""
+        for literal, field_name, format_spec, conversion in self.parts:
+            if literal is not None:
+                yield literal
+                continue
+            value, _ = _formatter.get_field(field_name, (), context)
+            if conversion:
+                value = _formatter.convert_field(value, conversion)
+            yield format(value, format_spec) if format_spec else str(value)
+
+    def render(self, **context):
+        return "".join(self.stream(**context))
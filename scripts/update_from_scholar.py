@@ -1,8 +1,22 @@
+import argparse
 import yaml
-from scholarly import scholarly
 import sys
 import os
 
+try:
+    from scholarly import scholarly
+except ImportError:  # only --replay works without it
+    scholarly = None
+
+from scholar_pool import DEFAULT_WORKERS, DEFAULT_RATE
+from scholar_cache import ScholarCache, fill_with_cache, publication_key, DEFAULT_TTL_DAYS
+from site_data import load_yaml
+from instrument import span, profiled, add_profile_argument
+from scholar_replay import (REPLAY_CACHE_PATH, REPLAY_SNAPSHOT_PATH, add_replay_arguments, replay_output,
+                           scholar_backend)
+from scholar_snapshot import (load_snapshot, save_snapshot, snapshot_record,
+                              diff_publications, patch_publications, DEFAULT_SNAPSHOT_PATH)
+
 # Configuration
 CONFIG_FILE = '_config.yml'
 DATA_FILE = '_data/publications.yml'
@@ -11,71 +25,191 @@ def load_config():
     if not os.path.exists(CONFIG_FILE):
         print(f"Error: {CONFIG_FILE} not found.")
         sys.exit(1)
-    with open(CONFIG_FILE, 'r') as f:
-        return yaml.safe_load(f)
+    return load_yaml(CONFIG_FILE, {})
+
+def format_entry(pub, highlight=('Yalin Yang', 'Y Yang')):
+    bib = pub['bib']
+    
+    # Extract fields
+    title = bib.get('title', 'Untitled')
+    year = bib.get('pub_year', 'Unknown')
+    
+    # Authors
+    # Google Scholar returns authors as a string sometimes, let's keep it simple
+    authors = bib.get('author', 'Unknown')
+    # Bold current user (simplified logic, user might need to adjust name matching)
+    for name in highlight:
+        authors = authors.replace(name, f'**{name}**')
+
+    # Journal / Venue
+    journal = bib.get('journal') or bib.get('conference') or bib.get('publisher') or 'Preprint'
+    volume = bib.get('volume')
+    number = bib.get('number')
+    pages = bib.get('pages')
+    
+    journal_full = journal
+    if volume:
+        journal_full += f", {volume}"
+        if number:
+            journal_full += f"({number})"
+    if pages:
+        journal_full += f", {pages}"
+        
+    link = pub.get('pub_url')
+    
+    return {
+        'title': title,
+        'authors': authors,
+        'year': int(year) if str(year).isdigit() else year,
+        'journal': journal_full,
+        'link': link
+    }
 
-def fetch_publications(scholar_id):
+def fetch_publication_list(scholar_id, backend=scholarly):
     print(f"Fetching publications for Google Scholar ID: {scholar_id}...")
     try:
-        author = scholarly.search_author_id(scholar_id)
-        scholarly.fill(author, sections=['publications'])
+        with span('fetch', scholar_id):
+            author = backend.search_author_id(scholar_id)
+            backend.fill(author, sections=['publications'])
     except Exception as e:
         print(f"Error fetching from Google Scholar: {e}")
         sys.exit(1)
+    return author['publications']
+
+def fetch_publications(scholar_id, backend=scholarly, max_workers=DEFAULT_WORKERS,
+                       rate_per_sec=DEFAULT_RATE, cache=None, snapshot_path=DEFAULT_SNAPSHOT_PATH):
+    pub_list = fetch_publication_list(scholar_id, backend)
+    print(f"Found {len(pub_list)} publications.")
     
-    publications = []
-    print(f"Found {len(author['publications'])} publications.")
+    results = fill_with_cache(pub_list, backend.fill, cache,
+                              max_workers=max_workers, rate_per_sec=rate_per_sec)
     
-    for pub in author['publications']:
-        scholarly.fill(pub)
-        bib = pub['bib']
-        
-        # Extract fields
-        title = bib.get('title', 'Untitled')
-        year = bib.get('pub_year', 'Unknown')
-        
-        # Authors
-        # Google Scholar returns authors as a string sometimes, let's keep it simple
-        authors = bib.get('author', 'Unknown')
-        # Bold current user (simplified logic, user might need to adjust name matching)
-        authors = authors.replace('Yalin Yang', '**Yalin Yang**').replace('Y Yang', '**Y Yang**')
-
-        # Journal / Venue
-        journal = bib.get('journal') or bib.get('conference') or bib.get('publisher') or 'Preprint'
-        volume = bib.get('volume')
-        number = bib.get('number')
-        pages = bib.get('pages')
-        
-        journal_full = journal
-        if volume:
-            journal_full += f", {volume}"
-            if number:
-                journal_full += f"({number})"
-        if pages:
-            journal_full += f", {pages}"
-            
-        link = pub.get('pub_url')
-        
-        entry = {
-            'title': title,
-            'authors': authors,
-            'year': int(year) if str(year).isdigit() else year,
-            'journal': journal_full,
-            'link': link
-        }
-        publications.append(entry)
+    publications = []
+    for result in results:
+        if result.error:
+            print(f"Error filling '{result.source['bib'].get('title', 'Untitled')[:50]}': {result.error}")
+            sys.exit(1)
+        publications.append(format_entry(result.filled))
+
+    # Record what was synced so the next --incremental run can diff against it
+    if snapshot_path:
+        save_snapshot(scholar_id, {publication_key(pub): snapshot_record(pub)
+                                   for pub in pub_list if publication_key(pub)}, snapshot_path)
         
     return publications
 
-def save_yaml(publications):
+def sync_incremental(scholar_id, backend=scholarly, max_workers=DEFAULT_WORKERS,
+                     rate_per_sec=DEFAULT_RATE, cache=None, snapshot_path=DEFAULT_SNAPSHOT_PATH,
+                     refill=False, data_file=DATA_FILE):
+    """
+    Fill only publications that were added or changed since the last
+    snapshot and patch `data_file` in place. Returns the change report.
+    With `refill`, unchanged publications are filled too (used when
+    recording a cassette, so replays can start from any snapshot).
+    """
+    snapshot = load_snapshot(snapshot_path)
+    if snapshot.get('scholar_id') not in (None, scholar_id):
+        print(f"Snapshot belongs to {snapshot['scholar_id']}, starting from scratch.")
+        snapshot = {'scholar_id': scholar_id, 'publications': {}}
+
+    pub_list = fetch_publication_list(scholar_id, backend)
+    diff = diff_publications(pub_list, snapshot)
+    if refill:
+        diff = diff._replace(changed=diff.changed + diff.unchanged, unchanged=[])
+    print(f"Found {len(pub_list)} publications: {len(diff.added)} added, {len(diff.changed)} changed, "
+          f"{len(diff.removed)} removed, {len(diff.unchanged)} unchanged.")
+
+    previous = snapshot.get('publications', {})
+    records = {publication_key(pub): previous[publication_key(pub)] for pub in diff.unchanged}
+    results = fill_with_cache(diff.added + diff.changed, backend.fill, cache,
+                              max_workers=max_workers, rate_per_sec=rate_per_sec)
+
+    updates = []
+    citation_changes = []
+    update_ids = {}
+    for result in results:
+        pub_id = publication_key(result.source)
+        if result.error:
+            print(f"Error filling '{result.source['bib'].get('title', 'Untitled')[:50]}': {result.error}")
+            # Keep the old record so the publication is retried next run
+            if pub_id in previous:
+                records[pub_id] = previous[pub_id]
+            continue
+        updates.append(format_entry(result.filled))
+        if pub_id:
+            update_ids[updates[-1]['title']] = pub_id
+            record = snapshot_record(result.source)
+            old = previous.get(pub_id)
+            if old and old['num_citations'] != record['num_citations']:
+                citation_changes.append((record['title'], old['num_citations'], record['num_citations']))
+            records[pub_id] = record
+
+    with span('read', data_file):
+        entries = load_yaml(data_file, [])
+    report = patch_publications(entries, updates, [r['title'] for r in diff.removed])
+    # Updates left for a manual check were not applied: keep their previous
+    # record (or none) so the next run diffs and retries them
+    skipped = {title for title, _ in report['similar']}
+    for title in skipped:
+        pub_id = update_ids.get(title)
+        if pub_id in previous:
+            records[pub_id] = previous[pub_id]
+        elif pub_id:
+            records.pop(pub_id, None)
+    report['citations'] = [change for change in citation_changes if change[0] not in skipped]
+
+    if report['added'] or report['updated'] or report['removed']:
+        save_yaml(entries, data_file)
+    else:
+        print(f"{data_file} is already up to date.")
+    save_snapshot(scholar_id, records, snapshot_path)
+
+    print_report(report)
+    return report
+
+def print_report(report):
+    print("\nChanges:")
+    for title in report['added']:
+        print(f"  + {title}")
+    for title in report['updated']:
+        print(f"  ~ {title}")
+    for title in report['removed']:
+        print(f"  - {title}")
+    for title, existing in report.get('similar', ()):
+        print(f"  ? {title[:60]} looks like {existing[:60]!r}, not merged")
+    for title, old, new in report['citations']:
+        print(f"  ↑ {title[:60]}: {old} → {new} citations")
+    if not any(report.values()):
+        print("  (none)")
+
+def save_yaml(publications, data_file=DATA_FILE):
     # Sort by year descending
     publications.sort(key=lambda x: str(x['year']), reverse=True)
     
-    with open(DATA_FILE, 'w', encoding='utf-8') as f:
+    with span('write', data_file), open(data_file, 'w', encoding='utf-8') as f:
         yaml.dump(publications, f, sort_keys=False, allow_unicode=True, width=1000)
-    print(f"Saved {len(publications)} publications to {DATA_FILE}")
+    print(f"Saved {len(publications)} publications to {data_file}")
 
 def main():
+    parser = argparse.ArgumentParser(description=f"Refresh {DATA_FILE} from Google Scholar")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help="Number of publications filled concurrently")
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE,
+                        help="Maximum Google Scholar requests per second")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Refill every publication instead of using the local cache")
+    parser.add_argument('--cache-ttl-days', type=float, default=DEFAULT_TTL_DAYS,
+                        help="Refill cached publications older than this many days")
+    parser.add_argument('--incremental', action='store_true',
+                        help=f"Only fill publications changed since the last snapshot and patch {DATA_FILE}")
+    add_profile_argument(parser)
+    add_replay_arguments(parser)
+    args = parser.parse_args()
+
+    if scholarly is None and not args.replay:
+        print("Error: scholarly is required (pip install scholarly), or pass --replay CASSETTE")
+        sys.exit(1)
+
     config = load_config()
     scholar_id = config.get('google_scholar_id')
     
@@ -83,8 +217,29 @@ def main():
         print("Error: 'google_scholar_id' not found in _config.yml")
         sys.exit(1)
         
-    pubs = fetch_publications(scholar_id)
-    save_yaml(pubs)
+    cache = None
+    # Recorded runs bypass the cache so every fill reaches the cassette;
+    # replayed runs get their own cache so they never mix with live data
+    if not args.no_cache and not args.record:
+        cache_kwargs = {'path': REPLAY_CACHE_PATH} if args.replay else {}
+        cache = ScholarCache(ttl_days=args.cache_ttl_days, **cache_kwargs)
+    snapshot_path = REPLAY_SNAPSHOT_PATH if args.replay else DEFAULT_SNAPSHOT_PATH
+    # Replays never touch the real site data
+    data_file = replay_output(DATA_FILE) if args.replay else DATA_FILE
+    with profiled('update_from_scholar', args.profile):
+        try:
+            with scholar_backend(scholarly, args.record, args.replay, args.latency, args.jitter) as backend:
+                if args.incremental:
+                    sync_incremental(scholar_id, backend=backend, max_workers=args.workers,
+                                     rate_per_sec=args.rate, cache=cache, snapshot_path=snapshot_path,
+                                     refill=bool(args.record), data_file=data_file)
+                    return
+                pubs = fetch_publications(scholar_id, backend=backend, max_workers=args.workers,
+                                          rate_per_sec=args.rate, cache=cache, snapshot_path=snapshot_path)
+        finally:
+            if cache is not None:
+                cache.close()
+        save_yaml(pubs, data_file)
 
 if __name__ == "__main__":
     main()
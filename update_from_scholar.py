@@ -4,9 +4,27 @@ Script to update publications in index.html directly from Google Scholar
 using the `scholarly` library.
 """
 
+import argparse
+import os
 import sys
 import re
-from scholarly import scholarly
+
+try:
+    from scholarly import scholarly
+except ImportError:  # only --replay works without it
+    scholarly = None
+
+# Helper modules live next to this script in scripts/ and archive/
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+for _subdir in ('scripts', 'archive'):
+    sys.path.insert(0, os.path.join(ROOT_DIR, _subdir))
+
+from scholar_pool import DEFAULT_WORKERS, DEFAULT_RATE
+from scholar_cache import ScholarCache, fill_with_cache, publication_key, DEFAULT_TTL_DAYS
+from site_model import load_site_model
+from pub_index import PublicationIndex
+from instrument import span, profiled, add_profile_argument
+from scholar_replay import REPLAY_CACHE_PATH, add_replay_arguments, replay_output, scholar_backend
 
 # Import helper functions from existing script
 try:
@@ -15,108 +33,108 @@ except ImportError:
     print("Error: Could not import from update_publications.py")
     sys.exit(1)
 
-def fetch_and_parse_publications(scholar_id):
+def format_publication(filled_pub, year=None):
+    """
+    Turn a filled `scholarly` publication into the dict expected by
+    generate_html_li.
+    """
+    bib = filled_pub['bib']
+    title = bib.get('title')
+    year = year or bib.get('pub_year')
+
+    authors_list = bib.get('author', '').split(' and ')
+    # Format authors: "Last, F."
+    formatted_authors = []
+    for auth in authors_list:
+        parts = auth.strip().split()
+        if not parts:
+            continue
+        if len(parts) == 1:
+            formatted_authors.append(parts[0])
+        else:
+            last_name = parts[-1]
+            initials = ''.join([p[0]+'.' for p in parts[:-1]])
+            formatted_authors.append(f"{last_name}, {initials}")
+
+    authors_str = ", ".join(formatted_authors)
+    authors_str = authors_str.replace("&", "&amp;") # Basic escape
+
+    # Bold Yang, Y.
+    authors_final = re.sub(r'Yang, Y\.', '<b>Yang, Y.</b>', authors_str)
+    # Also handle variations like "Yang, Y.-L." or just "Yang, Y"
+    if "<b>" not in authors_final and "Yang" in authors_str:
+         authors_final = re.sub(r'Yang, [A-ZY]\.?', '<b>Yang, Y.</b>', authors_str)
+
+    # Extract other fields
+    journal = bib.get('journal') or bib.get('conference') or bib.get('publisher') or "Unknown Journal"
+    volume = bib.get('volume')
+    issue = bib.get('number')
+    pages = bib.get('pages')
+
+    # DOI logic (scholarly doesn't always give DOI, we might need to infer or it might be in 'pub_url' or similar)
+    pub_url = filled_pub.get('pub_url')
+    doi_url = pub_url if pub_url else None
+
+    # Determine type
+    pub_type = 'journal'
+    if 'thesis' in title.lower() or 'thesis' in journal.lower():
+        pub_type = 'thesis'
+
+    return {
+        'authors': authors_final,
+        'year': int(year) if year else 0,
+        'title': title,
+        'journal': journal,
+        'volume': volume,
+        'issue': issue,
+        'pages': pages,
+        'doi_url': doi_url,
+        'type': pub_type,
+        'scholar_id': publication_key(filled_pub)
+    }
+
+def fetch_and_parse_publications(scholar_id, backend=scholarly, max_workers=DEFAULT_WORKERS,
+                                 rate_per_sec=DEFAULT_RATE, cache=None):
     """
     Fetch publications from Google Scholar and parse them into the format
     expected by generate_html_li.
+
+    Individual publications are filled concurrently by a bounded thread pool
+    (see scripts/scholar_pool.py); output order follows the author's
+    publication list regardless of which fill finishes first. `backend` can be
+    any object with scholarly's `search_author_id`/`fill` interface, e.g. the
+    fake in scripts/fake_scholarly.py. With a `cache` (scripts/scholar_cache.py)
+    only new or stale publications are filled over the network.
     """
     print(f"Searching for author with ID: {scholar_id}")
     try:
-        author = scholarly.search_author_id(scholar_id)
-        print(f"Found author: {author.get('name')}")
-        
-        # Fill publication details (this might take a while and risks blocking if too aggressive)
-        # For now, we will try to use available data from the search result 
-        # and only fill if strictly necessary, or just rely on what's available to avoid blocking.
-        # Ideally, we should use `scholarly.fill(author, sections=['publications'])`
-        
-        print("Fetching publications list...")
+        with span('fetch', scholar_id):
+            author = backend.search_author_id(scholar_id)
+            print(f"Found author: {author.get('name')}")
+
+            print("Fetching publications list...")
+            pub_list = backend.fill(author, sections=['publications'])['publications']
+
+        # Skip if no title (minimal requirement)
+        pub_list = [pub for pub in pub_list if pub.get('bib', {}).get('title')]
+
+        print(f"Found {len(pub_list)} publications. Filling with {max_workers} workers...")
+        results = fill_with_cache(pub_list, backend.fill, cache, max_workers=max_workers,
+                                  rate_per_sec=rate_per_sec)
+
         publications_data = []
-        
-        # scholarly returns an iterator or list
-        # We need to fill the author to get the full list of publications
-        
-        # NOTE: filling all publications details might be slow and trigger rate limits.
-        # We will try to get the full list first.
-        pub_list = scholarly.fill(author, sections=['publications'])['publications']
-        
-        print(f"Found {len(pub_list)} publications. Processing...")
-        
-        for i, pub in enumerate(pub_list):
-            title = pub.get('bib', {}).get('title')
-            year = pub.get('bib', {}).get('pub_year')
-            
-            # Skip if no title or year (minimal requirements)
-            if not title:
+        for result in results:
+            title = result.source['bib']['title']
+            if result.error:
+                print(f"  Error processing publication '{title[:30]}...': {result.error}")
                 continue
-                
-            # If we need more details (journal, volume, etc.), we might need to fill the publication
-            # But this is expensive. Let's try to get what we can.
-            # 'bib' usually contains: title, pub_year, citation
-            # We might need to fill to get 'journal', 'author', etc.
-            
             try:
-                # Filling individual publication to get full bibtex
-                # We can add a delay if needed, but let's try without first
-                filled_pub = scholarly.fill(pub)
-                bib = filled_pub['bib']
-                
-                authors_list = bib.get('author', '').split(' and ')
-                # Format authors: "Last, F."
-                formatted_authors = []
-                for auth in authors_list:
-                    parts = auth.strip().split()
-                    if not parts:
-                        continue
-                    if len(parts) == 1:
-                        formatted_authors.append(parts[0])
-                    else:
-                        last_name = parts[-1]
-                        initials = ''.join([p[0]+'.' for p in parts[:-1]])
-                        formatted_authors.append(f"{last_name}, {initials}")
-                
-                authors_str = ", ".join(formatted_authors)
-                authors_str = authors_str.replace("&", "&amp;") # Basic escape
-                
-                # Bold Yang, Y.
-                authors_final = re.sub(r'Yang, Y\.', '<b>Yang, Y.</b>', authors_str)
-                # Also handle variations like "Yang, Y.-L." or just "Yang, Y"
-                if "<b>" not in authors_final and "Yang" in authors_str:
-                     authors_final = re.sub(r'Yang, [A-ZY]\.?', '<b>Yang, Y.</b>', authors_str)
-
-                # Extract other fields
-                journal = bib.get('journal') or bib.get('conference') or bib.get('publisher') or "Unknown Journal"
-                volume = bib.get('volume')
-                issue = bib.get('number')
-                pages = bib.get('pages')
-                
-                # DOI logic (scholarly doesn't always give DOI, we might need to infer or it might be in 'pub_url' or similar)
-                pub_url = filled_pub.get('pub_url')
-                doi_url = pub_url if pub_url else None
-                
-                # Determine type
-                pub_type = 'journal'
-                if 'thesis' in title.lower() or 'thesis' in journal.lower():
-                    pub_type = 'thesis'
-
-                pub_data = {
-                    'authors': authors_final,
-                    'year': int(year) if year else 0,
-                    'title': title,
-                    'journal': journal,
-                    'volume': volume,
-                    'issue': issue,
-                    'pages': pages,
-                    'doi_url': doi_url,
-                    'type': pub_type
-                }
-                
-                publications_data.append(pub_data)
-                print(f"  Processed: {title[:50]}...")
-                
+                pub_data = format_publication(result.filled, year=result.source['bib'].get('pub_year'))
             except Exception as e:
                 print(f"  Error processing publication '{title[:30]}...': {e}")
                 continue
+            publications_data.append(pub_data)
+            print(f"  Processed: {title[:50]}...")
 
         return publications_data
 
@@ -125,93 +143,91 @@ def fetch_and_parse_publications(scholar_id):
         return []
 
 def main():
-    scholar_id = "wdkZhlwAAAAJ"
-    html_file = "index.html"
-    
-    print(f"Starting update from Google Scholar ID: {scholar_id}")
-    
-    publications_data = fetch_and_parse_publications(scholar_id)
-    
-    if not publications_data:
-        print("No publications found or error occurred.")
-        return
+    parser = argparse.ArgumentParser(description="Update index.html publications from Google Scholar")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help="Number of publications filled concurrently")
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE,
+                        help="Maximum Google Scholar requests per second")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Refill every publication instead of using the local cache")
+    parser.add_argument('--cache-ttl-days', type=float, default=DEFAULT_TTL_DAYS,
+                        help="Refill cached publications older than this many days")
+    add_profile_argument(parser)
+    add_replay_arguments(parser)
+    args = parser.parse_args()
+
+    if scholarly is None and not args.replay:
+        print("Error: scholarly is required (pip install scholarly), or pass --replay CASSETTE")
+        sys.exit(1)
 
-    # Sort by year (newest first)
-    publications_data.sort(key=lambda x: x['year'], reverse=True)
+    with profiled('update_from_scholar', args.profile):
+        scholar_id = "wdkZhlwAAAAJ"
+        # Replays update a copy under .cache/replay/, never the live page
+        html_file = replay_output("index.html") if args.replay else "index.html"
     
-    print(f"\nCollected {len(publications_data)} publications.")
+        print(f"Starting update from Google Scholar ID: {scholar_id}")
     
-    # Check existing html content to preserve existing ones if needed?
-    # Actually, the requirement implies we should generate code directly using scholar id,
-    # which implies replacing or merging.
-    # The existing logic in update_html_file appends new ones to existing ones unless they exist.
-    # But here we are fetching ALL. So we might potential duplicate if we just append.
-    # We should probably clear existing or check for duplicates intelligently.
-    # `update_html_file` in `update_publications.py` has logic:
-    # 1. Reads existing.
-    # 2. Merges with new.
-    # 3. Sorts.
-    # However, if we feed it ALL publications from Scholar, and they are already in HTML,
-    # we need to make sure we don't duplicate. 
-    # The current `main` in `update_publications.py` checks for duplicates by title.
-    # We should do the same here.
+        cache = None
+        # Recorded runs bypass the cache so every fill reaches the cassette;
+        # replayed runs get their own cache so they never mix with live data
+        if not args.no_cache and not args.record:
+            cache_kwargs = {'path': REPLAY_CACHE_PATH} if args.replay else {}
+            cache = ScholarCache(ttl_days=args.cache_ttl_days, **cache_kwargs)
+        try:
+            with scholar_backend(scholarly, args.record, args.replay, args.latency, args.jitter) as backend:
+                publications_data = fetch_and_parse_publications(scholar_id, backend=backend,
+                                                                  max_workers=args.workers,
+                                                                  rate_per_sec=args.rate, cache=cache)
+        finally:
+            if cache is not None:
+                cache.close()
     
-    # Use helper to extract existing titles
-    with open(html_file, 'r', encoding='utf-8') as f:
-        html_content = f.read()
+        if not publications_data:
+            print("No publications found or error occurred.")
+            return
+
+        # Sort by year (newest first)
+        publications_data.sort(key=lambda x: x['year'], reverse=True)
     
-    # We need to import `extract_existing_publications` too, but it wasn't imported above.
-    # Let's import it now or Copy it.
-    from update_publications import extract_existing_publications
+        print(f"\nCollected {len(publications_data)} publications.")
     
-    existing_titles = extract_existing_publications(html_content)
-    print(f"Found {len(existing_titles)} existing publications in HTML")
+        # Existing publications come from the shared (cached) site model, indexed
+        # by normalized title and DOI so each lookup is O(1); near-identical
+        # titles (dash variants, small typos) count as the same publication
+        with span('parse', html_file):
+            index = PublicationIndex.from_publications(load_site_model(html_file).publications)
+        print(f"Found {len(index)} existing publications in HTML")
     
-    new_publications_data = []
-    for pub in publications_data:
-        # Simple title check (strip punctuation/case for better match?)
-        # For now, exact match as in original script
-        if pub['title'] in existing_titles:
-             # Identify if we want to UPDATE existing entries?
-             # The original script skips. We will skip too for safety.
-             # print(f"Skipping existing: {pub['title'][:30]}...")
-             pass
-        else:
-             # Check fuzzy match?
-             # Sometimes titles vary slightly. 
-             # For now, strict match.
-             if pub['title'] not in existing_titles:
-                 new_publications_data.append(pub)
-
-    if not new_publications_data:
-         print("No NEW publications found from Google Scholar (all match existing titles).")
-         # Proceed to re-sort anyway?
-         # But `update_html_file` expects a list of formatted HTML items.
-         return
-
-    print(f"Found {len(new_publications_data)} NEW publications to add.")
+        new_publications_data = []
+        for pub in publications_data:
+            if index.find(pub['title'], doi=pub['doi_url'], scholar_id=pub['scholar_id']) is not None:
+                continue
+            # Scholar sometimes lists the same paper twice; index new ones too
+            index.add(pub, pub['title'], doi=pub['doi_url'], scholar_id=pub['scholar_id'])
+            new_publications_data.append(pub)
+
+        if not new_publications_data:
+             print("No NEW publications found from Google Scholar (all match existing titles).")
+             # Proceed to re-sort anyway?
+             # But `update_html_file` expects a list of formatted HTML items.
+             return
+
+        print(f"Found {len(new_publications_data)} NEW publications to add.")
     
-    # Generate HTML items
-    html_items = []
-    for pub_data in new_publications_data:
-        html_li = generate_html_li(pub_data)
-        html_items.append(html_li)
+        # Generate HTML items
+        html_items = []
+        with span('render', 'publications'):
+            for pub_data in new_publications_data:
+                html_li = generate_html_li(pub_data)
+                html_items.append(html_li)
         
-    # Read existing publications HTML to pass to update_html_file
-    # (Update: update_html_file extracts existing internally? No, it takes `existing_publications_html` argument)
-    # create `existing_publications_html`
-    existing_publications_html = ""
-    ul_start = html_content.find('<ul id="publications-list">')
-    if ul_start != -1:
-        ul_end = html_content.find('</ul>', ul_start)
-        if ul_end != -1:
-            existing_publications_html = html_content[ul_start + len('<ul id="publications-list">'):ul_end]
-
-    # Call update
-    if update_html_file(html_file, html_items, existing_publications_html):
-        print("Successfully updated index.html")
-    else:
-        print("Failed to update index.html")
+        # Splice them into the publications list (read, merged and written under a lock)
+        with span('write', html_file):
+            updated = update_html_file(html_file, html_items)
+        if updated:
+            print(f"Successfully updated {html_file}")
+        else:
+            print(f"Failed to update {html_file}")
 
 if __name__ == "__main__":
     main()
@@ -1,46 +1,32 @@
 #!/usr/bin/env python3
 """
-Script to update README.md based on content from index.html
+Script to update README.md based on the site data (_data/*.yml) or index.html
 Extracts key information from the academic website and generates an updated README
 """
 
-import re
-from bs4 import BeautifulSoup
+import argparse
 from datetime import datetime
 import os
+import sys
 
-def extract_info_from_html(html_file):
-    """Extract key information from index.html"""
-    
-    with open(html_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    soup = BeautifulSoup(content, 'html.parser')
+# Shared helpers live in scripts/
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'scripts'))
+from site_model import load_site_model
+from site_data import load_site_data
+from instrument import span, profiled, add_profile_argument
+
+def readme_info(model, education=None, appointments=None):
+    """Collect the README fields from a `SiteModel`"""
     
     # Extract basic info
-    name = "Yalin Yang"
-    title = "Research Associate & GIS Programmer"
-    institution = "West Virginia University"
-    center = "West Virginia GIS Technical Center"
-    
-    # Extract email
-    email_match = re.search(r'mailto:([^"]+)', content)
-    email = email_match.group(1) if email_match else "yy00021@mail.wvu.edu"
-    
-    # Extract website URL
-    website_match = re.search(r'https://gisyaliny\.github\.io/', content)
-    website = "https://gisyaliny.github.io/" if website_match else "https://gisyaliny.github.io/"
-    
-    # Extract social links
-    social_links = {}
-    for link in soup.find_all('a', href=True):
-        href = link.get('href')
-        if 'scholar.google.com' in href:
-            social_links['Google Scholar'] = href
-        elif 'github.com' in href:
-            social_links['GitHub'] = href
-        elif 'linkedin.com' in href:
-            social_links['LinkedIn'] = href
+    name = model.name
+    title = model.title
+    institution = model.institution
+    center = model.center
+    email = model.contact['email']
+    website = model.contact['website']
+    social_links = model.social_links
     
     # Extract research interests
     research_interests = [
@@ -53,49 +39,15 @@ def extract_info_from_html(html_file):
         "Python, JavaScript, Java, R Programming"
     ]
     
-    # Extract education
-    education = [
-        "2019–2024: Ph.D. in Geospatial Information Sciences, University of Texas at Dallas",
-        "2017–2019: M.A. in Geography, Binghamton University (SUNY)",
-        "2013–2017: B.S. in Geographic Information Science, Yunnan University"
-    ]
+    # Education and current appointments ("period: description")
+    if education is None:
+        education = [str(entry) for entry in model.education]
+    if appointments is None:
+        appointments = [str(entry) for entry in model.appointments]
     
-    # Extract current appointments
-    appointments = [
-        "2024–Present: Research Associate, GIS Programmer, West Virginia GIS Technical Center",
-        "2024: Senior GIS Analyst, City of Dallas",
-        "2021–2024: GIS Administrator, GAIA Lab, UT Dallas",
-        "2019–2024: Teaching Assistant, Department of GIScience, UT Dallas",
-        "2018–2019: Teaching Assistant, Department of Geography, Binghamton University (SUNY)"
-    ]
-    
-    # Extract recent publications (from the publications section)
-    publications = []
-    pub_ul = soup.find('ul', id='publications-list')
-    if pub_ul:
-        for li in pub_ul.find_all('li'):
-            # Convert to text
-            # We attempt to reconstruct a clean string. 
-            # Simple get_text() is usually sufficient but we want to ensure spacing is okay.
-            text = li.get_text(" ", strip=True)
-            # Clean up multiple spaces
-            text = re.sub(r'\s+', ' ', text)
-            publications.append(text)
-    
-    # Extract awards and grants
-    awards = []
-    # Find section with "Grants & Awards"
-    # Search for h2 or h3 with the text
-    for header in soup.find_all(['h2', 'h3']):
-        if "Grants & Awards" in header.get_text():
-            # The list should be the next ul sibling (ignoring newlines)
-            next_ul = header.find_next('ul')
-            if next_ul:
-                for li in next_ul.find_all('li'):
-                    text = li.get_text(" ", strip=True)
-                    text = re.sub(r'\s+', ' ', text)
-                    awards.append(text)
-            break
+    # Recent publications and awards (from the publications section)
+    publications = [pub.text for pub in model.publications]
+    awards = [award.text for award in model.awards]
     
     return {
         'name': name,
@@ -112,10 +64,33 @@ def extract_info_from_html(html_file):
         'awards': awards
     }
 
-def generate_readme(info):
+def extract_info_from_html(html_file):
+    """Extract key information from index.html (via the cached site model)"""
+    
+    # The HTML paragraphs mix in links and locations, so keep the README's
+    # curated education and appointment lines on this path
+    education = [
+        "2019–2024: Ph.D. in Geospatial Information Sciences, University of Texas at Dallas",
+        "2017–2019: M.A. in Geography, Binghamton University (SUNY)",
+        "2013–2017: B.S. in Geographic Information Science, Yunnan University"
+    ]
+    appointments = [
+        "2024–Present: Research Associate, GIS Programmer, West Virginia GIS Technical Center",
+        "2024: Senior GIS Analyst, City of Dallas",
+        "2021–2024: GIS Administrator, GAIA Lab, UT Dallas",
+        "2019–2024: Teaching Assistant, Department of GIScience, UT Dallas",
+        "2018–2019: Teaching Assistant, Department of Geography, Binghamton University (SUNY)"
+    ]
+    return readme_info(load_site_model(html_file), education, appointments)
+
+def extract_info_from_data(root=ROOT_DIR):
+    """Extract key information from _config.yml and _data/*.yml"""
+    return readme_info(load_site_data(root))
+
+def generate_readme(info, updated=None):
     """Generate README.md content based on extracted information"""
     
-    current_year = datetime.now().year
+    updated = updated or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     
     readme_content = f"""# {info['name']}'s Academic Website
 
@@ -188,7 +163,7 @@ This is the personal academic website of {info['name']}, a {info['title']} at th
 
 ---
 
-*This README is automatically generated from the website content. Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*
+*This README is automatically generated from the website content. Last updated: {updated}*
 """
     
     return readme_content
@@ -196,28 +171,43 @@ This is the personal academic website of {info['name']}, a {info['title']} at th
 def main():
     """Main function to update README.md"""
     
-    html_file = 'index.html'
-    readme_file = 'README.md'
+    parser = argparse.ArgumentParser(description="Regenerate README.md")
+    parser.add_argument('--from-html', action='store_true',
+                        help="Scrape index.html instead of reading _data/*.yml")
+    add_profile_argument(parser)
+    args = parser.parse_args()
     
-    if not os.path.exists(html_file):
+    html_file = os.path.join(ROOT_DIR, 'index.html')
+    readme_file = os.path.join(ROOT_DIR, 'README.md')
+    
+    if args.from_html and not os.path.exists(html_file):
         print(f"Error: {html_file} not found!")
         return
     
-    print("Extracting information from index.html...")
-    info = extract_info_from_html(html_file)
-    
-    print("Generating README.md content...")
-    readme_content = generate_readme(info)
-    
-    print(f"Writing updated content to {readme_file}...")
-    with open(readme_file, 'w', encoding='utf-8') as f:
-        f.write(readme_content)
-    
-    print(f"✅ Successfully updated {readme_file}")
-    print(f"📊 Extracted {len(info['publications'])} publications")
-    print(f"🏆 Extracted {len(info['awards'])} awards")
-    print(f"🎓 Extracted {len(info['education'])} education entries")
-    print(f"💼 Extracted {len(info['appointments'])} appointments")
+    with profiled('update_readme', args.profile):
+        if args.from_html:
+            print("Extracting information from index.html...")
+            with span('parse', html_file):
+                info = extract_info_from_html(html_file)
+        else:
+            print("Loading information from _config.yml and _data/*.yml...")
+            with span('read', '_data'):
+                info = extract_info_from_data()
+        
+        print("Generating README.md content...")
+        with span('render', readme_file):
+            readme_content = generate_readme(info)
+        
+        print(f"Writing updated content to {readme_file}...")
+        with span('write', readme_file):
+            with open(readme_file, 'w', encoding='utf-8') as f:
+                f.write(readme_content)
+        
+        print(f"✅ Successfully updated {readme_file}")
+        print(f"📊 Extracted {len(info['publications'])} publications")
+        print(f"🏆 Extracted {len(info['awards'])} awards")
+        print(f"🎓 Extracted {len(info['education'])} education entries")
+        print(f"💼 Extracted {len(info['appointments'])} appointments")
 
 if __name__ == "__main__":
     main()